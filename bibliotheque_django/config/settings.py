@@ -3,8 +3,11 @@ Django settings for bibliotheque_django project.
 """
 
 from pathlib import Path
+import importlib.util
 import os
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -40,6 +43,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Fichiers de STATIC_ROOT servis avant les autres middlewares (hors DEBUG).
+    'gestion.statiques.StatiquesMiddleware',
+    # Réponses dynamiques compressées (brotli ou gzip) au-delà de COMPRESSION_TAILLE_MIN octets.
+    'gestion.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,6 +85,35 @@ DATABASES = {
     }
 }
 
+# Profil SQLite de production (plusieurs workers): une écriture attend le verrou
+# au lieu d'échouer et le prend dès le début de la transaction (BEGIN IMMEDIATE:
+# option 'transaction_mode' depuis Django 5.1, gestion/sqlite.py avant). Les pragmas
+# (WAL, synchronous, mmap, cache) sont appliqués à chaque connexion par gestion/sqlite.py.
+SQLITE_PRODUCTION = os.getenv('DJANGO_SQLITE_PRODUCTION', 'False').lower() in ('1', 'true', 'yes', 'on')
+if SQLITE_PRODUCTION:
+    DATABASES['default']['OPTIONS'] = {
+        'timeout': int(os.getenv('DJANGO_SQLITE_TIMEOUT', '20')),
+    }
+    if django.VERSION >= (5, 1):
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+# Répliques en lecture: chemins de fichiers SQLite séparés par des virgules, tenus
+# à jour depuis la base principale (Litestream, copie...). Les lectures sûres de
+# l'API y sont envoyées par gestion.routage.RouteurLectureEcriture.
+replicas_env = os.getenv('DJANGO_DB_REPLICAS', '')
+DATABASE_REPLICAS = []
+for index, chemin in enumerate([c.strip() for c in replicas_env.split(',') if c.strip()], start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': chemin,
+        # Les tests lisent la base de test principale.
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['gestion.routage.RouteurLectureEcriture']
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -112,6 +148,11 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [
     BASE_DIR / 'gestion' / 'static',
 ]
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    # collectstatic: CSS/JS minifiés, noms empreintés, variantes gzip et brotli.
+    'staticfiles': {'BACKEND': 'gestion.statiques.StockageStatique'},
+}
 
 # Media files
 MEDIA_URL = '/media/'
@@ -120,10 +161,37 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache: réponses de l'API, tableau de bord et sessions (voir gestion/cache_api.py).
+# locmem: mémoire du processus; file: répertoire partagé par les workers d'une
+# même machine; redis: serveur Redis (ou compatible) partagé.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'bibliotheque'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+_cache_backend, _cache_location = CACHE_BACKENDS[os.getenv('DJANGO_CACHE_BACKEND', 'locmem')]
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION') or _cache_location,
+        'TIMEOUT': int(os.getenv('DJANGO_CACHE_TIMEOUT', '600')),
+    }
+}
+
+# Sessions: lues depuis le cache, écrites aussi en base (survivent à un redémarrage).
+# Avec plusieurs workers, préférer un cache partagé (file ou redis): en locmem, une
+# session fermée par un worker reste lisible dans le cache des autres jusqu'à expiration.
+SESSION_ENGINE = os.getenv('DJANGO_SESSION_ENGINE') or 'django.contrib.sessions.backends.cached_db'
+
+
+# Bibliothèque
+# Montant de l'amende par jour de retard (appliqué par reconcilier_retards).
+BIBLIO_AMENDE_PAR_JOUR = os.getenv('BIBLIO_AMENDE_PAR_JOUR', '0.50')
+
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'gestion.pagination.PaginationBibliotheque',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'rest_framework.filters.SearchFilter',
@@ -136,8 +204,23 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # JSON rendu par orjson s'il est installé, même texte que DRF.
+    'DEFAULT_RENDERER_CLASSES': [
+        'gestion.rendus.RenduJSON',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# MessagePack (Accept: application/msgpack) si le module msgpack est installé.
+if importlib.util.find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('gestion.rendus.RenduMessagePack')
+
+# Listes de l'API lues par values(), sans instance de modèle (gestion/lecture_rapide.py).
+API_LECTURE_RAPIDE = os.getenv('DJANGO_API_LECTURE_RAPIDE', 'False').lower() in ('1', 'true', 'yes', 'on')
+
+# Taille (octets) à partir de laquelle une réponse est compressée.
+COMPRESSION_TAILLE_MIN = int(os.getenv('DJANGO_COMPRESSION_TAILLE_MIN', '1024'))
+
 
 # CORS Configuration
 cors_allowed_origins_env = os.getenv(
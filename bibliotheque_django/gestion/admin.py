@@ -32,11 +32,15 @@ class MembreAdmin(admin.ModelAdmin):
     list_filter = ['statut', 'date_inscription']
     search_fields = ['nom', 'email', 'telephone']
     readonly_fields = ['date_inscription', 'date_modification']
+    raw_id_fields = ['utilisateur']
     
     fieldsets = (
         ('Informations personnelles', {
             'fields': ('nom', 'email', 'telephone', 'adresse')
         }),
+        ('Compte', {
+            'fields': ('utilisateur',)
+        }),
         ('Statut', {
             'fields': ('statut', 'note')
         }),
@@ -50,6 +54,7 @@ class MembreAdmin(admin.ModelAdmin):
 @admin.register(Emprunt)
 class EmpruntAdmin(admin.ModelAdmin):
     list_display = ['livre', 'membre', 'date_emprunt', 'date_retour_prevue', 'statut', 'nombre_jours_retard']
+    list_select_related = ['livre', 'membre']
     list_filter = ['statut', 'date_emprunt', 'date_retour_prevue']
     search_fields = ['livre__titre', 'membre__nom']
     readonly_fields = ['date_emprunt', 'nombre_jours_retard']
@@ -8,3 +8,5 @@ class GestionConfig(AppConfig):
 
     def ready(self):
         import gestion.signals  # noqa
+        import gestion.sqlite  # noqa
+        import gestion.checks  # noqa
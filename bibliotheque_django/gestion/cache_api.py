@@ -0,0 +1,78 @@
+"""
+Cache des réponses de l'API, invalidé par les écritures.
+
+La clé d'une entrée contient les versions (VersionTable) des tables lues:
+chaque écriture sur Livre, Membre ou Emprunt incrémente la version de sa
+table (signaux post_save / post_delete, opérations en masse), ce qui rend
+les anciennes entrées inaccessibles sans avoir à les effacer; elles
+expirent ensuite d'elles-mêmes. L'horodatage de chaque version fait aussi
+partie de la clé: un numéro de version annulé par un rollback puis
+réattribué ne retrouve pas une entrée périmée.
+
+Le même cache garde l'empreinte de session courante de chaque compte, que
+/api/auth/me/ compare à la copie gardée en session à la connexion.
+
+Le moteur de cache est celui de CACHES (mémoire locale, fichiers ou Redis).
+"""
+import hashlib
+
+from django.core.cache import cache
+
+PREFIXE = 'gestion:api:'
+PREFIXE_METRIQUES = 'gestion:api:metriques:'
+PREFIXE_EMPREINTE = 'gestion:auth:empreinte:'
+
+
+def empreinte_versions(versions):
+    """Représentation stable de {table: (version, date_modification)}."""
+    return ','.join(
+        f'{table}:{version}:{date.timestamp() if date else 0}'
+        for table, (version, date) in sorted(versions.items())
+    )
+
+
+def cle(*parties):
+    return PREFIXE + hashlib.sha1('|'.join(str(partie) for partie in parties).encode()).hexdigest()
+
+
+def compter(nom, succes):
+    """Incrémente le compteur de succès ou d'échecs du cache pour une lecture."""
+    cle_compteur = f"{PREFIXE_METRIQUES}{nom}:{'succes' if succes else 'echecs'}"
+    try:
+        cache.incr(cle_compteur)
+    except ValueError:
+        # Premier passage: le compteur n'existe pas encore.
+        if not cache.add(cle_compteur, 1, timeout=None):
+            cache.incr(cle_compteur)
+
+
+def memoriser_empreinte(user):
+    """
+    Garde l'empreinte de session courante d'un compte (vide s'il est désactivé),
+    pour que /api/auth/me/ repère sans requête une session devenue invalide.
+    """
+    empreinte = user.get_session_auth_hash() if user.is_active else ''
+    cache.set(f'{PREFIXE_EMPREINTE}{user.pk}', empreinte, timeout=None)
+
+
+def empreinte_memorisee(user_id):
+    """Empreinte gardée par memoriser_empreinte(), ou None si le cache l'a perdue."""
+    return cache.get(f'{PREFIXE_EMPREINTE}{user_id}')
+
+
+def metriques(noms):
+    """Retourne {nom: {'succes', 'echecs', 'taux_succes'}} pour les lectures données."""
+    valeurs = cache.get_many([
+        f'{PREFIXE_METRIQUES}{nom}:{evenement}' for nom in noms for evenement in ('succes', 'echecs')
+    ])
+    resultat = {}
+    for nom in noms:
+        succes = valeurs.get(f'{PREFIXE_METRIQUES}{nom}:succes', 0)
+        echecs = valeurs.get(f'{PREFIXE_METRIQUES}{nom}:echecs', 0)
+        if succes or echecs:
+            resultat[nom] = {
+                'succes': succes,
+                'echecs': echecs,
+                'taux_succes': round(succes / (succes + echecs), 3),
+            }
+    return resultat
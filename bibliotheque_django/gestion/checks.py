@@ -0,0 +1,19 @@
+from django.core.checks import Error, Tags, register
+
+from . import sqlite
+
+
+@register(Tags.database)
+def verifier_declencheurs_fts(app_configs, databases=None, **kwargs):
+    """Signale un index plein texte dont les déclencheurs ont disparu (table recréée par une migration)."""
+    erreurs = []
+    for alias in databases or ():
+        manquants = sqlite.declencheurs_fts_manquants(alias)
+        if manquants:
+            erreurs.append(Error(
+                f"Déclencheurs de l'index plein texte absents de la base '{alias}': {', '.join(manquants)}. "
+                "La recherche renverrait des résultats périmés.",
+                hint=f'python manage.py maintenance_sqlite --database {alias} --reparer-fts',
+                id='gestion.E001',
+            ))
+    return erreurs
@@ -0,0 +1,80 @@
+"""
+Compression des réponses dynamiques selon Accept-Encoding.
+
+CompressionMiddleware compresse en brotli (si le module est installé) ou
+en gzip les réponses d'un type texte (JSON, HTML, CSV...) ou MessagePack
+dont le corps atteint settings.COMPRESSION_TAILLE_MIN octets: en dessous,
+le gain ne paie pas le temps de compression ni l'en-tête ajouté. Les
+niveaux sont ceux qui vont vite sur des contenus produits à chaque
+requête; les fichiers statiques, eux, sont compressés au niveau maximal
+une fois pour toutes par collectstatic (voir statiques).
+
+Les réponses en continu (flux d'événements, exports) ne passent pas ici:
+les compresser reviendrait à les retenir en tampon.
+"""
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .statiques import encodages_acceptes
+
+try:
+    import brotli
+except ImportError:  # Brotli facultatif: gzip seul.
+    brotli = None
+
+TYPES_COMPRESSIBLES = (
+    'application/json',
+    'application/msgpack',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/',
+)
+NIVEAU_GZIP = 6
+QUALITE_BROTLI = 5
+
+
+def compresser(contenu, encodage):
+    if encodage == 'br':
+        return brotli.compress(contenu, quality=QUALITE_BROTLI)
+    return gzip.compress(contenu, compresslevel=NIVEAU_GZIP, mtime=0)
+
+
+class CompressionMiddleware:
+    """Compression brotli ou gzip négociée, au-delà d'une taille minimale."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.encodages = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def __call__(self, request):
+        reponse = self.get_response(request)
+        if (
+            reponse.streaming
+            or reponse.has_header('Content-Encoding')
+            or not reponse.get('Content-Type', '').startswith(TYPES_COMPRESSIBLES)
+        ):
+            return reponse
+
+        # Le contenu dépend d'Accept-Encoding même quand il part tel quel.
+        patch_vary_headers(reponse, ['Accept-Encoding'])
+        if len(reponse.content) < settings.COMPRESSION_TAILLE_MIN:
+            return reponse
+        acceptes = encodages_acceptes(request)
+        encodage = next((codage for codage in self.encodages if codage in acceptes), None)
+        if encodage is None:
+            return reponse
+
+        compresse = compresser(reponse.content, encodage)
+        if len(compresse) >= len(reponse.content):
+            return reponse
+        reponse.content = compresse
+        reponse['Content-Length'] = str(len(compresse))
+        reponse['Content-Encoding'] = encodage
+        etag = reponse.get('ETag', '')
+        if etag.startswith('"'):
+            # Corps transformé: un ETag fort ne désigne plus ces octets.
+            reponse['ETag'] = 'W/' + etag
+        return reponse
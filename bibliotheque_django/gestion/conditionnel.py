@@ -0,0 +1,139 @@
+import hashlib
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from . import cache_api
+from .models import VersionTable
+
+# Formats gardés dans le cache (la clé comprend l'en-tête Accept).
+FORMATS_CACHES = ('json', 'msgpack')
+
+
+class ReponseAnticipee(Exception):
+    """Interrompt la requête avant la vue quand la réponse est déjà connue."""
+
+    def __init__(self, reponse):
+        super().__init__()
+        self.reponse = reponse
+
+
+class NonModifie(ReponseAnticipee):
+    """Le client a déjà la bonne version: réponse 304."""
+
+
+class RequetesConditionnellesMixin:
+    """
+    Ajoute ETag / Last-Modified aux lectures d'un ViewSet et répond 304 sans
+    exécuter la requête principale ni sérialiser quoi que ce soit.
+
+    Les validateurs ne dépendent que des versions des tables lues par l'action
+    (une seule requête sur VersionTable), de l'URL complète, de l'utilisateur
+    et du format demandé.
+
+    Les réponses JSON et MessagePack sont aussi gardées dans le cache (voir
+    cache_api), sous une clé faite des mêmes versions: un client sans ETag
+    reçoit la réponse déjà rendue, sans requête sur les données ni
+    sérialisation.
+    """
+
+    tables_versionnees = ()
+    tables_versionnees_actions = {}
+    # Vrai si tous les usagers non staff voient les mêmes données (sinon: cache par utilisateur).
+    cache_partage_usagers = False
+
+    def get_tables_versionnees(self):
+        return self.tables_versionnees_actions.get(self.action, self.tables_versionnees)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validateurs = None
+        self.cle_cache = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+        tables = self.get_tables_versionnees()
+        if not tables:
+            return
+
+        versions = VersionTable.lire(tables)
+        empreinte = '|'.join([
+            request.get_full_path(),
+            str(request.user.pk),
+            str(request.user.is_staff),
+            request.META.get('HTTP_ACCEPT', ''),
+            *(f'{table}:{versions.get(table, (0, None))[0]}' for table in sorted(tables)),
+        ])
+        etag = 'W/' + quote_etag(hashlib.sha1(empreinte.encode()).hexdigest())
+        dates = [date for _, date in versions.values() if date is not None]
+        derniere_modification = int(max(dates).timestamp()) if dates else None
+        self.validateurs = (etag, derniere_modification)
+
+        reponse = get_conditional_response(request, etag=etag, last_modified=derniere_modification)
+        if reponse is not None:
+            raise NonModifie(reponse)
+        if request.method == 'GET':
+            self._lire_cache(request, versions)
+
+    def nom_lecture(self):
+        """Nom de la lecture dans les métriques du cache."""
+        return f'{type(self).__name__}.{self.action}'
+
+    def _lire_cache(self, request, versions):
+        # Le staff voit toutes les données; un usager, selon la vue, les mêmes
+        # que les autres usagers ou seulement les siennes.
+        if request.user.is_staff:
+            portee = 'bibliothecaire'
+        elif self.cache_partage_usagers:
+            portee = 'usager'
+        else:
+            portee = f'usager:{request.user.pk}'
+        self.cle_cache = cache_api.cle(
+            self.nom_lecture(),
+            # URL absolue: les réponses contiennent des liens vers l'hôte demandé.
+            request.build_absolute_uri(),
+            portee,
+            request.META.get('HTTP_ACCEPT', ''),
+            cache_api.empreinte_versions(versions),
+        )
+        entree = cache.get(self.cle_cache)
+        cache_api.compter(self.nom_lecture(), entree is not None)
+        if entree is not None:
+            contenu, type_contenu = entree
+            reponse = HttpResponse(contenu, content_type=type_contenu)
+            reponse['X-Cache'] = 'HIT'
+            raise ReponseAnticipee(reponse)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ReponseAnticipee):
+            return exc.reponse
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validateurs = getattr(self, 'validateurs', None)
+        if validateurs and response.status_code in (200, 304) and not response.streaming:
+            etag, derniere_modification = validateurs
+            response['ETag'] = etag
+            if derniere_modification is not None:
+                response['Last-Modified'] = http_date(derniere_modification)
+            # Le navigateur garde la réponse mais la revalide à chaque appel.
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Accept', 'Cookie'])
+
+        cle = getattr(self, 'cle_cache', None)
+        if (
+            cle
+            and isinstance(response, Response)
+            and response.status_code == 200
+            and getattr(response, 'accepted_renderer', None) is not None
+            and response.accepted_renderer.format in FORMATS_CACHES
+        ):
+            response['X-Cache'] = 'MISS'
+            # Le contenu n'existe qu'une fois la réponse rendue.
+            response.add_post_render_callback(
+                lambda rendue: cache.set(cle, (rendue.content, rendue['Content-Type']))
+            )
+        return response
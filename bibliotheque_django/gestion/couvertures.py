@@ -0,0 +1,105 @@
+"""
+Variantes réduites des couvertures: plusieurs largeurs, en WebP et en JPEG.
+
+Une variante est rangée à côté de l'original et son nom en dérive
+(livres/dune.png -> livres/dune.png.320.webp). Le nom d'un original est
+unique dans le stockage: l'URL d'une variante désigne toujours la même
+image et peut être servie avec un cache « immutable ».
+
+Les variantes sont créées après l'enregistrement d'une nouvelle couverture
+(signal post_save) et, à défaut (couverture plus ancienne, échec), à la
+première demande adressée à la vue couverture_variante.
+"""
+import logging
+import re
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+DOSSIER = 'livres/'
+LARGEURS = (160, 320, 640)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+MOTIF_VARIANTE = re.compile(r'(?P<original>[^/]+)\.(?P<largeur>\d+)\.(?P<format>webp|jpg)')
+# Un an: le navigateur ne revalide jamais une variante.
+CACHE_IMMUABLE = 'public, max-age=31536000, immutable'
+
+ERREURS_IMAGE = (OSError, UnidentifiedImageError, Image.DecompressionBombError)
+
+
+def nom_variante(original, largeur, format_image):
+    return f'{original}.{largeur}.{format_image}'
+
+
+def urls_variantes(original):
+    """Retourne {largeur: {format: url}} sans accès au stockage."""
+    return {
+        str(largeur): {
+            format_image: default_storage.url(nom_variante(original, largeur, format_image))
+            for format_image in FORMATS
+        }
+        for largeur in LARGEURS
+    }
+
+
+def _encoder(image, largeur, format_image):
+    copie = image.copy()
+    # Largeur imposée, hauteur libre (jusqu'au double): jamais d'agrandissement.
+    copie.thumbnail((largeur, largeur * 2), Image.Resampling.LANCZOS)
+    format_pil, _, options = FORMATS[format_image]
+    if format_pil == 'JPEG' and copie.mode != 'RGB':
+        # JPEG n'a pas de transparence: fond blanc.
+        copie = copie.convert('RGBA')
+        fond = Image.new('RGB', copie.size, 'white')
+        fond.paste(copie, mask=copie.getchannel('A'))
+        copie = fond
+    tampon = BytesIO()
+    copie.save(tampon, format_pil, **options)
+    return tampon.getvalue()
+
+
+def generer_variantes(original, forcer=False):
+    """
+    Crée les variantes manquantes de la couverture (toutes si forcer);
+    retourne le nombre de fichiers écrits. Lève OSError si l'original
+    n'est pas une image lisible.
+    """
+    a_creer = [
+        (largeur, format_image)
+        for largeur in LARGEURS
+        for format_image in FORMATS
+        if forcer or not default_storage.exists(nom_variante(original, largeur, format_image))
+    ]
+    if not a_creer:
+        return 0
+
+    with default_storage.open(original, 'rb') as fichier:
+        image = Image.open(fichier)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    for largeur, format_image in a_creer:
+        nom = nom_variante(original, largeur, format_image)
+        contenu = _encoder(image, largeur, format_image)
+        if default_storage.exists(nom):
+            default_storage.delete(nom)
+        enregistre = default_storage.save(nom, ContentFile(contenu))
+        if enregistre != nom:
+            # Une génération concurrente a écrit la même variante entre-temps.
+            default_storage.delete(enregistre)
+    return len(a_creer)
+
+
+def preparer_variantes(original):
+    """Comme generer_variantes, sans faire échouer l'appelant sur une image illisible."""
+    try:
+        return generer_variantes(original)
+    except ERREURS_IMAGE:
+        logger.warning("Variantes de couverture impossibles pour %s", original, exc_info=True)
+        return 0
@@ -0,0 +1,125 @@
+"""
+Flux d'événements (Server-Sent Events) pour le tableau de bord.
+
+Chaque processus serveur n'a qu'un seul surveillant, actif uniquement tant
+qu'au moins un tableau de bord est abonné. Il relit VersionTable (une petite
+requête) à intervalle régulier pour voir les écritures des autres processus,
+et il est réveillé immédiatement par les écritures du processus courant via
+le signal tables_modifiees. Les abonnés ne reçoivent un événement que si une
+table a réellement changé.
+
+Le flux n'existe que sous ASGI: sous WSGI, chaque connexion ouverte tiendrait
+un worker pour toute la durée de vie de l'onglet. La vue répond alors 204 et
+le tableau de bord revient à l'interrogation périodique.
+"""
+import asyncio
+import json
+import os
+
+from asgiref.sync import sync_to_async
+from django.dispatch import receiver
+
+from .models import VersionTable, tables_modifiees
+
+# Nom de l'événement envoyé au navigateur pour chaque table surveillée.
+EVENEMENTS = {
+    'emprunt': 'emprunts',
+    'livre': 'inventaire',
+    'membre': 'membres',
+}
+INTERVALLE_SURVEILLANCE = float(os.getenv('EVENEMENTS_INTERVALLE', '2'))
+INTERVALLE_BATTEMENT = 15
+TAILLE_FILE_ABONNE = 100
+
+
+def formater_evenement(nom, donnees):
+    return f"event: {nom}\ndata: {json.dumps(donnees)}\n\n"
+
+
+def evenements_changes(anciennes, nouvelles):
+    """Retourne les événements SSE correspondant aux tables dont la version a changé."""
+    return [
+        formater_evenement(EVENEMENTS[table], {'table': table, 'version': version})
+        for table, (version, _) in sorted(nouvelles.items())
+        if table in EVENEMENTS and anciennes.get(table, (None, None))[0] != version
+    ]
+
+
+class Surveillant:
+    """Surveille les versions des tables et diffuse les changements aux abonnés (ASGI)."""
+
+    def __init__(self):
+        self.abonnes = set()
+        self.tache = None
+        self.boucle = None
+        self.reveil = None
+        self.pret = None
+
+    async def abonner(self):
+        file = asyncio.Queue(maxsize=TAILLE_FILE_ABONNE)
+        self.abonnes.add(file)
+        if self.tache is None or self.tache.done():
+            self.boucle = asyncio.get_running_loop()
+            self.reveil = asyncio.Event()
+            self.pret = asyncio.Event()
+            self.tache = asyncio.ensure_future(self._surveiller())
+        # Les versions de référence doivent être lues avant tout changement à signaler.
+        await self.pret.wait()
+        if self.tache.done() and not self.tache.cancelled() and self.tache.exception() is not None:
+            # Première lecture en échec: l'abonné ne recevrait jamais rien.
+            self.abonnes.discard(file)
+            raise self.tache.exception()
+        return file
+
+    def desabonner(self, file):
+        self.abonnes.discard(file)
+
+    def reveiller(self):
+        """Appelable depuis n'importe quel thread: force une relecture immédiate."""
+        if self.boucle is not None and self.reveil is not None and not self.boucle.is_closed():
+            self.boucle.call_soon_threadsafe(self.reveil.set)
+
+    async def _surveiller(self):
+        lire = sync_to_async(VersionTable.lire)
+        try:
+            versions = await lire(list(EVENEMENTS))
+        finally:
+            self.pret.set()
+        while self.abonnes:
+            try:
+                await asyncio.wait_for(self.reveil.wait(), timeout=INTERVALLE_SURVEILLANCE)
+            except asyncio.TimeoutError:
+                pass
+            self.reveil.clear()
+
+            nouvelles = await lire(list(EVENEMENTS))
+            for evenement in evenements_changes(versions, nouvelles):
+                for file in list(self.abonnes):
+                    if file.full():
+                        # Abonné trop lent: il recevra les prochains changements.
+                        continue
+                    file.put_nowait(evenement)
+            versions = nouvelles
+
+
+surveillant = Surveillant()
+
+
+@receiver(tables_modifiees)
+def reveiller_surveillant(sender, **kwargs):
+    surveillant.reveiller()
+
+
+async def flux_async():
+    """Flux SSE servi sous ASGI: aucune ressource bloquée par abonné."""
+    file = await surveillant.abonner()
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                yield await asyncio.wait_for(file.get(), timeout=INTERVALLE_BATTEMENT)
+            except asyncio.TimeoutError:
+                yield ': battement\n\n'
+    finally:
+        surveillant.desabonner(file)
+
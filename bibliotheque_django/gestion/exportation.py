@@ -0,0 +1,187 @@
+"""
+Export en continu (CSV ou NDJSON) des emprunts, des membres et du catalogue.
+
+Les lignes sont lues avec values() et .iterator(): aucune instance de modèle
+n'est construite et seul un bloc de lignes est en mémoire à la fois, quelle
+que soit la taille de la table. L'en-tête CSV et la première ligne partent
+sans attendre, les suivantes sont envoyées par blocs.
+
+Les dates et heures sont écrites dans le fuseau TIME_ZONE, avec son
+décalage, comme dans les réponses de l'API.
+"""
+import csv
+from datetime import date, datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Emprunt, Livre, Membre
+
+FORMATS = ('csv', 'ndjson')
+TYPES_CONTENU = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+TAILLE_BLOC = 2000
+
+EXPORTS = {
+    'emprunts': {
+        'modele': Emprunt,
+        'champ_date': 'date_emprunt',
+        'champ_statut': 'statut',
+        'champs': [
+            'id', 'livre_id', 'livre__isbn', 'livre__titre', 'membre_id', 'membre__nom',
+            'membre__email', 'date_emprunt', 'date_retour_prevue', 'date_retour_effective',
+            'statut', 'nombre_jours_retard', 'amende', 'notes',
+        ],
+    },
+    'membres': {
+        'modele': Membre,
+        'champ_date': 'date_inscription',
+        'champ_statut': 'statut',
+        'champs': [
+            'id', 'nom', 'email', 'telephone', 'adresse', 'statut',
+            'date_inscription', 'date_modification', 'note',
+        ],
+    },
+    'livres': {
+        'modele': Livre,
+        'champ_date': 'date_ajout',
+        'champ_statut': None,
+        'champs': [
+            'id', 'titre', 'auteur', 'isbn', 'editeur', 'annee', 'genre', 'description',
+            'note', 'total', 'disponible', 'emplacement', 'date_ajout', 'date_modification',
+        ],
+    },
+}
+
+
+def _lire_date(valeur, nom):
+    if not valeur:
+        return None
+    if isinstance(valeur, date):
+        return valeur
+    try:
+        jour = parse_date(valeur)
+    except ValueError:
+        jour = None
+    if jour is None:
+        raise ValueError(f"Paramètre '{nom}' invalide, format attendu: AAAA-MM-JJ")
+    return jour
+
+
+def _debut_du_jour(jour, champ):
+    if champ.get_internal_type() != 'DateTimeField':
+        return jour
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+def queryset_export(nom, debut=None, fin=None, statut=None):
+    """
+    Retourne (champs, queryset de dictionnaires) pour l'export demandé.
+
+    debut et fin (AAAA-MM-JJ, bornes incluses) filtrent sur la date de
+    création de la ligne; lève ValueError si un paramètre est invalide.
+    """
+    config = EXPORTS[nom]
+    modele = config['modele']
+    champ_date = modele._meta.get_field(config['champ_date'])
+    # Base choisie maintenant: le flux est lu après la fin de la vue.
+    queryset = modele.objects.using(router.db_for_read(modele))
+
+    # Bornes en demi-intervalle sur la colonne brute, pour rester sur l'index.
+    debut = _lire_date(debut, 'debut')
+    fin = _lire_date(fin, 'fin')
+    if debut:
+        queryset = queryset.filter(**{f'{champ_date.name}__gte': _debut_du_jour(debut, champ_date)})
+    if fin:
+        lendemain = fin + timedelta(days=1)
+        queryset = queryset.filter(**{f'{champ_date.name}__lt': _debut_du_jour(lendemain, champ_date)})
+
+    if statut:
+        champ_statut = config['champ_statut']
+        if champ_statut is None:
+            raise ValueError(f"Le filtre 'statut' ne s'applique pas à l'export des {nom}")
+        statuts = dict(modele._meta.get_field(champ_statut).choices)
+        if statut not in statuts:
+            raise ValueError(f"Statut inconnu: {statut}")
+        queryset = queryset.filter(**{champ_statut: statut})
+
+    return config['champs'], queryset.order_by('id').values(*config['champs'])
+
+
+class _Tampon:
+    """Fichier factice: csv.writer retourne directement la ligne formatée."""
+
+    def write(self, valeur):
+        return valeur
+
+
+def _heure_locale(valeur):
+    # values() rend les datetimes en UTC; l'API les présente dans TIME_ZONE.
+    return timezone.localtime(valeur) if timezone.is_aware(valeur) else valeur
+
+
+class _EncodeurExport(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, datetime):
+            o = _heure_locale(o)
+        return super().default(o)
+
+
+def _valeur_csv(valeur):
+    if valeur is None:
+        return ''
+    if isinstance(valeur, datetime):
+        return _heure_locale(valeur).isoformat()
+    if isinstance(valeur, date):
+        return valeur.isoformat()
+    return valeur
+
+
+def _par_blocs(lignes, taille_bloc):
+    # Regrouper les lignes évite un envoi réseau par ligne; la première part
+    # seule pour que le client reçoive des données sans attendre un bloc entier.
+    lignes = iter(lignes)
+    for ligne in lignes:
+        yield ligne
+        break
+    bloc = []
+    for ligne in lignes:
+        bloc.append(ligne)
+        if len(bloc) >= taille_bloc:
+            yield ''.join(bloc)
+            bloc = []
+    if bloc:
+        yield ''.join(bloc)
+
+
+def lignes_csv(champs, queryset, taille_bloc=TAILLE_BLOC):
+    ecrivain = csv.writer(_Tampon())
+    yield ecrivain.writerow(champs)
+    yield from _par_blocs(
+        (
+            ecrivain.writerow([_valeur_csv(ligne[champ]) for champ in champs])
+            for ligne in queryset.iterator(chunk_size=taille_bloc)
+        ),
+        taille_bloc,
+    )
+
+
+def lignes_ndjson(champs, queryset, taille_bloc=TAILLE_BLOC):
+    encodeur = _EncodeurExport(ensure_ascii=False)
+    yield from _par_blocs(
+        (encodeur.encode(ligne) + '\n' for ligne in queryset.iterator(chunk_size=taille_bloc)),
+        taille_bloc,
+    )
+
+
+def exporter(nom, format_fichier='csv', debut=None, fin=None, statut=None, taille_bloc=TAILLE_BLOC):
+    """Retourne un générateur de morceaux de texte pour l'export demandé."""
+    if format_fichier not in FORMATS:
+        raise ValueError(f'Format inconnu: {format_fichier}')
+    champs, queryset = queryset_export(nom, debut=debut, fin=fin, statut=statut)
+    generateur = lignes_csv if format_fichier == 'csv' else lignes_ndjson
+    return generateur(champs, queryset, taille_bloc=taille_bloc)
@@ -0,0 +1,128 @@
+import django_filters
+from django.db import connections
+from django.db.models import CharField, Q
+from django.db.models.functions import Cast
+from django.db.models.lookups import Contains
+from rest_framework import filters
+
+from .models import Emprunt, Livre, Membre
+
+
+FTS_TABLE = 'gestion_livre_fts'
+
+
+def fts_disponible(alias):
+    """
+    Indique si la base possède l'index FTS5 du catalogue (SQLite uniquement).
+
+    La réponse est gardée pour la connexion ouverte, pas pour le processus:
+    un index créé ou supprimé depuis (migration, maintenance) est vu dès la
+    connexion suivante.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        return False
+    connection.ensure_connection()
+    connue = getattr(connection, '_gestion_fts', None)
+    if connue is None or connue[0] is not connection.connection:
+        with connection.cursor() as curseur:
+            curseur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            connue = connection._gestion_fts = (connection.connection, curseur.fetchone() is not None)
+    return connue[1]
+
+
+def requete_fts(termes):
+    """Construit une requête FTS5: tous les termes, chacun en recherche par préfixe."""
+    return ' '.join('"{}"*'.format(terme.replace('"', '""')) for terme in termes)
+
+
+class RechercheLivreFilter(filters.SearchFilter):
+    """
+    Recherche plein texte classée par pertinence (bm25) sur l'index FTS5.
+
+    Couvre titre, auteur, isbn, genre, editeur et description. Sur un autre
+    moteur que SQLite, ou si l'index est absent, on retombe sur le
+    SearchFilter de DRF et ses search_fields.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        termes = self.get_search_terms(request)
+        if not termes:
+            return queryset
+        if not fts_disponible(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[requete_fts(termes)],
+            select={'rang_recherche': f'bm25({FTS_TABLE})'},
+        ).order_by('rang_recherche')
+
+
+class RechercheEmpruntFilter(filters.SearchFilter):
+    """
+    Recherche des emprunts sur les search_fields de la vue, le libellé du
+    statut ("En cours", "En retard") et le numéro de l'emprunt. Comme avec
+    SearchFilter, chaque terme doit correspondre à l'un de ces champs.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        termes = self.get_search_terms(request)
+        champs = self.get_search_fields(view, request) or []
+        for terme in termes:
+            condition = Q()
+            for champ in champs:
+                condition |= Q(**{f'{champ}__icontains': terme})
+            statuts = [code for code, libelle in Emprunt.STATUT_CHOICES if terme.lower() in libelle.lower()]
+            if statuts:
+                condition |= Q(statut__in=statuts)
+            if terme.isdigit():
+                # Numéro saisi en partie, comme le faisait la recherche du navigateur.
+                condition |= Q(Contains(Cast('id', CharField()), terme))
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class LivreFilterSet(django_filters.FilterSet):
+    """
+    Filtres du catalogue: ?genre=Romans (ou Romans,BD), ?annee_min= / ?annee_max=,
+    ?note_min= / ?note_max=, ?disponible=true. Chaque colonne filtrée a son index.
+    """
+    genre = django_filters.BaseInFilter(field_name='genre')
+    annee = django_filters.RangeFilter()
+    note = django_filters.RangeFilter()
+    disponible = django_filters.BooleanFilter(method='filtrer_disponible')
+
+    class Meta:
+        model = Livre
+        fields = ['genre', 'annee', 'note', 'disponible']
+
+    def filtrer_disponible(self, queryset, name, value):
+        return queryset.filter(disponible__gt=0) if value else queryset.filter(disponible=0)
+
+
+class MembreFilterSet(django_filters.FilterSet):
+    """Filtres des membres: ?statut=, ?date_inscription_after= / ?date_inscription_before=."""
+    statut = django_filters.BaseInFilter(field_name='statut')
+    date_inscription = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = Membre
+        fields = ['statut', 'date_inscription']
+
+
+class EmpruntFilterSet(django_filters.FilterSet):
+    """
+    Filtres des emprunts: ?statut=en_cours,retard, ?membre=, ?livre=,
+    ?date_emprunt_after= / ?date_emprunt_before=,
+    ?date_retour_prevue_after= / ?date_retour_prevue_before= (bornes incluses).
+    """
+    statut = django_filters.BaseInFilter(field_name='statut')
+    date_emprunt = django_filters.DateFromToRangeFilter()
+    date_retour_prevue = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = Emprunt
+        fields = ['statut', 'membre', 'livre', 'date_emprunt', 'date_retour_prevue']
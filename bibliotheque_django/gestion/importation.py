@@ -0,0 +1,192 @@
+"""
+Import en masse du catalogue (CSV ou NDJSON) avec fusion sur l'ISBN.
+
+Le fichier est lu ligne à ligne et traité par lots: chaque lot est validé
+sans requête, les ISBN déjà connus sont cherchés en une seule requête, puis
+les nouveaux livres sont insérés par bulk_create et les existants mis à
+jour par bulk_update, dans une transaction par lot. La mémoire utilisée ne
+dépend que de la taille d'un lot, pas de celle du fichier.
+
+L'encodage est vérifié sur tout le fichier avant le premier lot: un octet
+invalide en fin de fichier ne doit pas laisser les lots précédents écrits.
+"""
+import codecs
+import csv
+import json
+import time
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Livre, VersionTable
+from .serializers import LivreImportSerializer
+
+FORMATS = ('csv', 'ndjson')
+TAILLE_LOT = 1000
+TAILLE_BLOC = 64 * 1024
+# Nombre maximal d'erreurs détaillées gardées dans le rapport (toutes sont comptées).
+ERREURS_MAX = 1000
+
+
+def format_depuis_nom(nom_fichier):
+    """Devine le format d'après l'extension du fichier."""
+    nom = (nom_fichier or '').lower()
+    if nom.endswith(('.ndjson', '.jsonl', '.json')):
+        return 'ndjson'
+    return 'csv'
+
+
+def ligne_non_utf8(flux_binaire):
+    """
+    Numéro de la première ligne qui n'est pas de l'UTF-8 valide, ou None.
+
+    Le flux est lu par blocs; l'appelant le rembobine avant l'import.
+    """
+    decodeur = codecs.getincrementaldecoder('utf-8')()
+    lignes = 1
+    for bloc in iter(lambda: flux_binaire.read(TAILLE_BLOC), b''):
+        try:
+            decodeur.decode(bloc)
+        except UnicodeDecodeError as exc:
+            # exc.object commence par les octets d'un caractère coupé entre deux blocs.
+            return lignes + exc.object.count(b'\n', 0, exc.start)
+        lignes += bloc.count(b'\n')
+    try:
+        decodeur.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return lignes
+    return None
+
+
+def lire_lignes(flux, format_fichier):
+    """Produit des couples (numéro de ligne, dictionnaire ou message d'erreur)."""
+    if format_fichier == 'csv':
+        lecteur = csv.DictReader(flux)
+        for ligne in lecteur:
+            yield lecteur.line_num, ligne
+        return
+
+    for numero, texte in enumerate(flux, start=1):
+        texte = texte.strip()
+        if not texte:
+            continue
+        try:
+            ligne = json.loads(texte)
+        except json.JSONDecodeError as exc:
+            yield numero, f'JSON invalide: {exc.msg}'
+            continue
+        if not isinstance(ligne, dict):
+            yield numero, 'Chaque ligne doit être un objet JSON.'
+            continue
+        yield numero, ligne
+
+
+def _nettoyer(ligne):
+    # Une cellule CSV vide vaut "non renseigné" et laisse la valeur par défaut s'appliquer.
+    return {
+        champ: valeur
+        for champ, valeur in ligne.items()
+        if champ in LivreImportSerializer.Meta.fields and valeur not in ('', None)
+    }
+
+
+class RapportImport:
+    def __init__(self):
+        self.lignes = 0
+        self.crees = 0
+        self.mis_a_jour = 0
+        self.nombre_erreurs = 0
+        self.erreurs = []
+        self.debut = time.monotonic()
+
+    def erreur(self, numero, detail):
+        self.nombre_erreurs += 1
+        if len(self.erreurs) < ERREURS_MAX:
+            self.erreurs.append({'ligne': numero, 'erreurs': detail})
+
+    def en_dict(self):
+        duree = time.monotonic() - self.debut
+        return {
+            'lignes': self.lignes,
+            'crees': self.crees,
+            'mis_a_jour': self.mis_a_jour,
+            'nombre_erreurs': self.nombre_erreurs,
+            'erreurs': self.erreurs,
+            'duree': round(duree, 3),
+            'lignes_par_seconde': round(self.lignes / duree) if duree else self.lignes,
+        }
+
+
+def _traiter_lot(lot, rapport):
+    # Validation sans requête; en cas d'ISBN répété dans le lot, la dernière ligne l'emporte.
+    # Un seul serializer sert à toutes les lignes (comme l'enfant d'un ListSerializer):
+    # construire ses champs coûte bien plus cher que valider une ligne.
+    validateur = LivreImportSerializer()
+    valides = {}
+    for numero, ligne in lot:
+        if isinstance(ligne, str):
+            rapport.erreur(numero, {'non_field_errors': [ligne]})
+            continue
+        try:
+            donnees = validateur.run_validation(_nettoyer(ligne))
+        except ValidationError as exc:
+            rapport.erreur(numero, exc.detail)
+            continue
+        valides[donnees['isbn']] = (numero, donnees)
+    if not valides:
+        return
+
+    champs = [champ for champ in LivreImportSerializer.Meta.fields if champ != 'isbn']
+    maintenant = timezone.now()
+    try:
+        with transaction.atomic():
+            existants = Livre.objects.in_bulk(list(valides), field_name='isbn')
+            nouveaux, modifies = [], []
+            for isbn, (_, donnees) in valides.items():
+                livre = existants.get(isbn)
+                if livre is None:
+                    nouveaux.append(Livre(**donnees, disponible=donnees.get('total', 1)))
+                    continue
+                ancien_total = livre.total
+                for champ, valeur in donnees.items():
+                    setattr(livre, champ, valeur)
+                # Les exemplaires ajoutés ou retirés sont répercutés sur les disponibles.
+                livre.disponible = max(0, livre.disponible + livre.total - ancien_total)
+                livre.date_modification = maintenant
+                modifies.append(livre)
+
+            Livre.objects.bulk_create(nouveaux)
+            Livre.objects.bulk_update(modifies, champs + ['disponible', 'date_modification'])
+            VersionTable.incrementer('livre')
+    except IntegrityError:
+        # Un autre import a créé le même ISBN entre la recherche et l'insertion.
+        for numero, _ in valides.values():
+            rapport.erreur(numero, {'isbn': ["Conflit d'écriture concurrent, relancez l'import de cette ligne."]})
+        return
+
+    rapport.crees += len(nouveaux)
+    rapport.mis_a_jour += len(modifies)
+
+
+def importer_livres(flux, format_fichier='csv', taille_lot=TAILLE_LOT):
+    """
+    Importe les livres d'un flux texte et retourne le rapport d'import.
+
+    Les livres sont identifiés par leur ISBN: un ISBN inconnu crée le livre,
+    un ISBN connu met à jour ses champs.
+    """
+    if format_fichier not in FORMATS:
+        raise ValueError(f'Format inconnu: {format_fichier}')
+
+    rapport = RapportImport()
+    lot = []
+    for numero, ligne in lire_lignes(flux, format_fichier):
+        rapport.lignes += 1
+        lot.append((numero, ligne))
+        if len(lot) >= taille_lot:
+            _traiter_lot(lot, rapport)
+            lot = []
+    if lot:
+        _traiter_lot(lot, rapport)
+    return rapport.en_dict()
@@ -0,0 +1,129 @@
+"""
+Lecture rapide des listes de l'API.
+
+Un plan de lecture est tiré des champs d'un serializer (après ?fields=,
+?exclude= ou ?vue=compacte): pour chaque champ, la colonne ORM lue et la
+mise en forme de sa valeur. Les lignes viennent alors de QuerySet.values(),
+sans instance de modèle ni passage par le serializer pour chaque ligne, et
+le résultat est identique à serializer.data.
+
+La mise en forme réutilise celle des champs DRF (dates, décimaux...), sauf
+pour les types dont la représentation est la valeur lue en base. Un champ
+calculé (SerializerMethodField) est accepté si son serializer le déclare
+dans Meta.colonnes_champs_calcules et définit `<méthode>_depuis_colonnes`
+prenant les valeurs de ces colonnes. Un serializer comportant un autre
+champ n'a pas de plan: la vue garde alors le chemin habituel.
+"""
+from operator import itemgetter
+
+from rest_framework import relations, serializers
+from rest_framework.settings import api_settings
+
+# BigIntegerField et COERCE_BIGINT_TO_STRING n'existent que depuis DRF 3.16:
+# avant, les clés BigAutoField sont des IntegerField, déjà rendus tels quels.
+BigIntegerField = getattr(serializers, 'BigIntegerField', None)
+
+# Champs dont la représentation est la valeur lue par values().
+CHAMPS_IDENTITE = (
+    serializers.CharField,
+    serializers.EmailField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    relations.PrimaryKeyRelatedField,
+)
+# Champs mis en forme par leur propre to_representation.
+CHAMPS_CONVERTIS = tuple(
+    champ for champ in (
+        serializers.DateTimeField, serializers.DateField, serializers.DecimalField, BigIntegerField,
+    ) if champ is not None
+)
+
+
+class PlanLecture:
+    """Colonnes à lire et extracteurs (nom du champ, fonction(ligne))."""
+
+    def __init__(self, colonnes, extracteurs):
+        self.colonnes = colonnes
+        self.extracteurs = extracteurs
+
+    @classmethod
+    def depuis_serializer(cls, serializer, colonnes_supplementaires=()):
+        """
+        Plan du serializer, ou None si l'un de ses champs n'est pas pris en
+        charge. colonnes_supplementaires sont lues sans être rendues (clé du
+        curseur de pagination).
+        """
+        modele = serializer.Meta.model
+        request = serializer.context.get('request')
+        colonnes = [modele._meta.pk.name, *colonnes_supplementaires]
+        extracteurs = []
+        for champ in serializer._readable_fields:
+            if isinstance(champ, serializers.SerializerMethodField):
+                sources = getattr(serializer.Meta, 'colonnes_champs_calcules', {}).get(champ.field_name)
+                methode = getattr(serializer, f'{champ.method_name}_depuis_colonnes', None)
+                if sources is None or methode is None:
+                    return None
+                colonnes.extend(sources)
+                extracteurs.append((champ.field_name, _calcule(methode, sources)))
+                continue
+            if champ.source == '*' or not isinstance(champ, serializers.Field):
+                return None
+
+            colonne = champ.source.replace('.', '__')
+            colonnes.append(colonne)
+            if type(champ) in CHAMPS_IDENTITE or _entier_brut(champ):
+                extracteurs.append((champ.field_name, itemgetter(colonne)))
+            elif type(champ) is serializers.FloatField:
+                extracteurs.append((champ.field_name, _converti(colonne, float)))
+            elif isinstance(champ, serializers.FileField):
+                stockage = modele._meta.get_field(colonne).storage
+                extracteurs.append((champ.field_name, _converti(colonne, _url_fichier(champ, stockage, request))))
+            elif isinstance(champ, CHAMPS_CONVERTIS):
+                extracteurs.append((champ.field_name, _converti(colonne, champ.to_representation)))
+            else:
+                return None
+        return cls(list(dict.fromkeys(colonnes)), extracteurs)
+
+    def lignes(self, queryset):
+        """Le QuerySet lu en dictionnaires {colonne: valeur}."""
+        return queryset.values(*self.colonnes)
+
+    def representer(self, lignes):
+        extracteurs = self.extracteurs
+        return [{nom: extraire(ligne) for nom, extraire in extracteurs} for ligne in lignes]
+
+
+def _entier_brut(champ):
+    # Clés primaires BigAutoField: rendues en entier, sauf COERCE_BIGINT_TO_STRING.
+    if BigIntegerField is None or type(champ) is not BigIntegerField:
+        return False
+    return not getattr(champ, 'coerce_to_string', getattr(api_settings, 'COERCE_BIGINT_TO_STRING', False))
+
+
+def _converti(colonne, conversion):
+    # Comme Serializer.to_representation: None reste None sans conversion.
+    def extraire(ligne):
+        valeur = ligne[colonne]
+        return None if valeur is None else conversion(valeur)
+    return extraire
+
+
+def _calcule(methode, colonnes):
+    def extraire(ligne):
+        return methode(*(ligne[colonne] for colonne in colonnes))
+    return extraire
+
+
+def _url_fichier(champ, stockage, request):
+    # FileField.to_representation, à partir du nom enregistré en base.
+    utiliser_url = getattr(champ, 'use_url', True)
+
+    def representer(nom):
+        if not nom:
+            return None
+        if not utiliser_url:
+            return nom
+        url = stockage.url(nom)
+        return request.build_absolute_uri(url) if request is not None else url
+    return representer
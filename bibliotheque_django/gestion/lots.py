@@ -0,0 +1,140 @@
+"""
+Opérations groupées sur les emprunts: retour ou prolongation de plusieurs
+emprunts en une seule transaction.
+
+Les emprunts visés sont lus en une requête, puis modifiés par des UPDATE
+ensemblistes: un seul pour clore tous les retours, un par date d'échéance
+pour les prolongations, et un par nombre d'exemplaires rendus pour la
+disponibilité des livres. Le nombre de requêtes ne dépend donc pas du
+nombre d'emprunts traités.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CompteurEmprunt, Emprunt, Livre, VersionTable
+
+TAILLE_MAX_LOT = 500
+CHAMPS_EMPRUNT = ('id', 'livre_id', 'statut', 'date_retour_prevue')
+
+
+def resoudre_emprunts(ids=None, membre_id=None, isbns=None):
+    """
+    Associe chaque référence demandée à un emprunt (dictionnaire) ou à None.
+
+    Les références sont soit des identifiants d'emprunts, soit des ISBN
+    rendus par un membre: on prend alors ses emprunts non clos, le plus
+    ancien d'abord, et un ISBN répété vise autant d'emprunts distincts.
+    À appeler dans une transaction: les lignes lues sont verrouillées là
+    où le moteur le permet.
+    """
+    emprunts = Emprunt.objects.select_for_update(of=('self',)).order_by('date_emprunt', 'id')
+    if ids is not None:
+        trouves = {emprunt['id']: emprunt for emprunt in emprunts.filter(pk__in=ids).values(*CHAMPS_EMPRUNT)}
+        return [({'id': identifiant}, trouves.get(identifiant)) for identifiant in ids]
+
+    candidats = defaultdict(list)
+    for emprunt in emprunts.filter(
+        membre_id=membre_id, livre__isbn__in=isbns, statut__in=Emprunt.STATUTS_DETENTION
+    ).values(*CHAMPS_EMPRUNT, 'livre__isbn'):
+        candidats[emprunt['livre__isbn']].append(emprunt)
+    return [
+        ({'isbn': isbn}, candidats[isbn].pop(0) if candidats[isbn] else None)
+        for isbn in isbns
+    ]
+
+
+def _trier(references, erreur_statut):
+    """Sépare les emprunts à traiter des références en erreur, dans l'ordre de la demande."""
+    resultats, retenus = [], {}
+    for reference, emprunt in references:
+        if emprunt is None:
+            erreur = 'Emprunt introuvable'
+        elif emprunt['id'] in retenus:
+            erreur = 'Emprunt présent plusieurs fois dans la demande'
+        else:
+            erreur = erreur_statut(emprunt)
+        if erreur:
+            resultats.append({**reference, 'erreur': erreur})
+            continue
+        retenus[emprunt['id']] = emprunt
+        resultats.append({**reference, 'id': emprunt['id'], 'emprunt': emprunt})
+    return resultats, retenus
+
+
+def retourner_emprunts(ids=None, membre_id=None, isbns=None):
+    """Clôture plusieurs emprunts et rend leurs exemplaires; retourne un résultat par référence."""
+    aujourd_hui = timezone.now().date()
+    with transaction.atomic():
+        resultats, a_clore = _trier(
+            resoudre_emprunts(ids=ids, membre_id=membre_id, isbns=isbns),
+            lambda emprunt: (
+                None if emprunt['statut'] in Emprunt.STATUTS_DETENTION
+                else 'Ce livre a déjà été retourné'
+            ),
+        )
+        if a_clore:
+            Emprunt.objects.filter(pk__in=list(a_clore), statut__in=Emprunt.STATUTS_DETENTION).update(
+                statut='retourne', date_retour_effective=aujourd_hui
+            )
+            for statut, nombre in Counter(emprunt['statut'] for emprunt in a_clore.values()).items():
+                CompteurEmprunt.ajuster(statut, -nombre)
+            CompteurEmprunt.ajuster('retourne', len(a_clore))
+            Livre.liberer_exemplaires_lot(Counter(emprunt['livre_id'] for emprunt in a_clore.values()))
+            VersionTable.incrementer('emprunt')
+
+    for resultat in resultats:
+        if resultat.pop('emprunt', None) is not None:
+            resultat.update(statut='retourne', date_retour_effective=aujourd_hui)
+    return resultats
+
+
+def prolonger_emprunts(jours, ids=None, membre_id=None, isbns=None):
+    """Repousse l'échéance de plusieurs emprunts; retourne un résultat par référence."""
+    aujourd_hui = timezone.now().date()
+    with transaction.atomic():
+        resultats, a_prolonger = _trier(
+            resoudre_emprunts(ids=ids, membre_id=membre_id, isbns=isbns),
+            lambda emprunt: (
+                'Impossible de prolonger un emprunt retourné' if emprunt['statut'] == 'retourne' else None
+            ),
+        )
+        par_echeance = defaultdict(list)
+        for emprunt in a_prolonger.values():
+            par_echeance[emprunt['date_retour_prevue']].append(emprunt['id'])
+
+        passes_en_retard = 0
+        for echeance, identifiants in par_echeance.items():
+            nouvelle = echeance + timedelta(days=jours)
+            if nouvelle < aujourd_hui:
+                # Comme Emprunt.save(): un emprunt en cours toujours échu passe en retard.
+                jours_retard = (aujourd_hui - nouvelle).days
+                passes_en_retard += Emprunt.objects.filter(
+                    pk__in=identifiants, statut='en_cours', date_retour_prevue=echeance
+                ).update(
+                    date_retour_prevue=nouvelle,
+                    statut='retard',
+                    nombre_jours_retard=jours_retard,
+                    amende=Emprunt.calculer_amende(jours_retard),
+                )
+            Emprunt.objects.filter(pk__in=identifiants, date_retour_prevue=echeance).update(
+                date_retour_prevue=nouvelle
+            )
+
+        CompteurEmprunt.ajuster('en_cours', -passes_en_retard)
+        CompteurEmprunt.ajuster('retard', passes_en_retard)
+        if a_prolonger:
+            VersionTable.incrementer('emprunt')
+
+    for resultat in resultats:
+        emprunt = resultat.pop('emprunt', None)
+        if emprunt is None:
+            continue
+        nouvelle = emprunt['date_retour_prevue'] + timedelta(days=jours)
+        statut = emprunt['statut']
+        if statut == 'en_cours' and nouvelle < aujourd_hui:
+            statut = 'retard'
+        resultat.update(statut=statut, date_retour_prevue=nouvelle)
+    return resultats
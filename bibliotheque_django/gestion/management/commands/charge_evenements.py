@@ -0,0 +1,76 @@
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from gestion.evenements import flux_async, surveillant
+from gestion.models import VersionTable
+
+
+def _incrementer():
+    with transaction.atomic():
+        VersionTable.incrementer('emprunt')
+
+
+class Command(BaseCommand):
+    help = (
+        "Ouvre N abonnés au flux d'événements dans ce processus, provoque des "
+        "changements et mesure la latence de diffusion et la mémoire par abonné."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--abonnes', type=int, default=500, help="Nombre d'abonnés simultanés.")
+        parser.add_argument('--changements', type=int, default=5, help='Nombre de changements diffusés.')
+        parser.add_argument('--delai', type=float, default=10.0, help='Attente maximale par changement (s).')
+
+    def handle(self, *args, **options):
+        if options['abonnes'] < 1 or options['changements'] < 1:
+            raise CommandError('--abonnes et --changements doivent être positifs.')
+        asyncio.run(self.mesurer(options['abonnes'], options['changements'], options['delai']))
+
+    async def mesurer(self, nombre, changements, delai):
+        tracemalloc.start()
+        avant = tracemalloc.get_traced_memory()[0]
+        flux = [flux_async() for _ in range(nombre)]
+        # Premier message (retry:) de chaque flux: l'abonné est alors inscrit.
+        for generateur in flux:
+            await generateur.__anext__()
+        memoire = (tracemalloc.get_traced_memory()[0] - avant) / nombre
+        tracemalloc.stop()
+        self.stdout.write(f'{len(surveillant.abonnes)} abonnés ouverts, {memoire / 1024:.1f} Kio par abonné.')
+
+        latences = []
+        try:
+            for _ in range(changements):
+                debut = time.perf_counter()
+                await sync_to_async(_incrementer)()
+                recus = await asyncio.wait_for(
+                    asyncio.gather(*(self._prochain_evenement(generateur) for generateur in flux)),
+                    timeout=delai,
+                )
+                latences.append(time.perf_counter() - debut)
+                if any(not message.startswith('event: emprunts') for message in recus):
+                    raise CommandError('Un abonné a reçu un message inattendu.')
+        except asyncio.TimeoutError:
+            raise CommandError(f'Changement non reçu par tous les abonnés en {delai} s.')
+        finally:
+            for generateur in flux:
+                await generateur.aclose()
+
+        self.stdout.write(
+            f'Diffusion à {nombre} abonnés: médiane {statistics.median(latences) * 1000:.1f} ms, '
+            f'maximum {max(latences) * 1000:.1f} ms.'
+        )
+        self.stdout.write(self.style.SUCCESS('Charge supportée.'))
+
+    @staticmethod
+    async def _prochain_evenement(generateur):
+        # Les battements ne comptent pas: seul l'événement du changement est attendu.
+        while True:
+            message = await generateur.__anext__()
+            if not message.startswith(':'):
+                return message
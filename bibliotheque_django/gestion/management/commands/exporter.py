@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion.exportation import EXPORTS, FORMATS, TAILLE_BLOC, exporter
+
+
+class Command(BaseCommand):
+    help = "Exporte les emprunts, les membres ou les livres en CSV ou NDJSON, en continu."
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=sorted(EXPORTS), help='Table à exporter.')
+        parser.add_argument('--format', dest='format_fichier', choices=FORMATS, default='csv')
+        parser.add_argument('--debut', help='Première date incluse (AAAA-MM-JJ).')
+        parser.add_argument('--fin', help='Dernière date incluse (AAAA-MM-JJ).')
+        parser.add_argument('--statut', help='Ne garder que ce statut (emprunts et membres).')
+        parser.add_argument('--sortie', help='Fichier de sortie (sortie standard par défaut).')
+        parser.add_argument(
+            '--taille-bloc',
+            type=int,
+            default=TAILLE_BLOC,
+            help='Nombre de lignes lues par requête et écrites à la fois.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            flux = exporter(
+                options['table'],
+                options['format_fichier'],
+                debut=options['debut'],
+                fin=options['fin'],
+                statut=options['statut'],
+                taille_bloc=options['taille_bloc'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if not options['sortie']:
+            # Écriture directe, sans le préfixe de style ni les fins de ligne de self.stdout.
+            sys.stdout.writelines(flux)
+            return
+
+        try:
+            with open(options['sortie'], 'w', encoding='utf-8', newline='') as sortie:
+                sortie.writelines(flux)
+        except OSError as exc:
+            raise CommandError(f"Impossible d'écrire le fichier: {exc}")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from gestion.couvertures import ERREURS_IMAGE, generer_variantes
+from gestion.models import Livre
+
+
+class Command(BaseCommand):
+    help = "Crée les miniatures (WebP et JPEG) manquantes des couvertures de livres."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forcer', action='store_true', help='Recrée aussi les miniatures existantes.')
+
+    def handle(self, *args, **options):
+        originaux = (
+            Livre.objects.exclude(couverture='').exclude(couverture__isnull=True)
+            .order_by().values_list('couverture', flat=True).distinct()
+        )
+        fichiers = echecs = 0
+        for original in originaux.iterator():
+            try:
+                fichiers += generer_variantes(original, forcer=options['forcer'])
+            except ERREURS_IMAGE as exc:
+                echecs += 1
+                self.stderr.write(f'{original}: {exc}')
+
+        self.stdout.write(self.style.SUCCESS(f'{fichiers} miniature(s) écrite(s), {echecs} couverture(s) illisible(s).'))
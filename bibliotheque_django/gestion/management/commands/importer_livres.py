@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion.importation import FORMATS, TAILLE_LOT, format_depuis_nom, importer_livres, ligne_non_utf8
+
+
+class Command(BaseCommand):
+    help = "Importe un catalogue de livres (CSV ou NDJSON) en fusionnant sur l'ISBN."
+
+    def add_arguments(self, parser):
+        parser.add_argument('chemin', help='Fichier à importer.')
+        parser.add_argument(
+            '--format',
+            dest='format_fichier',
+            choices=FORMATS,
+            help="Format du fichier (déduit de l'extension par défaut).",
+        )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=TAILLE_LOT,
+            help='Nombre de lignes validées et écrites par transaction.',
+        )
+
+    def handle(self, *args, **options):
+        format_fichier = options['format_fichier'] or format_depuis_nom(options['chemin'])
+        try:
+            with open(options['chemin'], 'rb') as flux_binaire:
+                ligne = ligne_non_utf8(flux_binaire)
+            if ligne is not None:
+                raise CommandError(f"Le fichier doit être encodé en UTF-8 (ligne {ligne}), rien n'a été importé.")
+            with open(options['chemin'], encoding='utf-8-sig', newline='') as flux:
+                rapport = importer_livres(flux, format_fichier, taille_lot=options['taille_lot'])
+        except OSError as exc:
+            raise CommandError(f'Impossible de lire le fichier: {exc}')
+
+        for erreur in rapport['erreurs']:
+            self.stderr.write(f"Ligne {erreur['ligne']}: {erreur['erreurs']}")
+        self.stdout.write(
+            f"{rapport['lignes']} ligne(s): {rapport['crees']} créé(s), "
+            f"{rapport['mis_a_jour']} mis à jour, {rapport['nombre_erreurs']} erreur(s) "
+            f"en {rapport['duree']}s ({rapport['lignes_par_seconde']} lignes/s)"
+        )
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from gestion import sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintenance de la base SQLite: statistiques du planificateur (ANALYZE), "
+        "checkpoint du journal WAL, optimisation de l'index plein texte, VACUUM. "
+        "Sans option: ANALYZE, optimisation FTS et checkpoint. Les déclencheurs "
+        "de l'index plein texte sont toujours vérifiés."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--analyze', action='store_true', help='Exécute ANALYZE.')
+        parser.add_argument('--fts', action='store_true', help="Optimise l'index plein texte.")
+        parser.add_argument(
+            '--reparer-fts',
+            action='store_true',
+            help="Recrée les déclencheurs de l'index plein texte et reconstruit l'index.",
+        )
+        parser.add_argument('--checkpoint', action='store_true', help='Reporte et tronque le journal WAL.')
+        parser.add_argument(
+            '--vacuum',
+            action='store_true',
+            help='Reconstruit le fichier (bloque les écritures pendant toute la durée).',
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if connections[alias].vendor != 'sqlite':
+            raise CommandError('Cette commande ne concerne que SQLite.')
+
+        etapes = [nom for nom in ('analyze', 'fts', 'checkpoint', 'vacuum') if options[nom]]
+        if not etapes:
+            etapes = ['analyze', 'fts', 'checkpoint']
+
+        avant = sqlite.etat(alias)
+        self.stdout.write(
+            f"Base: {avant['taille'] / 1024 / 1024:.1f} Mio, "
+            f"{avant['pages_libres']} page(s) libre(s), journal {avant['journal_mode']}"
+        )
+        manquants = sqlite.declencheurs_fts_manquants(alias)
+        if options['reparer_fts']:
+            if not sqlite.reparer_fts(alias):
+                raise CommandError("Pas d'index plein texte dans cette base: appliquer les migrations.")
+            self.stdout.write("Déclencheurs de l'index plein texte recréés, index reconstruit.")
+        elif manquants:
+            self.stdout.write(self.style.ERROR(
+                f"Déclencheurs de l'index plein texte absents ({', '.join(manquants)}): "
+                "la recherche renvoie des résultats périmés. Relancer avec --reparer-fts."
+            ))
+        if 'analyze' in etapes:
+            sqlite.analyser(alias)
+            self.stdout.write('ANALYZE terminé.')
+        if 'fts' in etapes:
+            if sqlite.optimiser_fts(alias):
+                self.stdout.write('Index plein texte optimisé.')
+        if 'vacuum' in etapes:
+            sqlite.vacuum(alias)
+            apres = sqlite.etat(alias)
+            self.stdout.write(f"VACUUM terminé: {apres['taille'] / 1024 / 1024:.1f} Mio.")
+        if 'checkpoint' in etapes and avant['journal_mode'] != 'wal':
+            self.stdout.write('Pas de checkpoint: la base n\'est pas en mode WAL.')
+        elif 'checkpoint' in etapes:
+            bloque, pages_journal, reportees = sqlite.checkpoint(alias)
+            if bloque:
+                self.stdout.write(self.style.WARNING('Checkpoint incomplet: des lecteurs sont encore actifs.'))
+            self.stdout.write(f'Checkpoint: {reportees}/{pages_journal} page(s) du journal reportée(s).')
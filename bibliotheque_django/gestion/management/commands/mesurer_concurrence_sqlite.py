@@ -0,0 +1,119 @@
+"""
+Débit en lecture et écriture concurrentes, avec et sans le profil SQLite de
+production. Chaque profil travaille sur sa propre base fichier temporaire:
+la base configurée n'est jamais touchée.
+
+Les fonctions de travail sont exécutées dans des processus neufs (spawn),
+qui configurent Django eux-mêmes: ce module ne doit donc rien importer de
+Django au-delà de ce qui fonctionne sans configuration.
+"""
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILS = (('défaut', False), ('production', True))
+LIVRES = 50
+
+
+def _initialiser(chemin, production):
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings'
+    os.environ['DJANGO_SQLITE_PRODUCTION'] = 'True' if production else 'False'
+    os.environ['DJANGO_DB_REPLICAS'] = ''
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = chemin
+    django.setup()
+
+
+def _preparer(chemin, production):
+    _initialiser(chemin, production)
+    from django.core.management import call_command
+    from gestion.models import Livre, Membre
+
+    call_command('migrate', verbosity=0)
+    Livre.objects.bulk_create(
+        Livre(
+            titre=f'Livre {i}', auteur='Auteur', isbn=f'978{i:010d}', editeur='Éditeur',
+            annee=2000, genre='Romans', total=1000, disponible=1000,
+        )
+        for i in range(LIVRES)
+    )
+    return Membre.objects.create(nom='Mesure', email='mesure@exemple.invalid').pk
+
+
+def _travailler(chemin, production, role, numero, membre_id, depart, duree):
+    """Lecteur (pages de la liste) ou écrivain (lecture puis emprunt, puis retour) pendant `duree` s."""
+    _initialiser(chemin, production)
+    import datetime
+
+    from django.db import OperationalError, transaction
+    from gestion.models import Emprunt, Livre
+
+    operations = erreurs = 0
+    depart.wait()
+    fin = time.monotonic() + duree
+    while time.monotonic() < fin:
+        livre_id = 1 + (operations + numero) % LIVRES
+        try:
+            if role == 'lecteur':
+                list(Livre.objects.values('id', 'titre', 'disponible')[:50])
+            else:
+                with transaction.atomic():
+                    # Lecture puis écriture dans la même transaction, comme une vue d'emprunt.
+                    Livre.objects.filter(pk=livre_id, disponible__gt=0).exists()
+                    emprunt = Emprunt.objects.create(
+                        livre_id=livre_id, membre_id=membre_id, date_retour_prevue=datetime.date(2099, 1, 1),
+                    )
+                emprunt.retourner()
+            operations += 1
+        except OperationalError:
+            # "database is locked": l'opération est perdue.
+            erreurs += 1
+    return role, operations, erreurs
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le débit de lectures et d'écritures concurrentes (plusieurs processus) "
+        "sur une base SQLite temporaire, avec le profil par défaut puis le profil de production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lecteurs', type=int, default=4, help='Processus qui lisent.')
+        parser.add_argument('--ecrivains', type=int, default=4, help='Processus qui écrivent.')
+        parser.add_argument('--duree', type=float, default=8.0, help='Durée de chaque mesure (s).')
+
+    def handle(self, *args, **options):
+        lecteurs, ecrivains, duree = options['lecteurs'], options['ecrivains'], options['duree']
+        if lecteurs < 0 or ecrivains < 0 or lecteurs + ecrivains == 0 or duree <= 0:
+            raise CommandError('Il faut au moins un processus et une durée positive.')
+        roles = ['lecteur'] * lecteurs + ['ecrivain'] * ecrivains
+        contexte = multiprocessing.get_context('spawn')
+
+        for nom, production in PROFILS:
+            with tempfile.TemporaryDirectory() as dossier:
+                chemin = str(Path(dossier) / 'mesure.sqlite3')
+                with contexte.Pool(1) as pool:
+                    membre_id = pool.apply(_preparer, (chemin, production))
+                with contexte.Manager() as gestionnaire:
+                    depart = gestionnaire.Barrier(len(roles))
+                    with contexte.Pool(len(roles)) as pool:
+                        resultats = pool.starmap(
+                            _travailler,
+                            [
+                                (chemin, production, role, numero, membre_id, depart, duree)
+                                for numero, role in enumerate(roles)
+                            ],
+                        )
+            lectures = sum(operations for role, operations, _ in resultats if role == 'lecteur')
+            ecritures = sum(operations for role, operations, _ in resultats if role == 'ecrivain')
+            erreurs = sum(erreurs for _, _, erreurs in resultats)
+            self.stdout.write(
+                f'Profil {nom}: {lectures / duree:.0f} lectures/s, {ecritures / duree:.0f} écritures/s, '
+                f'{erreurs} erreur(s) "database is locked".'
+            )
@@ -0,0 +1,89 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from gestion.views import _authentifier, _comptes_candidats, _trouver_compte
+
+MOT_DE_PASSE = 'mesure-connexion'
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure la connexion sur une table de N comptes temporaires (annulés à la fin): "
+        "recherche du compte, puis connexion réussie, mot de passe faux, compte inconnu et prénom."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--utilisateurs', type=int, default=100_000, help='Nombre de comptes créés.')
+        parser.add_argument('--recherches', type=int, default=200, help='Recherches de compte mesurées.')
+        parser.add_argument('--connexions', type=int, default=5, help='Connexions mesurées par cas.')
+
+    def handle(self, *args, **options):
+        if min(options['utilisateurs'], options['recherches'], options['connexions']) < 1:
+            raise CommandError('Les nombres doivent être positifs.')
+        with transaction.atomic():
+            try:
+                self._mesurer(options['utilisateurs'], options['recherches'], options['connexions'])
+            finally:
+                transaction.set_rollback(True)
+
+    def _mesurer(self, nombre, recherches, connexions):
+        # Un seul hash calculé pour tous les comptes: seule la table compte ici.
+        prefixe = f'mesure-{uuid.uuid4().hex[:8]}'
+        hash_commun = make_password(MOT_DE_PASSE)
+        User = get_user_model()
+        debut = time.perf_counter()
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f'{prefixe}-{i}', email=f'{prefixe}-{i}@exemple.invalid', password=hash_commun,
+                    # Prénom très répandu: l'ancienne connexion vérifiait chaque homonyme.
+                    first_name='Marie' if i % 4 == 0 else f'Prenom{i}',
+                )
+                for i in range(nombre)
+            ),
+            batch_size=5000,
+        )
+        self.stdout.write(f'{nombre} comptes créés en {time.perf_counter() - debut:.1f} s.')
+
+        identifiant = f'{prefixe}-{nombre // 2}@exemple.invalid'
+        if connection.vendor == 'sqlite':
+            sql, parametres = _comptes_candidats(identifiant)[:1].query.sql_with_params()
+            with connection.cursor() as curseur:
+                curseur.execute(f'EXPLAIN QUERY PLAN {sql}', parametres)
+                plan = [ligne[-1] for ligne in curseur.fetchall()]
+            self.stdout.write('Plan: ' + ' | '.join(plan))
+            if any(ligne.startswith(f'SCAN {User._meta.db_table}') for ligne in plan):
+                raise CommandError('La recherche du compte parcourt toute la table des utilisateurs.')
+
+        durees = []
+        for i in range(recherches):
+            cible = f'{prefixe}-{(i * 7919) % nombre}'
+            debut = time.perf_counter()
+            _trouver_compte(cible)
+            durees.append(time.perf_counter() - debut)
+        self.stdout.write(f'Recherche du compte: médiane {self._ms(durees)}, maximum {max(durees) * 1000:.2f} ms.')
+
+        for cas, identifiant_cas, mot_de_passe, attendu in (
+            ('mot de passe correct', identifiant.upper(), MOT_DE_PASSE, True),
+            ('mot de passe faux', identifiant, 'faux', False),
+            ('compte inconnu', f'{prefixe}-inconnu', MOT_DE_PASSE, False),
+            ('prénom', 'marie', MOT_DE_PASSE, False),
+        ):
+            durees = []
+            for _ in range(connexions):
+                debut = time.perf_counter()
+                resultat = _authentifier(identifiant_cas.lower(), mot_de_passe)
+                durees.append(time.perf_counter() - debut)
+                if (resultat is not None) != attendu:
+                    raise CommandError(f'Connexion ({cas}): résultat inattendu.')
+            self.stdout.write(f'Connexion, {cas}: médiane {self._ms(durees)}.')
+
+    @staticmethod
+    def _ms(durees):
+        return f'{statistics.median(durees) * 1000:.2f} ms'
@@ -0,0 +1,90 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from gestion.filters import RechercheLivreFilter, fts_disponible
+from gestion.models import Livre
+from gestion.views import LivreViewSet
+
+# Quelques mots répandus (un livre sur dix environ) et un vocabulaire plus rare.
+MOTS_FREQUENTS = ('jardin', 'nuit', 'histoire', 'voyage', 'rivière')
+VOCABULAIRE = tuple(f'terme{n}' for n in range(3000))
+GENRES = [code for code, _ in Livre.GENRE_CHOICES]
+TAILLE_PAGE = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare la recherche du catalogue par l'index FTS5 (RechercheLivreFilter) et par "
+        "SearchFilter (LIKE sur search_fields) sur N livres temporaires, annulés à la fin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--livres', type=int, default=50_000, help='Nombre de livres créés.')
+        parser.add_argument('--repetitions', type=int, default=5, help='Mesures par terme et par filtre.')
+
+    def handle(self, *args, **options):
+        if options['livres'] < 1 or options['repetitions'] < 1:
+            raise CommandError('Les nombres doivent être positifs.')
+        if not fts_disponible(DEFAULT_DB_ALIAS):
+            raise CommandError("Pas d'index plein texte dans cette base: appliquer les migrations.")
+        with transaction.atomic():
+            try:
+                self._mesurer(options['livres'], options['repetitions'])
+            finally:
+                transaction.set_rollback(True)
+
+    def _mesurer(self, nombre, repetitions):
+        hasard = random.Random(0)
+        prefixe = uuid.uuid4().int % 10 ** 5
+        debut = time.perf_counter()
+        Livre.objects.bulk_create(
+            (
+                Livre(
+                    titre=' '.join(self._mots(hasard, 3)).capitalize(), auteur=f'Auteur {i % 997}',
+                    isbn=f'{prefixe:05d}{i:08d}', editeur=f'Éditions {i % 50}', annee=1950 + i % 70,
+                    genre=GENRES[i % len(GENRES)], description=' '.join(self._mots(hasard, 20)),
+                )
+                for i in range(nombre)
+            ),
+            batch_size=2000,
+        )
+        # Statistiques à jour, comme après maintenance_sqlite.
+        with connections[DEFAULT_DB_ALIAS].cursor() as curseur:
+            curseur.execute('ANALYZE')
+        self.stdout.write(f'{nombre} livres créés et indexés en {time.perf_counter() - debut:.1f} s.')
+
+        vue = LivreViewSet()
+        fabrique = APIRequestFactory()
+        for terme in ('jardin', 'jardin nuit', 'riv', 'terme1234', 'auteur 42', 'introuvable'):
+            requete = Request(fabrique.get('/', {'search': terme}))
+            resultats = {}
+            for nom, filtre in (('FTS5', RechercheLivreFilter()), ('SearchFilter', filters.SearchFilter())):
+                durees = []
+                for _ in range(repetitions):
+                    debut = time.perf_counter()
+                    # Comme une page de la liste: le nombre de résultats, puis la première page.
+                    queryset = filtre.filter_queryset(requete, Livre.objects.all(), vue)
+                    total = queryset.count()
+                    list(queryset[:TAILLE_PAGE])
+                    durees.append(time.perf_counter() - debut)
+                resultats[nom] = (statistics.median(durees), total)
+            (fts, total_fts), (like, total_like) = resultats['FTS5'], resultats['SearchFilter']
+            self.stdout.write(
+                f'"{terme}": FTS5 {fts * 1000:.1f} ms ({total_fts} résultats), '
+                f'SearchFilter {like * 1000:.1f} ms ({total_like} résultats), x{like / fts:.1f}'
+            )
+
+    @staticmethod
+    def _mots(hasard, nombre):
+        return [
+            hasard.choice(MOTS_FREQUENTS if hasard.random() < 0.025 else VOCABULAIRE)
+            for _ in range(nombre)
+        ]
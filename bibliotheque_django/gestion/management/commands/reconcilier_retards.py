@@ -0,0 +1,40 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion.retards import TAILLE_LOT_ECHEANCES, reconcilier_retards
+
+
+class Command(BaseCommand):
+    help = "Met à jour le statut, les jours de retard et l'amende de tous les emprunts échus."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help="Date de référence au format AAAA-MM-JJ (aujourd'hui par défaut).",
+        )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=TAILLE_LOT_ECHEANCES,
+            help="Nombre de dates d'échéance traitées par transaction.",
+        )
+
+    def handle(self, *args, **options):
+        aujourd_hui = None
+        if options['date']:
+            try:
+                aujourd_hui = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('Date invalide, format attendu: AAAA-MM-JJ')
+
+        debut = time.monotonic()
+        resultat = reconcilier_retards(aujourd_hui=aujourd_hui, taille_lot=options['taille_lot'])
+        duree = time.monotonic() - debut
+
+        self.stdout.write(
+            f"{resultat['echeances']} échéance(s), "
+            f"{resultat['passes_en_retard']} emprunt(s) passé(s) en retard, "
+            f"{resultat['actualises']} retard(s) actualisé(s) en {duree:.2f}s"
+        )
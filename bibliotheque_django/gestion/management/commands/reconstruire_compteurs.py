@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from gestion.models import CompteurEmprunt, Emprunt
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs d'emprunts par statut depuis la table des emprunts."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            comptes = CompteurEmprunt.reconstruire()
+
+        for statut, _ in Emprunt.STATUT_CHOICES:
+            self.stdout.write(f"{statut}: {comptes.get(statut, 0)}")
+        self.stdout.write(self.style.SUCCESS('Compteurs reconstruits.'))
@@ -0,0 +1,122 @@
+import re
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from gestion.models import Emprunt, Livre, Membre
+from gestion.views import (
+    EmpruntViewSet,
+    LivreViewSet,
+    MembreViewSet,
+    dashboard_api,
+)
+
+# Parcours complet d'une table, sans index (plan SQLite: "SCAN gestion_livre").
+# Seules les tables qui grandissent comptent: les compteurs tiennent en quelques lignes.
+SCAN_COMPLET = re.compile(
+    r'\bSCAN ({})$'.format('|'.join(modele._meta.db_table for modele in (Livre, Membre, Emprunt)))
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Exécute les lectures de l'API (listes, actions, tableau de bord) et vérifie "
+        "avec EXPLAIN QUERY PLAN qu'aucune ne parcourt entièrement une table."
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Vérification disponible uniquement sur SQLite.')
+
+        self.regressions = []
+        self.nombre = 0
+        # Comptes et fiches temporaires, annulés à la fin de la vérification,
+        # qu'elle réussisse ou non.
+        with transaction.atomic():
+            try:
+                self._verifier_tout()
+            finally:
+                transaction.set_rollback(True)
+
+        if self.regressions:
+            for nom, sql, ligne in self.regressions:
+                self.stderr.write(f'{nom}: {ligne}\n    {sql}')
+            raise CommandError(f'{len(self.regressions)} requête(s) sans index sur {self.nombre} vérifiée(s).')
+        self.stdout.write(self.style.SUCCESS(f'{self.nombre} requête(s) vérifiée(s), aucun parcours complet.'))
+
+    def _verifier_tout(self):
+        # Valeurs uniques: la base vérifiée peut contenir n'importe quelles fiches.
+        unique = uuid.uuid4()
+        User = get_user_model()
+        staff = User.objects.create_user(f'plans-staff-{unique.hex}', is_staff=True)
+        usager = User.objects.create_user(f'plans-usager-{unique.hex}')
+        livre = Livre.objects.create(
+            titre='Plan', auteur='Plan', isbn=f'{unique.int % 10 ** 13:013d}', editeur='Plan',
+            annee=2000, genre='Romans',
+        )
+        membre = Membre.objects.create(nom='Plan', email=f'plans-{unique.hex}@example.invalid', utilisateur=usager)
+        Emprunt.objects.create(livre=livre, membre=membre, date_retour_prevue=timezone.now().date())
+        # Ces fiches changent les versions des tables: aucune lecture ci-dessous
+        # n'est servie par le cache des réponses, toutes atteignent la base.
+
+        lectures = [
+            (staff, LivreViewSet, 'list', {}, {}),
+            (staff, LivreViewSet, 'list', {'search': 'plan'}, {}),
+            (staff, LivreViewSet, 'list', {'pagination': 'curseur'}, {}),
+            (staff, LivreViewSet, 'list', {'genre': 'Romans'}, {}),
+            (staff, LivreViewSet, 'list', {'annee_min': 1990, 'annee_max': 2000}, {}),
+            (staff, LivreViewSet, 'list', {'note_min': 4}, {}),
+            (staff, LivreViewSet, 'facettes', {}, {}),
+            (staff, LivreViewSet, 'retrieve', {}, {'pk': livre.pk}),
+            (staff, LivreViewSet, 'disponibles', {}, {}),
+            (staff, LivreViewSet, 'empruntes', {}, {}),
+            (staff, MembreViewSet, 'list', {}, {}),
+            (staff, MembreViewSet, 'actifs', {}, {}),
+            (staff, MembreViewSet, 'emprunts_actuels', {}, {'pk': membre.pk}),
+            (staff, EmpruntViewSet, 'list', {}, {}),
+            (staff, EmpruntViewSet, 'list', {'pagination': 'curseur'}, {}),
+            (staff, EmpruntViewSet, 'list', {'statut': 'retard'}, {}),
+            (staff, EmpruntViewSet, 'list', {'date_retour_prevue_before': '2000-01-01'}, {}),
+            (staff, EmpruntViewSet, 'facettes', {}, {}),
+            (staff, EmpruntViewSet, 'en_cours', {}, {}),
+            (staff, EmpruntViewSet, 'en_retard', {}, {}),
+            (staff, EmpruntViewSet, 'statistiques', {}, {}),
+            (usager, MembreViewSet, 'list', {}, {}),
+            (usager, EmpruntViewSet, 'list', {}, {}),
+            (usager, EmpruntViewSet, 'statistiques', {}, {}),
+        ]
+        fabrique = APIRequestFactory()
+        for utilisateur, viewset, action, parametres, kwargs in lectures:
+            requete = fabrique.get('/', parametres)
+            requete.session = {}
+            force_authenticate(requete, user=utilisateur)
+            vue = viewset.as_view({'get': action})
+            nom = f'{viewset.__name__}.{action} {parametres or ""} ({utilisateur.username})'
+            self._verifier(nom, lambda: vue(requete, **kwargs).render())
+
+        requete = fabrique.get('/')
+        requete.user = staff
+        self._verifier('dashboard_api', lambda: dashboard_api(requete))
+
+    def _verifier(self, nom, appel):
+        with CaptureQueriesContext(connection) as requetes:
+            reponse = appel()
+        if reponse.status_code != 200:
+            raise CommandError(f'{nom}: réponse {reponse.status_code}')
+
+        for requete in requetes.captured_queries:
+            sql = requete['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            self.nombre += 1
+            with connection.cursor() as curseur:
+                curseur.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = [ligne[-1] for ligne in curseur.fetchall()]
+            for ligne in plan:
+                if SCAN_COMPLET.search(ligne):
+                    self.regressions.append((nom, sql, ligne))
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+STATUTS = ['en_cours', 'retard', 'retourne', 'perdu']
+
+
+def initialiser_compteurs(apps, schema_editor):
+    Emprunt = apps.get_model('gestion', 'Emprunt')
+    CompteurEmprunt = apps.get_model('gestion', 'CompteurEmprunt')
+    comptes = dict(Emprunt.objects.order_by().values_list('statut').annotate(n=Count('id')))
+    CompteurEmprunt.objects.bulk_create([
+        CompteurEmprunt(statut=statut, total=comptes.get(statut, 0)) for statut in STATUTS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0002_livre_couverture'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompteurEmprunt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('statut', models.CharField(choices=[('en_cours', 'En cours'), ('retard', 'En retard'), ('retourne', 'Retourné'), ('perdu', 'Perdu')], max_length=20, unique=True)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': "Compteurs d'emprunts",
+            },
+        ),
+        migrations.RunPython(initialiser_compteurs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0003_compteuremprunt'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emprunt',
+            index=models.Index(fields=['statut', 'date_retour_prevue'], name='emprunt_statut_echeance_idx'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+from django.db import migrations
+
+# Les déclencheurs ci-dessous tiennent l'index à jour et sont du SQL brut sur
+# gestion_livre: une migration qui fait recréer la table par SQLite (AlterField,
+# RemoveField...) les supprime sans le dire. Après une telle migration, lancer
+# `manage.py maintenance_sqlite --reparer-fts`; `manage.py check --database default`
+# et maintenance_sqlite signalent les déclencheurs manquants (gestion/sqlite.py).
+
+COLONNES = ['titre', 'auteur', 'isbn', 'genre', 'editeur', 'description']
+
+CREATION_SQL = [
+    """
+    CREATE VIRTUAL TABLE gestion_livre_fts USING fts5(
+        {colonnes},
+        content='gestion_livre',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """.format(colonnes=', '.join(COLONNES)),
+    """
+    CREATE TRIGGER gestion_livre_fts_ai AFTER INSERT ON gestion_livre BEGIN
+        INSERT INTO gestion_livre_fts(rowid, {colonnes}) VALUES (new.id, {nouvelles});
+    END
+    """.format(colonnes=', '.join(COLONNES), nouvelles=', '.join(f'new.{c}' for c in COLONNES)),
+    """
+    CREATE TRIGGER gestion_livre_fts_ad AFTER DELETE ON gestion_livre BEGIN
+        INSERT INTO gestion_livre_fts(gestion_livre_fts, rowid, {colonnes}) VALUES ('delete', old.id, {anciennes});
+    END
+    """.format(colonnes=', '.join(COLONNES), anciennes=', '.join(f'old.{c}' for c in COLONNES)),
+    # Seules les colonnes indexées déclenchent la réindexation: les mouvements
+    # d'exemplaires (disponible) ne touchent pas à l'index.
+    """
+    CREATE TRIGGER gestion_livre_fts_au AFTER UPDATE OF {colonnes} ON gestion_livre BEGIN
+        INSERT INTO gestion_livre_fts(gestion_livre_fts, rowid, {colonnes}) VALUES ('delete', old.id, {anciennes});
+        INSERT INTO gestion_livre_fts(rowid, {colonnes}) VALUES (new.id, {nouvelles});
+    END
+    """.format(
+        colonnes=', '.join(COLONNES),
+        anciennes=', '.join(f'old.{c}' for c in COLONNES),
+        nouvelles=', '.join(f'new.{c}' for c in COLONNES),
+    ),
+    "INSERT INTO gestion_livre_fts(gestion_livre_fts) VALUES ('rebuild')",
+]
+
+SUPPRESSION_SQL = [
+    'DROP TRIGGER IF EXISTS gestion_livre_fts_au',
+    'DROP TRIGGER IF EXISTS gestion_livre_fts_ad',
+    'DROP TRIGGER IF EXISTS gestion_livre_fts_ai',
+    'DROP TABLE IF EXISTS gestion_livre_fts',
+]
+
+
+def creer_index_fts(apps, schema_editor):
+    # Index plein texte propre à SQLite; les autres moteurs gardent SearchFilter.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATION_SQL:
+        schema_editor.execute(sql)
+
+
+def supprimer_index_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in SUPPRESSION_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0004_emprunt_statut_echeance_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(creer_index_fts, supprimer_index_fts),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0005_livre_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emprunt',
+            index=models.Index(fields=['-date_emprunt', '-id'], name='emprunt_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='livre',
+            index=models.Index(fields=['-date_ajout', '-id'], name='livre_date_ajout_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membre',
+            index=models.Index(fields=['-date_inscription', '-id'], name='membre_date_inscr_id_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def initialiser_versions(apps, schema_editor):
+    VersionTable = apps.get_model('gestion', 'VersionTable')
+    VersionTable.objects.bulk_create([
+        VersionTable(table=table, version=1) for table in ('livre', 'membre', 'emprunt')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0006_index_pagination_curseur'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionTable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=50, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+                ('date_modification', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Versions des tables',
+            },
+        ),
+        migrations.RunPython(initialiser_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import migrations
+
+# Index sur l'identifiant normalisé (minuscules) des comptes: la connexion
+# retrouve son unique candidat par LOWER(username) ou LOWER(email) sans
+# parcourir la table des utilisateurs.
+INDEX = (
+    ('gestion_user_username_lower_idx', 'username'),
+    ('gestion_user_email_lower_idx', 'email'),
+)
+
+
+def creer_index(apps, schema_editor):
+    table = apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+    quote = schema_editor.quote_name
+    for nom, colonne in INDEX:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(nom)} ON {quote(table)} (LOWER({quote(colonne)}))'
+        )
+
+
+def supprimer_index(apps, schema_editor):
+    for nom, _ in INDEX:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(nom)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('gestion', '0007_versiontable'),
+    ]
+
+    operations = [
+        migrations.RunPython(creer_index, supprimer_index),
+    ]
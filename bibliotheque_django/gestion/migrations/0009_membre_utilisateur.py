@@ -0,0 +1,36 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def rattacher_comptes(apps, schema_editor):
+    """Relie chaque membre au compte de même email (sans tenir compte de la casse)."""
+    Membre = apps.get_model('gestion', 'Membre')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    comptes = {}
+    for user_id, email in User.objects.exclude(email='').order_by('-pk').values_list('pk', 'email'):
+        comptes[email.lower()] = user_id
+    rattaches = []
+    for membre in Membre.objects.filter(utilisateur__isnull=True).only('pk', 'email'):
+        # pop: un compte ne peut être relié qu'à un seul membre.
+        membre.utilisateur_id = comptes.pop(membre.email.lower(), None)
+        if membre.utilisateur_id:
+            rattaches.append(membre)
+    Membre.objects.bulk_update(rattaches, ['utilisateur'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0008_index_identifiant_utilisateur'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='membre',
+            name='utilisateur',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='membre', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(rattacher_comptes, migrations.RunPython.noop),
+    ]
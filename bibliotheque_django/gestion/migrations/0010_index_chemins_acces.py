@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0009_membre_utilisateur'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emprunt',
+            index=models.Index(fields=['statut', '-date_emprunt'], name='emprunt_statut_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emprunt',
+            index=models.Index(fields=['membre', 'statut'], name='emprunt_membre_statut_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='livre',
+            index=models.Index(fields=['genre', '-date_ajout'], name='livre_genre_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='livre',
+            index=models.Index(fields=['disponible', 'total'], name='livre_disponible_total_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membre',
+            index=models.Index(fields=['statut', '-date_inscription'], name='membre_statut_date_idx'),
+        ),
+    ]
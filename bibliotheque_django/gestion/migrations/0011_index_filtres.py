@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0010_index_chemins_acces'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='livre',
+            index=models.Index(fields=['annee'], name='livre_annee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='livre',
+            index=models.Index(fields=['note'], name='livre_note_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emprunt',
+            index=models.Index(fields=['date_retour_prevue'], name='emprunt_echeance_idx'),
+        ),
+    ]
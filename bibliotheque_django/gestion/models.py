@@ -1,4 +1,12 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Least
+from django.core.exceptions import ValidationError
+from django.dispatch import Signal
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 
@@ -30,10 +38,71 @@ class Livre(models.Model):
     class Meta:
         ordering = ['-date_ajout']
         verbose_name_plural = "Livres"
+        indexes = [
+            models.Index(fields=['-date_ajout', '-id'], name='livre_date_ajout_id_idx'),
+            models.Index(fields=['genre', '-date_ajout'], name='livre_genre_date_idx'),
+            # Couvre les filtres sur la disponibilité et les sommes du tableau de bord.
+            models.Index(fields=['disponible', 'total'], name='livre_disponible_total_idx'),
+            # Filtres par intervalle (?annee_min=, ?note_min=...).
+            models.Index(fields=['annee'], name='livre_annee_idx'),
+            models.Index(fields=['note'], name='livre_note_idx'),
+        ]
     
     def __str__(self):
         return f"{self.titre} - {self.auteur}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Couverture telle qu'en base, pour ne préparer les variantes qu'au changement.
+        instance._couverture_initiale = instance.__dict__.get('couverture')
+        return instance
+
+    @classmethod
+    def reserver_exemplaire(cls, livre_id):
+        """Retire un exemplaire disponible en une seule requête conditionnelle.
+
+        Retourne False si plus aucun exemplaire n'est disponible.
+        """
+        reserve = bool(
+            cls.objects.filter(pk=livre_id, disponible__gt=0)
+            .update(disponible=F('disponible') - 1, date_modification=timezone.now())
+        )
+        if reserve:
+            VersionTable.incrementer('livre')
+        return reserve
+
+    @classmethod
+    def liberer_exemplaires(cls, livre_id, nombre=1):
+        """Rend des exemplaires sans jamais dépasser le total."""
+        liberes = (
+            cls.objects.filter(pk=livre_id, disponible__lt=F('total'))
+            .update(disponible=Least(F('disponible') + nombre, F('total')), date_modification=timezone.now())
+        )
+        if liberes:
+            VersionTable.incrementer('livre')
+        return liberes
+
+    @classmethod
+    def liberer_exemplaires_lot(cls, comptes):
+        """Rend des exemplaires de plusieurs livres ({livre_id: nombre}).
+
+        Une requête par nombre distinct d'exemplaires rendus, le plus souvent une seule.
+        """
+        par_nombre = defaultdict(list)
+        for livre_id, nombre in comptes.items():
+            par_nombre[nombre].append(livre_id)
+        maintenant = timezone.now()
+        liberes = 0
+        for nombre, livre_ids in par_nombre.items():
+            liberes += (
+                cls.objects.filter(pk__in=livre_ids, disponible__lt=F('total'))
+                .update(disponible=Least(F('disponible') + nombre, F('total')), date_modification=maintenant)
+            )
+        if liberes:
+            VersionTable.incrementer('livre')
+        return liberes
+
 
 class Membre(models.Model):
     STATUT_CHOICES = [
@@ -42,6 +111,14 @@ class Membre(models.Model):
         ('Inactif', 'Inactif'),
     ]
     
+    # Compte de l'usager: les endpoints côté usager filtrent par cette clé, pas par email.
+    utilisateur = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='membre',
+    )
     nom = models.CharField(max_length=200)
     email = models.EmailField(unique=True)
     telephone = models.CharField(max_length=20)
@@ -54,11 +131,20 @@ class Membre(models.Model):
     class Meta:
         ordering = ['-date_inscription']
         verbose_name_plural = "Membres"
+        indexes = [
+            models.Index(fields=['-date_inscription', '-id'], name='membre_date_inscr_id_idx'),
+            # Couvre aussi les comptes par statut et par date du tableau de bord.
+            models.Index(fields=['statut', '-date_inscription'], name='membre_statut_date_idx'),
+        ]
     
     def __str__(self):
         return self.nom
 
 
+class ExemplaireIndisponible(ValidationError):
+    """Levée quand un emprunt demande un livre dont aucun exemplaire n'est disponible."""
+
+
 class Emprunt(models.Model):
     STATUT_CHOICES = [
         ('en_cours', 'En cours'),
@@ -66,6 +152,8 @@ class Emprunt(models.Model):
         ('retourne', 'Retourné'),
         ('perdu', 'Perdu'),
     ]
+    # Statuts pour lesquels l'emprunt immobilise un exemplaire du livre.
+    STATUTS_DETENTION = ('en_cours', 'retard', 'perdu')
     
     livre = models.ForeignKey(Livre, on_delete=models.CASCADE, related_name='emprunts')
     membre = models.ForeignKey(Membre, on_delete=models.CASCADE, related_name='emprunts')
@@ -80,9 +168,34 @@ class Emprunt(models.Model):
     class Meta:
         ordering = ['-date_emprunt']
         verbose_name_plural = "Emprunts"
+        indexes = [
+            models.Index(fields=['statut', 'date_retour_prevue'], name='emprunt_statut_echeance_idx'),
+            models.Index(fields=['-date_emprunt', '-id'], name='emprunt_date_id_idx'),
+            models.Index(fields=['statut', '-date_emprunt'], name='emprunt_statut_date_idx'),
+            models.Index(fields=['membre', 'statut'], name='emprunt_membre_statut_idx'),
+            models.Index(fields=['date_retour_prevue'], name='emprunt_echeance_idx'),
+        ]
     
     def __str__(self):
         return f"{self.livre.titre} - {self.membre.nom} ({self.date_emprunt.date()})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Statut et livre tels qu'en base, pour suivre les transitions dans les signaux.
+        instance._statut_initial = instance.__dict__.get('statut')
+        instance._livre_initial = instance.__dict__.get('livre_id')
+        return instance
+    
+    def clean(self):
+        if self._state.adding and self.statut in self.STATUTS_DETENTION and self.livre_id:
+            if not Livre.objects.filter(pk=self.livre_id, disponible__gt=0).exists():
+                raise ValidationError({'livre': "Aucun exemplaire de ce livre n'est disponible."})
+
+    @staticmethod
+    def calculer_amende(jours_retard):
+        """Amende due pour un nombre de jours de retard."""
+        return (Decimal(settings.BIBLIO_AMENDE_PAR_JOUR) * jours_retard).quantize(Decimal('0.01'))
     
     def save(self, *args, **kwargs):
         # Vérifier les retards
@@ -90,4 +203,137 @@ class Emprunt(models.Model):
             self.statut = 'retard'
             jours_retard = (timezone.now().date() - self.date_retour_prevue).days
             self.nombre_jours_retard = jours_retard
-        super().save(*args, **kwargs)
+            self.amende = self.calculer_amende(jours_retard)
+        with transaction.atomic():
+            self._mouvement_exemplaire()
+            super().save(*args, **kwargs)
+        self._livre_initial = self.livre_id
+
+    def _mouvement_exemplaire(self):
+        """Réserve ou rend l'exemplaire quand l'emprunt commence ou cesse de le détenir.
+
+        Un emprunt actif qui change de livre rend l'exemplaire de l'ancien et
+        réserve un exemplaire du nouveau.
+        """
+        if self._state.adding:
+            detenait = False
+            livre_initial = self.livre_id
+        else:
+            statut_initial = getattr(self, '_statut_initial', None)
+            if statut_initial is None:
+                return
+            detenait = statut_initial in self.STATUTS_DETENTION
+            livre_initial = getattr(self, '_livre_initial', None) or self.livre_id
+        detient = self.statut in self.STATUTS_DETENTION
+
+        if detient and (not detenait or livre_initial != self.livre_id):
+            if not Livre.reserver_exemplaire(self.livre_id):
+                raise ExemplaireIndisponible("Aucun exemplaire de ce livre n'est disponible.")
+        if detenait and (not detient or livre_initial != self.livre_id):
+            Livre.liberer_exemplaires(livre_initial)
+
+    def retourner(self):
+        """Clôture l'emprunt et rend l'exemplaire dans une même transaction.
+
+        La mise à jour est conditionnelle: deux retours simultanés du même
+        emprunt ne rendent l'exemplaire qu'une fois. Retourne False si
+        l'emprunt était déjà clos.
+        """
+        aujourd_hui = timezone.now().date()
+        with transaction.atomic():
+            # Une mise à jour par statut: celle qui aboutit donne le statut
+            # réellement clos, qui a pu changer en base depuis le chargement
+            # (reconcilier_retards...). Le statut chargé est essayé d'abord.
+            statut_charge = getattr(self, '_statut_initial', None) or self.statut
+            for statut in sorted(self.STATUTS_DETENTION, key=lambda statut: statut != statut_charge):
+                if Emprunt.objects.filter(pk=self.pk, statut=statut).update(
+                    statut='retourne', date_retour_effective=aujourd_hui
+                ):
+                    break
+            else:
+                return False
+            Livre.liberer_exemplaires(self.livre_id)
+            CompteurEmprunt.ajuster(statut, -1)
+            CompteurEmprunt.ajuster('retourne', 1)
+            VersionTable.incrementer('emprunt')
+        self.statut = self._statut_initial = 'retourne'
+        self.date_retour_effective = aujourd_hui
+        return True
+
+
+class CompteurEmprunt(models.Model):
+    """Nombre d'emprunts par statut, tenu à jour par les signaux."""
+    statut = models.CharField(max_length=20, choices=Emprunt.STATUT_CHOICES, unique=True)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Compteurs d'emprunts"
+
+    def __str__(self):
+        return f"{self.statut}: {self.total}"
+
+    @classmethod
+    def ajuster(cls, statut, delta):
+        """Ajoute delta au compteur d'un statut sans relire la ligne."""
+        if not delta:
+            return
+        if not cls.objects.filter(statut=statut).update(total=F('total') + delta):
+            cls.objects.get_or_create(statut=statut)
+            cls.objects.filter(statut=statut).update(total=F('total') + delta)
+
+    @classmethod
+    def reconstruire(cls):
+        """Recalcule tous les compteurs depuis la table des emprunts."""
+        comptes = dict(
+            Emprunt.objects.order_by().values_list('statut').annotate(n=Count('id'))
+        )
+        for statut, _ in Emprunt.STATUT_CHOICES:
+            cls.objects.update_or_create(statut=statut, defaults={'total': comptes.get(statut, 0)})
+        return comptes
+
+    @classmethod
+    def statistiques(cls):
+        """Retourne les compteurs sous forme de dictionnaire {statut: total}."""
+        return dict(cls.objects.values_list('statut', 'total'))
+
+
+# Émis après validation de la transaction quand des tables changent de version.
+tables_modifiees = Signal()
+
+
+class VersionTable(models.Model):
+    """Compteur de modifications par table, incrémenté à chaque écriture.
+
+    Sert de validateur bon marché (ETag / Last-Modified) pour les réponses
+    de l'API: tant que la version d'une table ne bouge pas, ses listes non plus.
+    """
+    table = models.CharField(max_length=50, unique=True)
+    version = models.BigIntegerField(default=0)
+    date_modification = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name_plural = "Versions des tables"
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
+
+    @classmethod
+    def incrementer(cls, *tables):
+        """Incrémente la version des tables données en une seule requête."""
+        maintenant = timezone.now()
+        modifiees = cls.objects.filter(table__in=tables).update(
+            version=F('version') + 1, date_modification=maintenant
+        )
+        if modifiees < len(set(tables)):
+            for table in tables:
+                cls.objects.get_or_create(table=table, defaults={'version': 1, 'date_modification': maintenant})
+        transaction.on_commit(lambda: tables_modifiees.send(sender=cls, tables=tables))
+
+    @classmethod
+    def lire(cls, tables):
+        """Retourne {table: (version, date_modification)} pour les tables données."""
+        return {
+            table: (version, date_modification)
+            for table, version, date_modification in cls.objects.filter(table__in=tables)
+            .values_list('table', 'version', 'date_modification')
+        }
@@ -0,0 +1,143 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PaginateurLecture(Paginator):
+    """Paginator qui passe le QuerySet de chaque page par `lire` avant de le lire."""
+
+    def __init__(self, object_list, per_page, lire=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.lire = lire
+
+    def _get_page(self, object_list, *args, **kwargs):
+        if self.lire is not None:
+            object_list = self.lire(object_list)
+        return super()._get_page(object_list, *args, **kwargs)
+
+
+class PaginationBibliotheque(PageNumberPagination):
+    """
+    Pagination par numéro de page par défaut, par curseur sur demande.
+
+    Le mode curseur s'active avec ?pagination=curseur (ou dès qu'un
+    ?curseur= est fourni). Les pages sont alors découpées sur la clé
+    (date, id) déclarée par la vue dans `cle_curseur`, en ordre décroissant:
+    chaque page est une lecture d'index bornée, sans COUNT ni OFFSET, quelle
+    que soit sa profondeur. L'ordre imposé par ?ordering= ou par la
+    pertinence de recherche est ignoré dans ce mode.
+
+    `lire`, facultatif, transforme le QuerySet de la page juste avant sa
+    lecture (lecture rapide: values()); le total reste compté sur le
+    QuerySet d'origine, sans les jointures de values('livre__titre').
+    """
+
+    cursor_query_param = 'curseur'
+    mode_query_param = 'pagination'
+    invalid_cursor_message = 'Curseur invalide.'
+
+    def paginate_queryset(self, queryset, request, view=None, lire=None):
+        self.lire = lire
+        self.mode_curseur = (
+            request.query_params.get(self.mode_query_param) == 'curseur'
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.mode_curseur or not getattr(view, 'cle_curseur', None):
+            self.mode_curseur = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.champ_date, self.champ_id = view.cle_curseur
+        taille = self.get_page_size(request)
+        position, precedent = self._decoder_curseur(request, queryset.model)
+
+        if precedent:
+            ordre = (self.champ_date, self.champ_id)
+        else:
+            ordre = (f'-{self.champ_date}', f'-{self.champ_id}')
+        queryset = queryset.order_by(*ordre)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self._apres(position, precedent))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        lignes = queryset[:taille + 1]
+        lignes = list(lire(lignes) if lire is not None else lignes)
+        a_la_suite = len(lignes) > taille
+        lignes = lignes[:taille]
+        if precedent:
+            lignes.reverse()
+            # En remontant, la page d'où l'on vient est toujours la suivante.
+            suivant, anterieur = True, a_la_suite
+        else:
+            suivant, anterieur = a_la_suite, position is not None
+        self.curseur_suivant = self._cle(lignes[-1]) if lignes and suivant else None
+        self.curseur_precedent = self._cle(lignes[0]) if lignes and anterieur else None
+        return lignes
+
+    def django_paginator_class(self, object_list, per_page):
+        # Appelé par PageNumberPagination.paginate_queryset().
+        return PaginateurLecture(object_list, per_page, lire=self.lire)
+
+    def get_paginated_response(self, data):
+        if not self.mode_curseur:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self._lien(self.curseur_suivant, precedent=False),
+            'previous': self._lien(self.curseur_precedent, precedent=True),
+            'results': data,
+        })
+
+    def _apres(self, position, precedent):
+        date, identifiant = position
+        comparaison = 'gt' if precedent else 'lt'
+        # La borne large sur la date seule permet au moteur de positionner
+        # directement la lecture dans l'index au lieu de le parcourir depuis le début.
+        return Q(**{f'{self.champ_date}__{comparaison}e': date}) & (
+            Q(**{f'{self.champ_date}__{comparaison}': date})
+            | Q(**{self.champ_date: date, f'{self.champ_id}__{comparaison}': identifiant})
+        )
+
+    def _cle(self, instance):
+        if isinstance(instance, dict):
+            # Lecture rapide: lignes de QuerySet.values().
+            return instance[self.champ_date], instance[self.champ_id]
+        return getattr(instance, self.champ_date), getattr(instance, self.champ_id)
+
+    def _lien(self, cle, precedent):
+        if cle is None:
+            return None
+        date, identifiant = cle
+        charge = [date.isoformat(), identifiant, precedent]
+        jeton = base64.urlsafe_b64encode(json.dumps(charge).encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, jeton)
+
+    def _decoder_curseur(self, request, model):
+        jeton = request.query_params.get(self.cursor_query_param)
+        if not jeton:
+            return None, False
+        try:
+            date, identifiant, precedent = json.loads(base64.urlsafe_b64decode(jeton.encode()))
+            # Types exacts: un null ou un booléen passerait les conversions.
+            if (
+                not isinstance(date, str)
+                or type(identifiant) is not int
+                or not isinstance(precedent, bool)
+            ):
+                raise ValueError(jeton)
+            date = model._meta.get_field(self.champ_date).to_python(date)
+            if date is None:
+                raise ValueError(jeton)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return (date, identifiant), precedent
@@ -0,0 +1,74 @@
+"""
+Rendus de l'API: JSON par orjson s'il est installé, MessagePack en option.
+
+Le texte produit est celui du JSONRenderer de DRF: séparateurs compacts,
+UTF-8, U+2028 et U+2029 échappés, clés non textuelles converties, et
+dates, décimaux ou chaînes paresseuses confiés à l'encodeur de DRF. Seuls
+les flottants en notation exponentielle s'écrivent autrement (1e-5 au lieu
+de 1e-05), pour la même valeur. Sans orjson, ou quand une indentation est
+demandée (Accept: application/json; indent=4, API navigable), le rendu
+reste celui de DRF.
+
+RenduMessagePack sert Accept: application/msgpack, pour les clients qui
+préfèrent un format binaire; il n'est proposé que si msgpack est installé
+(voir REST_FRAMEWORK dans les settings). Les valeurs sont celles du JSON:
+dates en chaînes ISO 8601, décimaux selon les serializers.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Rendu facultatif: json de la bibliothèque standard.
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Format facultatif: le rendu n'est alors pas proposé.
+    msgpack = None
+
+SEPARATEURS_LIGNE = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class RenduJSON(JSONRenderer):
+    """JSONRenderer servi par orjson quand c'est possible."""
+
+    encodeur = JSONEncoder()
+    if orjson is not None:
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        try:
+            contenu = orjson.dumps(data, default=self.encodeur.default, option=self.options)
+        except orjson.JSONEncodeError:
+            # Entiers de plus de 64 bits, types inconnus d'orjson et de DRF...
+            return super().render(data, accepted_media_type, renderer_context)
+        for brut, echappe in SEPARATEURS_LIGNE:
+            if brut in contenu:
+                contenu = contenu.replace(brut, echappe)
+        return contenu
+
+
+class RenduMessagePack(BaseRenderer):
+    """Rendu MessagePack (application/msgpack)."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encodeur = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.encodeur.default, use_bin_type=True, datetime=False)
@@ -0,0 +1,65 @@
+"""
+Réconciliation des retards: statut, jours de retard et amende des emprunts échus.
+
+Tous les emprunts ayant la même date de retour prévue partagent le même nombre
+de jours de retard et la même amende. On travaille donc par date d'échéance:
+chaque date donne deux UPDATE à valeurs constantes, servis par l'index
+(statut, date_retour_prevue), sans jamais charger d'instances. Les dates sont
+regroupées par lots, un lot par transaction.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CompteurEmprunt, Emprunt, VersionTable
+
+TAILLE_LOT_ECHEANCES = 500
+
+
+def _echeances_en_retard(aujourd_hui):
+    return list(
+        Emprunt.objects
+        .filter(statut__in=['en_cours', 'retard'], date_retour_prevue__lt=aujourd_hui)
+        .order_by('date_retour_prevue')
+        .values_list('date_retour_prevue', flat=True)
+        .distinct()
+    )
+
+
+def _reconcilier_lot(echeances, aujourd_hui):
+    passes_en_retard = actualises = 0
+    with transaction.atomic():
+        for echeance in echeances:
+            jours = (aujourd_hui - echeance).days
+            amende = Emprunt.calculer_amende(jours)
+            passes_en_retard += Emprunt.objects.filter(
+                statut='en_cours', date_retour_prevue=echeance
+            ).update(statut='retard', nombre_jours_retard=jours, amende=amende)
+            # Les emprunts déjà en retard ne sont réécrits que si leurs valeurs ont changé.
+            actualises += (
+                Emprunt.objects.filter(statut='retard', date_retour_prevue=echeance)
+                .exclude(nombre_jours_retard=jours, amende=amende)
+                .update(nombre_jours_retard=jours, amende=amende)
+            )
+        CompteurEmprunt.ajuster('en_cours', -passes_en_retard)
+        CompteurEmprunt.ajuster('retard', passes_en_retard)
+        if passes_en_retard or actualises:
+            VersionTable.incrementer('emprunt')
+    return passes_en_retard, actualises
+
+
+def reconcilier_retards(aujourd_hui=None, taille_lot=TAILLE_LOT_ECHEANCES):
+    """
+    Met à jour statut, nombre_jours_retard et amende de tous les emprunts échus.
+
+    Appelable depuis un planificateur (cron, celery beat...). Retourne un
+    dictionnaire avec le nombre d'échéances traitées et de lignes modifiées.
+    """
+    aujourd_hui = aujourd_hui or timezone.now().date()
+    echeances = _echeances_en_retard(aujourd_hui)
+
+    resultat = {'echeances': len(echeances), 'passes_en_retard': 0, 'actualises': 0}
+    for debut in range(0, len(echeances), taille_lot):
+        passes_en_retard, actualises = _reconcilier_lot(echeances[debut:debut + taille_lot], aujourd_hui)
+        resultat['passes_en_retard'] += passes_en_retard
+        resultat['actualises'] += actualises
+    return resultat
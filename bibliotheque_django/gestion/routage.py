@@ -0,0 +1,76 @@
+"""
+Routage des lectures vers les répliques.
+
+Les lectures sûres (GET, HEAD, OPTIONS) des ViewSets et du tableau de bord
+sont envoyées à une réplique tirée au hasard parmi DATABASE_REPLICAS. Tout le
+reste reste sur la base principale: les écritures, les lectures hors de ces
+vues (commandes, administration, authentification et sessions), et toute
+lecture qui suit une écriture dans la même requête. Sans réplique
+configurée, le routeur ne change rien.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+# Vrai pendant une requête dont les lectures peuvent aller sur une réplique.
+_lecture_replique = ContextVar('gestion_lecture_replique', default=False)
+# Vrai dès que la requête en cours a écrit sur la base principale.
+_ecriture_faite = ContextVar('gestion_ecriture_faite', default=False)
+
+
+@contextmanager
+def lectures_sur_replique(actif=True):
+    """Autorise les lectures sur réplique dans le bloc, jusqu'à la première écriture."""
+    jeton_lecture = _lecture_replique.set(actif)
+    jeton_ecriture = _ecriture_faite.set(False)
+    try:
+        yield
+    finally:
+        _lecture_replique.reset(jeton_lecture)
+        _ecriture_faite.reset(jeton_ecriture)
+
+
+def lecture_sur_replique(vue):
+    """Décorateur de vue fonction: ses lectures sûres vont sur une réplique."""
+    @wraps(vue)
+    def envelopper(request, *args, **kwargs):
+        with lectures_sur_replique(request.method in SAFE_METHODS):
+            return vue(request, *args, **kwargs)
+    return envelopper
+
+
+class LectureRepliqueMixin:
+    """Envoie les lectures sûres d'un ViewSet sur une réplique."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with lectures_sur_replique(request.method in SAFE_METHODS):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class RouteurLectureEcriture:
+    def db_for_read(self, model, **hints):
+        repliques = getattr(settings, 'DATABASE_REPLICAS', ())
+        if not repliques or not _lecture_replique.get() or _ecriture_faite.get():
+            return None
+        # Comptes et sessions restent sur la principale: une réplique en retard
+        # ne doit pas déconnecter un utilisateur qui vient de se connecter.
+        if model._meta.app_label != 'gestion':
+            return None
+        return random.choice(repliques)
+
+    def db_for_write(self, model, **hints):
+        if _lecture_replique.get():
+            _ecriture_faite.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les répliques contiennent les mêmes données que la principale.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Les répliques sont des copies de la principale: on ne migre que celle-ci.
+        return db == 'default'
@@ -1,19 +1,215 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Livre, Membre, Emprunt
+from rest_framework.validators import UniqueValidator
+from .couvertures import urls_variantes
+from .models import Livre, Membre, Emprunt, VersionTable
 
 
-class LivreSerializer(serializers.ModelSerializer):
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    Écritures en masse pour les actions bulk des ViewSets.
+
+    Tous les éléments sont validés par le même serializer enfant, l'unicité
+    des champs uniques du modèle (isbn, email...) est vérifiée par une seule
+    requête groupée au lieu d'une par élément, puis les objets sont écrits
+    par bulk_create ou bulk_update dans une transaction. En mise à jour,
+    `instance` est un dictionnaire {id: objet} et chaque élément porte l'id
+    de l'objet visé.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        modele = self.child.Meta.model
+        self.champs_uniques = [
+            champ.name for champ in modele._meta.fields
+            if champ.unique and not champ.primary_key and champ.name in self.child.fields
+        ]
+        # Remplacés par le contrôle groupé de to_internal_value().
+        for nom in self.champs_uniques:
+            champ = self.child.fields[nom]
+            champ.validators = [v for v in champ.validators if not isinstance(v, UniqueValidator)]
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError('Une liste d\'objets est attendue.')
+
+        valides, erreurs = {}, {}
+        for index, element in enumerate(data):
+            self.child.instance = None
+            if self.instance is not None:
+                identifiant = element.get('id') if isinstance(element, dict) else None
+                self.child.instance = self.instance.get(identifiant)
+                if self.child.instance is None:
+                    erreurs[index] = {'id': ['Objet introuvable.']}
+                    continue
+            try:
+                valides[index] = (self.child.instance, self.child.run_validation(element))
+            except serializers.ValidationError as exc:
+                erreurs[index] = exc.detail
+        self.child.instance = None
+
+        self._verifier_unicite(valides, erreurs)
+        if erreurs:
+            raise serializers.ValidationError({index: erreurs[index] for index in sorted(erreurs)})
+        return [valides[index] for index in sorted(valides)]
+
+    def _verifier_unicite(self, valides, erreurs):
+        modele = self.child.Meta.model
+        for champ in self.champs_uniques:
+            valeurs = {
+                index: donnees[champ] for index, (_, donnees) in valides.items() if champ in donnees
+            }
+            if not valeurs:
+                continue
+            existants = dict(
+                modele.objects.filter(**{f'{champ}__in': set(valeurs.values())}).values_list(champ, 'pk')
+            )
+            vus = {}
+            for index, valeur in valeurs.items():
+                instance = valides[index][0]
+                pk_existant = existants.get(valeur)
+                if valeur in vus:
+                    message = f'Valeur déjà présente dans cette liste (élément {vus[valeur]}).'
+                elif pk_existant is not None and (instance is None or instance.pk != pk_existant):
+                    message = f'Un objet avec ce champ {champ} existe déjà.'
+                else:
+                    vus[valeur] = index
+                    continue
+                erreurs.setdefault(index, {}).setdefault(champ, []).append(message)
+
+        for index in erreurs:
+            valides.pop(index, None)
+
+    def create(self, validated_data):
+        modele = self.child.Meta.model
+        with transaction.atomic():
+            objets = modele.objects.bulk_create([modele(**donnees) for _, donnees in validated_data])
+            VersionTable.incrementer(modele._meta.model_name)
+        return objets
+
+    def update(self, instance, validated_data):
+        modele = self.child.Meta.model
+        maintenant = timezone.now()
+        champs = {'date_modification'}
+        objets = []
+        for objet, donnees in validated_data:
+            for champ, valeur in donnees.items():
+                setattr(objet, champ, valeur)
+            # bulk_update ne déclenche pas auto_now.
+            objet.date_modification = maintenant
+            champs.update(donnees)
+            objets.append(objet)
+        with transaction.atomic():
+            modele.objects.bulk_update(objets, sorted(champs))
+            VersionTable.incrementer(modele._meta.model_name)
+        return objets
+
+    def save(self, **kwargs):
+        # Les éléments validés sont des couples (objet visé, données).
+        if self.instance is not None:
+            self.instance = self.update(self.instance, self.validated_data)
+        else:
+            self.instance = self.create(self.validated_data)
+        return self.instance
+
+
+class ChampsModulablesMixin:
+    """
+    Champs rendus au choix du client, en lecture seulement: ?fields=a,b
+    garde ces champs, ?exclude=a,b les retire, ?vue=compacte part des champs
+    de Meta.champs_compacts (cartes, listes déroulantes).
+
+    colonnes_modele() donne les colonnes nécessaires aux champs retenus, pour
+    que la vue ne lise que celles-ci (QuerySet.only()).
+    """
+
+    parametres_selection = ('fields', 'exclude', 'vue')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        self.selection_demandee = False
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        parametres = request.query_params
+        if not any(parametres.get(nom) for nom in self.parametres_selection):
+            return
+
+        disponibles = set(self.fields)
+        retenus = set(disponibles)
+        if parametres.get('vue'):
+            if parametres['vue'] != 'compacte':
+                raise serializers.ValidationError({'vue': "Seule la vue 'compacte' existe."})
+            retenus = set(self.Meta.champs_compacts)
+        for parametre in ('fields', 'exclude'):
+            noms = {nom.strip() for nom in parametres.get(parametre, '').split(',') if nom.strip()}
+            inconnus = noms - disponibles
+            if inconnus:
+                raise serializers.ValidationError({parametre: f"Champs inconnus: {', '.join(sorted(inconnus))}"})
+            if noms:
+                retenus = noms if parametre == 'fields' else retenus - noms
+
+        for nom in disponibles - retenus:
+            self.fields.pop(nom)
+        self.selection_demandee = True
+
+    def colonnes_modele(self):
+        """Chemins ORM lus par les champs retenus (livre__titre pour livre.titre)."""
+        colonnes = set()
+        for nom, champ in self.fields.items():
+            if champ.source == '*':
+                colonnes.update(getattr(self.Meta, 'colonnes_champs_calcules', {}).get(nom, ()))
+            else:
+                colonnes.add(champ.source.replace('.', '__'))
+        return colonnes
+
+
+class LivreSerializer(ChampsModulablesMixin, serializers.ModelSerializer):
+    couvertures = serializers.SerializerMethodField()
+
     class Meta:
         model = Livre
-        fields = [
-            'id', 'titre', 'auteur', 'isbn', 'editeur', 'annee', 
-            'genre', 'couverture', 'description', 'note', 'total', 'disponible', 
-            'emplacement', 'date_ajout', 'date_modification'
-        ]
+        fields = [
+            'id', 'titre', 'auteur', 'isbn', 'editeur', 'annee', 
+            'genre', 'couverture', 'couvertures', 'description', 'note', 'total', 'disponible', 
+            'emplacement', 'date_ajout', 'date_modification'
+        ]
         read_only_fields = ['id', 'date_ajout', 'date_modification']
+        list_serializer_class = BulkListSerializer
+        champs_compacts = ['id', 'titre', 'auteur', 'genre', 'total', 'disponible', 'couvertures']
+        colonnes_champs_calcules = {'couvertures': ['couverture']}
+
+    def get_couvertures(self, livre):
+        """URL des miniatures par largeur puis par format, ou None sans couverture."""
+        return self.get_couvertures_depuis_colonnes(livre.couverture.name if livre.couverture else None)
+
+    def get_couvertures_depuis_colonnes(self, couverture):
+        # Aussi appelée par la lecture rapide, avec la valeur brute de la colonne.
+        if not couverture:
+            return None
+        request = self.context.get('request')
+        return {
+            largeur: {
+                format_image: request.build_absolute_uri(url) if request else url
+                for format_image, url in formats.items()
+            }
+            for largeur, formats in urls_variantes(couverture).items()
+        }
+
+
+class LivreImportSerializer(serializers.ModelSerializer):
+    """Valide une ligne d'import; l'unicité de l'ISBN est vérifiée par lot."""
+    class Meta:
+        model = Livre
+        fields = [
+            'titre', 'auteur', 'isbn', 'editeur', 'annee', 'genre',
+            'description', 'note', 'total', 'emplacement'
+        ]
+        extra_kwargs = {'isbn': {'validators': []}}
 
 
-class MembreSerializer(serializers.ModelSerializer):
+class MembreSerializer(ChampsModulablesMixin, serializers.ModelSerializer):
     class Meta:
         model = Membre
         fields = [
@@ -21,9 +217,11 @@ class MembreSerializer(serializers.ModelSerializer):
             'statut', 'date_inscription', 'note'
         ]
         read_only_fields = ['id', 'date_inscription']
+        list_serializer_class = BulkListSerializer
+        champs_compacts = ['id', 'nom', 'email', 'statut']
 
 
-class EmpruntSerializer(serializers.ModelSerializer):
+class EmpruntSerializer(ChampsModulablesMixin, serializers.ModelSerializer):
     livre_titre = serializers.CharField(source='livre.titre', read_only=True)
     membre_nom = serializers.CharField(source='membre.nom', read_only=True)
     
@@ -35,3 +233,4 @@ class EmpruntSerializer(serializers.ModelSerializer):
             'statut', 'nombre_jours_retard', 'amende', 'notes'
         ]
         read_only_fields = ['id', 'date_emprunt', 'nombre_jours_retard']
+        champs_compacts = ['id', 'livre_titre', 'membre_nom', 'date_retour_prevue', 'statut']
@@ -1,20 +1,74 @@
+from django.conf import settings
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Livre, Emprunt
+from . import cache_api
+from .couvertures import preparer_variantes
+from .models import Livre, Membre, Emprunt, CompteurEmprunt, VersionTable
+
+
+# La réservation d'un exemplaire à la création d'un emprunt est faite dans
+# Emprunt.save(), par une mise à jour conditionnelle dans la même transaction.
+
+
+@receiver(post_delete, sender=Emprunt)
+def update_livre_disponible_on_emprunt_delete(sender, instance, **kwargs):
+    """Rend l'exemplaire lors de la suppression d'un emprunt qui le détenait"""
+    statut = getattr(instance, '_statut_initial', None) or instance.statut
+    if statut in Emprunt.STATUTS_DETENTION:
+        Livre.liberer_exemplaires(instance.livre_id)
 
 
 @receiver(post_save, sender=Emprunt)
-def update_livre_disponible_on_emprunt_create(sender, instance, created, **kwargs):
-    """Diminue le nombre de livres disponibles lors de la création d'un emprunt"""
+def update_compteurs_on_emprunt_save(sender, instance, created, **kwargs):
+    """Répercute la création ou le changement de statut d'un emprunt sur les compteurs"""
+    ancien_statut = None if created else getattr(instance, '_statut_initial', None)
     if created:
-        livre = instance.livre
-        livre.disponible = max(0, livre.disponible - 1)
-        livre.save()
+        CompteurEmprunt.ajuster(instance.statut, 1)
+    elif ancien_statut is not None and ancien_statut != instance.statut:
+        CompteurEmprunt.ajuster(ancien_statut, -1)
+        CompteurEmprunt.ajuster(instance.statut, 1)
+    instance._statut_initial = instance.statut
 
 
 @receiver(post_delete, sender=Emprunt)
-def update_livre_disponible_on_emprunt_delete(sender, instance, **kwargs):
-    """Augmente le nombre de livres disponibles lors de la suppression d'un emprunt"""
-    livre = instance.livre
-    livre.disponible = min(livre.total, livre.disponible + 1)
-    livre.save()
+def update_compteurs_on_emprunt_delete(sender, instance, **kwargs):
+    """Décrémente le compteur du statut de l'emprunt supprimé"""
+    statut = getattr(instance, '_statut_initial', None) or instance.statut
+    CompteurEmprunt.ajuster(statut, -1)
+
+
+@receiver(post_save, sender=Livre)
+@receiver(post_delete, sender=Livre)
+def update_version_livre(sender, **kwargs):
+    """Invalide les validateurs HTTP des réponses qui dépendent des livres"""
+    VersionTable.incrementer('livre')
+
+
+@receiver(post_save, sender=Livre)
+def generer_variantes_couverture(sender, instance, **kwargs):
+    """Prépare les miniatures d'une nouvelle couverture une fois l'enregistrement validé"""
+    nom = instance.couverture.name if instance.couverture else None
+    if nom and nom != getattr(instance, '_couverture_initiale', None):
+        transaction.on_commit(lambda: preparer_variantes(nom))
+    instance._couverture_initiale = nom
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def memoriser_empreinte_session(sender, instance, **kwargs):
+    """Mot de passe changé ou compte désactivé: les autres sessions ne sont plus valides"""
+    transaction.on_commit(lambda: cache_api.memoriser_empreinte(instance))
+
+
+@receiver(post_save, sender=Membre)
+@receiver(post_delete, sender=Membre)
+def update_version_membre(sender, **kwargs):
+    """Invalide les validateurs HTTP des réponses qui dépendent des membres"""
+    VersionTable.incrementer('membre')
+
+
+@receiver(post_save, sender=Emprunt)
+@receiver(post_delete, sender=Emprunt)
+def update_version_emprunt(sender, **kwargs):
+    """Invalide les validateurs HTTP des réponses qui dépendent des emprunts"""
+    VersionTable.incrementer('emprunt')
@@ -0,0 +1,129 @@
+"""
+Profil SQLite de production et maintenance de la base.
+
+Avec DJANGO_SQLITE_PRODUCTION, chaque nouvelle connexion passe en WAL (les
+lectures ne bloquent plus les écritures et inversement), attend un verrou
+occupé au lieu de lever "database is locked", et profite d'un cache de pages
+et d'un mmap plus grands. synchronous=NORMAL reste sûr en WAL: une coupure
+peut perdre les dernières transactions, jamais corrompre la base.
+"""
+import importlib
+
+import django
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .filters import FTS_TABLE, fts_disponible
+
+DECLENCHEURS_FTS = ('gestion_livre_fts_ai', 'gestion_livre_fts_ad', 'gestion_livre_fts_au')
+
+PRAGMAS_PRODUCTION = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Valeur négative: taille en kio (64 Mio).
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+}
+
+
+@receiver(connection_created)
+def appliquer_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_PRODUCTION', False):
+        return
+    pragmas = dict(PRAGMAS_PRODUCTION)
+    # Même attente que l'option 'timeout' de la connexion.
+    timeout = connection.settings_dict.get('OPTIONS', {}).get('timeout')
+    if timeout is not None:
+        pragmas['busy_timeout'] = int(timeout * 1000)
+    with connection.cursor() as curseur:
+        for nom, valeur in pragmas.items():
+            curseur.execute(f'PRAGMA {nom} = {valeur}')
+    if django.VERSION < (5, 1):
+        transactions_immediates(connection)
+
+
+def transactions_immediates(connection):
+    """
+    BEGIN IMMEDIATE pour chaque transaction de la connexion, comme l'option
+    'transaction_mode' de Django 5.1: le verrou d'écriture est pris d'emblée,
+    au lieu d'échouer en cours de transaction quand une lecture devient écriture.
+    """
+    def commencer():
+        connection.cursor().execute('BEGIN IMMEDIATE')
+    connection._start_transaction_under_autocommit = commencer
+
+
+def _pragma(connection, nom):
+    with connection.cursor() as curseur:
+        curseur.execute(f'PRAGMA {nom}')
+        return curseur.fetchone()
+
+
+def etat(alias='default'):
+    """Taille de la base et du journal WAL, mode de journalisation."""
+    connection = connections[alias]
+    page_size = _pragma(connection, 'page_size')[0]
+    return {
+        'journal_mode': _pragma(connection, 'journal_mode')[0],
+        'taille': _pragma(connection, 'page_count')[0] * page_size,
+        'pages_libres': _pragma(connection, 'freelist_count')[0],
+    }
+
+
+def analyser(alias='default'):
+    """Met à jour les statistiques utilisées par le planificateur (ANALYZE)."""
+    with connections[alias].cursor() as curseur:
+        curseur.execute('ANALYZE')
+
+
+def checkpoint(alias='default'):
+    """Reporte le journal WAL dans la base et le tronque; retourne (bloqué, pages journal, pages reportées)."""
+    return _pragma(connections[alias], 'wal_checkpoint(TRUNCATE)')
+
+
+def optimiser_fts(alias='default'):
+    """Fusionne les segments de l'index plein texte du catalogue."""
+    if not fts_disponible(alias):
+        return False
+    with connections[alias].cursor() as curseur:
+        curseur.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return True
+
+
+def _migration_fts():
+    # Le SQL des déclencheurs reste défini à un seul endroit: la migration.
+    return importlib.import_module('gestion.migrations.0005_livre_fts')
+
+
+def declencheurs_fts_manquants(alias='default'):
+    """Déclencheurs de synchronisation de l'index plein texte absents de la base."""
+    if not fts_disponible(alias):
+        return []
+    with connections[alias].cursor() as curseur:
+        curseur.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'gestion_livre'")
+        presents = {nom for nom, in curseur.fetchall()}
+    return [nom for nom in DECLENCHEURS_FTS if nom not in presents]
+
+
+def reparer_fts(alias='default'):
+    """Recrée les déclencheurs de l'index plein texte et reconstruit l'index; False sans index."""
+    if not fts_disponible(alias):
+        return False
+    migration = _migration_fts()
+    with transaction.atomic(using=alias), connections[alias].cursor() as curseur:
+        for sql in migration.SUPPRESSION_SQL[:-1]:
+            curseur.execute(sql)
+        # Déclencheurs puis reconstruction; la table virtuelle existe déjà.
+        for sql in migration.CREATION_SQL[1:]:
+            curseur.execute(sql)
+    return True
+
+
+def vacuum(alias='default'):
+    """Reconstruit le fichier pour rendre l'espace libre (verrouille la base pendant l'opération)."""
+    with connections[alias].cursor() as curseur:
+        curseur.execute('VACUUM')
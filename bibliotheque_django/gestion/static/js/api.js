@@ -106,11 +106,37 @@ window.fetch = async function(input, init = {}) {
     return originalFetch(input, nextInit);
 };
 
+// Chaîne de requête: champs voulus (?fields=) et filtres côté serveur
+// (?search=, ?genre=, ?statut=...), les valeurs vides étant ignorées.
+function construireQuery(champs = null, filtres = {}) {
+    const params = new URLSearchParams();
+    if (champs) params.set('fields', champs.join(','));
+    Object.entries(filtres).forEach(([nom, valeur]) => {
+        if (valeur !== null && valeur !== undefined && valeur !== '') params.set(nom, valeur);
+    });
+    const query = params.toString();
+    return query ? `?${query}` : '';
+}
+
+// Effectifs par genre (livres) ou par statut (membres, emprunts), selon les filtres
+async function getFacettes(ressource, filtres = {}) {
+    try {
+        const response = await fetch(`${API_BASE_URL}/${ressource}/facettes/${construireQuery(null, filtres)}`);
+        if (!response.ok) throw new Error('Erreur lors du chargement des effectifs');
+        return await response.json();
+    } catch (error) {
+        console.error('Erreur API Facettes:', error);
+        return {};
+    }
+}
+
 // ===== LIVRES =====
 
-async function getLivres() {
+// champs: liste facultative des champs voulus, pour alléger la réponse
+async function getLivres(champs = null, filtres = {}) {
     try {
-        const response = await fetch(`${API_BASE_URL}/livres/`);
+        const query = construireQuery(champs, filtres);
+        const response = await fetch(`${API_BASE_URL}/livres/${query}`);
         if (!response.ok) throw new Error('Erreur lors du chargement des livres');
         const data = await response.json();
         return data.results ? data.results : data;
@@ -217,9 +243,10 @@ async function getLivresDisponibles() {
 
 // ===== MEMBRES =====
 
-async function getMembres() {
+async function getMembres(champs = null, filtres = {}) {
     try {
-        const response = await fetch(`${API_BASE_URL}/membres/`);
+        const query = construireQuery(champs, filtres);
+        const response = await fetch(`${API_BASE_URL}/membres/${query}`);
         if (!response.ok) throw new Error('Erreur lors du chargement des membres');
         const data = await response.json();
         return data.results ? data.results : data;
@@ -314,9 +341,9 @@ async function getMembresActifs() {
 
 // ===== EMPRUNTS =====
 
-async function getEmprunts() {
+async function getEmprunts(filtres = {}) {
     try {
-        const response = await fetch(`${API_BASE_URL}/emprunts/`);
+        const response = await fetch(`${API_BASE_URL}/emprunts/${construireQuery(null, filtres)}`);
         if (!response.ok) throw new Error('Erreur lors du chargement des emprunts');
         const data = await response.json();
         return data.results ? data.results : data;
@@ -478,3 +505,17 @@ async function getStatistiquesEmprunts() {
         };
     }
 }
+
+
+// ===== TABLEAU DE BORD =====
+
+async function getDashboardResume() {
+    try {
+        const response = await fetch(`${API_BASE_URL}/dashboard/`);
+        if (!response.ok) throw new Error('Erreur lors du chargement du tableau de bord');
+        return await response.json();
+    } catch (error) {
+        console.error('Erreur API Dashboard:', error);
+        return null;
+    }
+}
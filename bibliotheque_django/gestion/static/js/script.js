@@ -169,10 +169,7 @@ window.addEventListener('settingsChanged', async function() {
     }
 
     if (document.getElementById('recentEmprunts')) {
-        if (window.dashboardRefreshInterval) {
-            clearInterval(window.dashboardRefreshInterval);
-            window.dashboardRefreshInterval = null;
-        }
+        stopDashboardAutoRefresh();
         if (isDashboardAutoRefreshEnabled()) {
             startDashboardAutoRefresh();
         }
@@ -196,16 +193,36 @@ async function displayLivres() {
     
     const livres = await getLivres();
     container.innerHTML = livres.map(livre => createBookCard(livre)).join('');
+    afficherEffectifsGenres();
+}
+
+// Genre du bouton de filtre actif ('' pour tous)
+function genreSelectionne() {
+    const actif = document.querySelector('.filter-btn.active');
+    return actif && actif.dataset.filter !== 'all' ? actif.dataset.filter : '';
+}
+
+// Ajoute à chaque bouton de genre le nombre de livres, calculé par le serveur
+async function afficherEffectifsGenres() {
+    const boutons = document.querySelectorAll('.filter-btn[data-filter]');
+    if (!boutons.length) return;
+    const facettes = await getFacettes('livres');
+    const effectifs = {};
+    (facettes.genre || []).forEach(facette => { effectifs[facette.valeur] = facette.nombre; });
+    let total = 0;
+    Object.values(effectifs).forEach(nombre => { total += nombre; });
+    boutons.forEach(bouton => {
+        if (!bouton.dataset.libelle) bouton.dataset.libelle = bouton.textContent.trim();
+        const nombre = bouton.dataset.filter === 'all' ? total : effectifs[bouton.dataset.filter];
+        if (nombre !== undefined) bouton.textContent = `${bouton.dataset.libelle} (${nombre})`;
+    });
 }
 
 // Créer une carte livre
 function createBookCard(livre) {
     const statusClass = livre.disponible > 0 ? 'status-available' : 'status-borrowed';
     const statusText = livre.disponible > 0 ? `Disponible: ${livre.disponible}/${livre.total}` : `Emprunté: ${livre.empruntes || 0}`;
-    const coverUrl = resolveMediaUrl(livre.couverture);
-    const coverHtml = coverUrl
-        ? `<img src="${coverUrl}" alt="Couverture de ${livre.titre}" class="book-card-cover">`
-        : `<div class="book-card-cover-placeholder">📖</div>`;
+    const coverHtml = createCoverHtml(livre, resolveMediaUrl);
     
     return `
         <div class="book-card">
@@ -226,6 +243,29 @@ function createBookCard(livre) {
     `;
 }
 
+// Miniature de couverture: WebP si le navigateur le gère, JPEG sinon,
+// dans la largeur adaptée à l'écran (la carte fait au plus 250px).
+function createCoverHtml(livre, resolveUrl) {
+    const variantes = livre.couvertures;
+    if (!variantes) {
+        const coverUrl = resolveUrl(livre.couverture);
+        return coverUrl
+            ? `<img src="${coverUrl}" alt="Couverture de ${livre.titre}" class="book-card-cover" loading="lazy">`
+            : `<div class="book-card-cover-placeholder">📖</div>`;
+    }
+    const srcset = (format) => Object.entries(variantes)
+        .map(([largeur, urls]) => `${resolveUrl(urls[format])} ${largeur}w`)
+        .join(', ');
+    const sizes = '(max-width: 600px) 50vw, 250px';
+    return `
+        <picture>
+            <source type="image/webp" srcset="${srcset('webp')}" sizes="${sizes}">
+            <img src="${resolveUrl(variantes['320'].jpg)}" srcset="${srcset('jpg')}" sizes="${sizes}"
+                alt="Couverture de ${livre.titre}" class="book-card-cover" loading="lazy" decoding="async">
+        </picture>
+    `;
+}
+
 function resolveMediaUrl(url) {
     if (!url) return '';
     if (url.startsWith('http://') || url.startsWith('https://')) return url;
@@ -261,7 +301,9 @@ async function displayMembres() {
     `).join('');
     
     // Mettre à jour les statistiques
-    updateMemberStats(membres);
+    if (!(await updateMemberStatsFromResume())) {
+        updateMemberStats(membres);
+    }
 }
 
 // Afficher les emprunts
@@ -314,8 +356,7 @@ async function displayRetards() {
     const container = document.getElementById('retardsList');
     if (!container) return;
     
-    const emprunts = await getEmprunts();
-    const retards = emprunts.filter(e => e.statut === 'retard');
+    const retards = await getEmprunts({ statut: 'retard' });
     container.innerHTML = retards.map(retard => {
         const joursRetard = calculateJoursRetard(retard.date_retour_prevue);
         return `
@@ -392,6 +433,55 @@ async function refreshDashboardData() {
 function startDashboardAutoRefresh() {
     if (!isDashboardPage() || !isDashboardAutoRefreshEnabled()) return;
 
+    // Mise à jour poussée par le serveur quand c'est possible, sinon interrogation périodique.
+    // Un serveur WSGI refuse le flux (204): inutile de le redemander pendant la session.
+    if (typeof EventSource !== 'undefined' && sessionStorage.getItem('dashboardSansFlux') !== '1') {
+        startDashboardEventStream();
+        return;
+    }
+    startDashboardPolling();
+}
+
+function stopDashboardAutoRefresh() {
+    if (window.dashboardEventSource) {
+        window.dashboardEventSource.close();
+        window.dashboardEventSource = null;
+    }
+    if (window.dashboardRefreshInterval) {
+        clearInterval(window.dashboardRefreshInterval);
+        window.dashboardRefreshInterval = null;
+    }
+}
+
+function startDashboardEventStream() {
+    stopDashboardAutoRefresh();
+
+    const source = new EventSource(`${API_BASE_URL}/evenements/`, { withCredentials: IS_LOCAL_FILE_MODE });
+    let refreshTimer = null;
+    let openCount = 0;
+    const scheduleRefresh = () => {
+        // Regroupe les rafales d'événements (retour de plusieurs livres, etc.).
+        clearTimeout(refreshTimer);
+        refreshTimer = setTimeout(refreshDashboardData, 300);
+    };
+
+    ['emprunts', 'inventaire', 'membres'].forEach(type => source.addEventListener(type, scheduleRefresh));
+    source.addEventListener('open', () => {
+        // Après une reconnexion, des changements ont pu être manqués.
+        if (openCount++ > 0) scheduleRefresh();
+    });
+    source.addEventListener('error', () => {
+        // CLOSED: le navigateur ne se reconnectera pas (réponse 204, refus...).
+        if (source.readyState === EventSource.CLOSED) {
+            if (openCount === 0) sessionStorage.setItem('dashboardSansFlux', '1');
+            window.dashboardEventSource = null;
+            startDashboardPolling();
+        }
+    });
+    window.dashboardEventSource = source;
+}
+
+function startDashboardPolling() {
     if (window.dashboardRefreshInterval) {
         clearInterval(window.dashboardRefreshInterval);
     }
@@ -414,30 +504,36 @@ function startDashboardAutoRefresh() {
 
 // Mettre à jour les statistiques du dashboard
 async function updateDashboardStats() {
-    const [livres, membres, emprunts] = await Promise.all([
-        getLivres(),
-        getMembres(),
-        getEmprunts()
-    ]);
-
-    const totalLivres = Array.isArray(livres) ? livres.length : 0;
-    const totalMembres = Array.isArray(membres) ? membres.length : 0;
-    const totalEmpruntsActifs = Array.isArray(emprunts)
-        ? emprunts.filter(emprunt => emprunt.statut === 'en_cours' || emprunt.statut === 'retard').length
-        : 0;
-    const totalRetards = Array.isArray(emprunts)
-        ? emprunts.filter(emprunt => emprunt.statut === 'retard').length
-        : 0;
+    // Un seul appel agrégé côté serveur au lieu des trois listes complètes.
+    const resume = await getDashboardResume();
+    if (!resume) return;
 
     const totalLivresElement = document.getElementById('totalLivres');
     const totalEmpruntsElement = document.getElementById('totalEmprunts');
     const totalMembresElement = document.getElementById('totalMembres');
     const totalRetardsElement = document.getElementById('totalRetards');
 
-    if (totalLivresElement) totalLivresElement.textContent = totalLivres;
-    if (totalEmpruntsElement) totalEmpruntsElement.textContent = totalEmpruntsActifs;
-    if (totalMembresElement) totalMembresElement.textContent = totalMembres;
-    if (totalRetardsElement) totalRetardsElement.textContent = totalRetards;
+    if (totalLivresElement) totalLivresElement.textContent = resume.total_livres;
+    if (totalEmpruntsElement) totalEmpruntsElement.textContent = resume.emprunts_actifs;
+    if (totalMembresElement) totalMembresElement.textContent = resume.total_membres;
+    if (totalRetardsElement) totalRetardsElement.textContent = resume.emprunts_en_retard;
+}
+
+// Mettre à jour les statistiques des membres depuis le résumé serveur
+async function updateMemberStatsFromResume() {
+    const resume = await getDashboardResume();
+    if (!resume) return false;
+
+    const statElement = document.getElementById('totalMembresStat');
+    const actifElement = document.getElementById('actifsStat');
+    const suspendElement = document.getElementById('suspensionStat');
+    const nouveauxElement = document.getElementById('nouveauxStat');
+
+    if (statElement) statElement.textContent = resume.total_membres;
+    if (actifElement) actifElement.textContent = resume.membres_actifs;
+    if (suspendElement) suspendElement.textContent = resume.membres_suspendus;
+    if (nouveauxElement) nouveauxElement.textContent = resume.nouveaux_membres_mois;
+    return true;
 }
 
 // Mettre à jour les statistiques des membres
@@ -651,10 +747,8 @@ async function setupEventListeners() {
     const searchLivres = document.getElementById('searchLivres');
     if (searchLivres) {
         searchLivres.addEventListener('input', async function(e) {
-            const searchTerm = e.target.value.toLowerCase();
-            const livres = await getLivres();
-            const filtered = livres.filter(livre => livre.titre.toLowerCase().includes(searchTerm));
-            
+            const filtered = await getLivres(null, { search: e.target.value.trim(), genre: genreSelectionne() });
+
             const container = document.getElementById('booksContainer');
             container.innerHTML = filtered.map(livre => createBookCard(livre)).join('');
         });
@@ -664,13 +758,7 @@ async function setupEventListeners() {
     const searchMembres = document.getElementById('searchMembres');
     if (searchMembres) {
         searchMembres.addEventListener('input', async function(e) {
-            const searchTerm = e.target.value.toLowerCase();
-            const membres = await getMembres();
-            const filtered = membres.filter(membre =>
-                membre.nom.toLowerCase().includes(searchTerm) ||
-                membre.email.toLowerCase().includes(searchTerm) ||
-                (membre.telephone || '').toLowerCase().includes(searchTerm)
-            );
+            const filtered = await getMembres(null, { search: e.target.value.trim() });
 
             const tableBody = document.getElementById('membersTableBody');
             tableBody.innerHTML = filtered.map(membre => `
@@ -699,14 +787,7 @@ async function setupEventListeners() {
     const searchEmprunts = document.getElementById('searchEmprunts');
     if (searchEmprunts) {
         searchEmprunts.addEventListener('input', async function(e) {
-            const searchTerm = e.target.value.toLowerCase();
-            const emprunts = await getEmprunts();
-            const filtered = emprunts.filter(emprunt =>
-                emprunt.livre_titre.toLowerCase().includes(searchTerm) ||
-                emprunt.membre_nom.toLowerCase().includes(searchTerm) ||
-                getEmpruntStatusText(emprunt.statut).toLowerCase().includes(searchTerm) ||
-                String(emprunt.id).includes(searchTerm)
-            );
+            const filtered = await getEmprunts({ search: e.target.value.trim() });
 
             const tableBody = document.getElementById('loansTableBody');
             tableBody.innerHTML = filtered.map(emprunt => `
@@ -737,15 +818,12 @@ async function setupEventListeners() {
             // Add active class to clicked button
             this.classList.add('active');
             
-            const filter = this.dataset.filter;
-            if (filter === 'all') {
-                await displayLivres();
-            } else {
-                const livres = await getLivres();
-                const filtered = livres.filter(livre => livre.genre === filter);
-                const container = document.getElementById('booksContainer');
-                container.innerHTML = filtered.map(livre => createBookCard(livre)).join('');
-            }
+            const filtered = await getLivres(null, {
+                search: searchLivres ? searchLivres.value.trim() : '',
+                genre: genreSelectionne(),
+            });
+            const container = document.getElementById('booksContainer');
+            if (container) container.innerHTML = filtered.map(livre => createBookCard(livre)).join('');
         });
     });
     
@@ -1036,7 +1114,7 @@ async function loadLivresForSelect() {
     const select = document.getElementById('livre');
     if (!select) return;
     
-    const livres = await getLivres();
+    const livres = await getLivres(['id', 'titre', 'auteur']);
     if (livres && livres.length > 0) {
         livres.forEach(livre => {
             const option = document.createElement('option');
@@ -1052,7 +1130,7 @@ async function loadMembresForSelect() {
     const select = document.getElementById('membre');
     if (!select) return;
     
-    const membres = await getMembres();
+    const membres = await getMembres(['id', 'nom', 'email']);
     if (membres && membres.length > 0) {
         membres.forEach(membre => {
             const option = document.createElement('option');
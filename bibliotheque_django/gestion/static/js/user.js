@@ -13,6 +13,28 @@ function getAuthUser() {
     }
 }
 
+// Miniature de couverture: WebP si le navigateur le gère, JPEG sinon.
+function createUserCoverHtml(livre) {
+    const variantes = livre.couvertures;
+    if (!variantes) {
+        const coverUrl = resolveUserMediaUrl(livre.couverture);
+        return coverUrl
+            ? `<img src="${coverUrl}" alt="Couverture de ${livre.titre}" class="book-card-cover" loading="lazy">`
+            : `<div class="book-card-cover-placeholder">📖</div>`;
+    }
+    const srcset = (format) => Object.entries(variantes)
+        .map(([largeur, urls]) => `${resolveUserMediaUrl(urls[format])} ${largeur}w`)
+        .join(', ');
+    const sizes = '(max-width: 600px) 50vw, 250px';
+    return `
+        <picture>
+            <source type="image/webp" srcset="${srcset('webp')}" sizes="${sizes}">
+            <img src="${resolveUserMediaUrl(variantes['320'].jpg)}" srcset="${srcset('jpg')}" sizes="${sizes}"
+                alt="Couverture de ${livre.titre}" class="book-card-cover" loading="lazy" decoding="async">
+        </picture>
+    `;
+}
+
 function resolveUserMediaUrl(url) {
     if (!url) return '';
     if (url.startsWith('http://') || url.startsWith('https://')) return url;
@@ -126,18 +148,13 @@ async function renderUserBooks(searchTerm = '') {
     const container = document.getElementById('userBooksContainer');
     if (!container) return;
 
-    const livres = await getLivres();
-    const filtered = livres.filter((livre) => {
-        const matchSearch = livre.titre.toLowerCase().includes(searchTerm.toLowerCase());
-        const matchGenre = userBookFilter === 'all' || livre.genre === userBookFilter;
-        return matchSearch && matchGenre;
+    const filtered = await getLivres(null, {
+        search: searchTerm.trim(),
+        genre: userBookFilter === 'all' ? '' : userBookFilter,
     });
 
     container.innerHTML = filtered.map((livre) => {
-        const coverUrl = resolveUserMediaUrl(livre.couverture);
-        const coverHtml = coverUrl
-            ? `<img src="${coverUrl}" alt="Couverture de ${livre.titre}" class="book-card-cover">`
-            : `<div class="book-card-cover-placeholder">📖</div>`;
+        const coverHtml = createUserCoverHtml(livre);
         const canBorrow = livre.disponible > 0;
 
         return `
@@ -0,0 +1,164 @@
+"""
+Fichiers statiques: noms empreintés, minification et variantes compressées.
+
+collectstatic passe par StockageStatique: le CSS et le JavaScript sont
+minifiés à la copie, chaque fichier reçoit un nom contenant l'empreinte de
+son contenu (style.3f2a9c1b0d4e.css, via ManifestStaticFilesStorage), puis
+une variante gzip (.gz) et, si le module brotli est installé, brotli (.br)
+est écrite à côté de chaque fichier texte.
+
+StatiquesMiddleware sert ensuite ces fichiers depuis STATIC_ROOT sans
+passer par les vues: variante choisie selon Accept-Encoding, cache d'un an
+« immutable » pour les noms empreintés (un nouveau contenu a un nouveau
+nom), revalidation pour les autres. En DEBUG, les fichiers restent servis
+tels quels depuis gestion/static.
+"""
+import gzip
+import mimetypes
+import os
+from pathlib import Path
+
+import rcssmin
+import rjsmin
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.files.base import ContentFile
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:  # Variantes brotli facultatives: gzip seul.
+    brotli = None
+
+MINIFICATEURS = {
+    '.css': rcssmin.cssmin,
+    '.js': rjsmin.jsmin,
+}
+EXTENSIONS_COMPRESSIBLES = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.map', '.ico')
+TAILLE_MIN_COMPRESSION = 256
+ENCODAGES = {'br': '.br', 'gzip': '.gz'}
+CACHE_IMMUABLE = 'public, max-age=31536000, immutable'
+CACHE_REVALIDATION = 'public, max-age=0, must-revalidate'
+
+
+class StockageStatique(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage qui minifie à la copie et précompresse après empreinte."""
+
+    def _save(self, name, content):
+        minifier = MINIFICATEURS.get(os.path.splitext(name)[1])
+        # Les fichiers déjà minifiés (jquery.min.js...) sont copiés tels quels.
+        if minifier is not None and '.min.' not in name:
+            # Le fichier a pu être déjà lu pour calculer son empreinte.
+            content.seek(0)
+            content = ContentFile(minifier(content.read().decode('utf-8')).encode('utf-8'))
+        return super()._save(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        noms = set()
+        for nom, nom_empreinte, traite in super().post_process(paths, dry_run, **options):
+            if nom_empreinte and not isinstance(traite, Exception):
+                noms.update((nom, nom_empreinte))
+            yield nom, nom_empreinte, traite
+        if dry_run:
+            return
+        for nom in sorted(noms):
+            if nom.endswith(EXTENSIONS_COMPRESSIBLES):
+                self._compresser(nom)
+
+    def _compresser(self, nom):
+        with self.open(nom) as fichier:
+            contenu = fichier.read()
+        if len(contenu) < TAILLE_MIN_COMPRESSION:
+            return
+        variantes = {'.gz': gzip.compress(contenu, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variantes['.br'] = brotli.compress(contenu, quality=11)
+        for suffixe, compresse in variantes.items():
+            # Une variante à peine plus petite ne vaut pas l'en-tête Vary.
+            if len(compresse) >= len(contenu) * 0.95:
+                continue
+            if self.exists(nom + suffixe):
+                self.delete(nom + suffixe)
+            self._save_brut(nom + suffixe, compresse)
+
+    def _save_brut(self, nom, contenu):
+        # Sans passer par _save: une variante compressée n'est pas minifiée.
+        return super()._save(nom, ContentFile(contenu))
+
+
+def encodages_acceptes(request):
+    acceptes = set()
+    for element in request.headers.get('Accept-Encoding', '').split(','):
+        codage, _, parametre = element.partition(';')
+        cle, _, valeur = parametre.replace(' ', '').partition('=')
+        if cle == 'q':
+            try:
+                if float(valeur) == 0:
+                    continue
+            except ValueError:
+                continue
+        acceptes.add(codage.strip().lower())
+    return acceptes
+
+
+class StatiquesMiddleware:
+    """Sert STATIC_ROOT en production, avec variantes compressées et cache long."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.actif = not settings.DEBUG and bool(settings.STATIC_ROOT)
+        self.prefixe = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else f'/{settings.STATIC_URL}'
+        self.racine = Path(settings.STATIC_ROOT or '.')
+        self._immuables = None
+
+    def immuables(self):
+        # Noms empreintés du manifeste, lu une fois par processus.
+        if self._immuables is None:
+            self._immuables = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        return self._immuables
+
+    def __call__(self, request):
+        if self.actif and request.method in ('GET', 'HEAD') and request.path.startswith(self.prefixe):
+            reponse = self.servir(request, request.path[len(self.prefixe):])
+            if reponse is not None:
+                return reponse
+        return self.get_response(request)
+
+    def servir(self, request, nom):
+        chemin = (self.racine / nom).resolve()
+        if nom.endswith(tuple(ENCODAGES.values())) or not chemin.is_relative_to(self.racine.resolve()):
+            return None
+        try:
+            etat = chemin.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not chemin.is_file():
+            return None
+
+        encodage = None
+        acceptes = encodages_acceptes(request)
+        for codage, suffixe in ENCODAGES.items():
+            if codage in acceptes and os.path.exists(f'{chemin}{suffixe}'):
+                encodage = codage
+                chemin = Path(f'{chemin}{suffixe}')
+                etat = chemin.stat()
+                break
+
+        etag = f'"{etat.st_mtime_ns:x}-{etat.st_size:x}"'
+        derniere_modification = int(etat.st_mtime)
+        reponse = get_conditional_response(request, etag=etag, last_modified=derniere_modification)
+        if reponse is None:
+            type_contenu, _ = mimetypes.guess_type(nom)
+            reponse = FileResponse(open(chemin, 'rb'), content_type=type_contenu or 'application/octet-stream')
+            # FileResponse déduit un Content-Disposition du fichier ouvert: inutile
+            # pour un fichier statique, et faux pour une variante (style.css.gz).
+            reponse.headers.pop('Content-Disposition', None)
+            reponse['Last-Modified'] = http_date(derniere_modification)
+            if encodage:
+                reponse['Content-Encoding'] = encodage
+        reponse['ETag'] = etag
+        reponse['Cache-Control'] = CACHE_IMMUABLE if nom in self.immuables() else CACHE_REVALIDATION
+        patch_vary_headers(reponse, ['Accept-Encoding'])
+        return reponse
@@ -0,0 +1,54 @@
+"""Jeux de données communs aux tests de l'API."""
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from gestion.models import Emprunt, Livre, Membre, VersionTable
+
+# Cache des réponses désactivé: chaque requête lit la base.
+SANS_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def creer_bibliothecaire(identifiant='bibliothecaire@exemple.fr'):
+    return get_user_model().objects.create_user(identifiant, identifiant, 'secret123', is_staff=True)
+
+
+def creer_usager(membre, identifiant=None):
+    identifiant = identifiant or membre.email
+    user = get_user_model().objects.create_user(identifiant, identifiant, 'secret123')
+    membre.utilisateur = user
+    membre.save(update_fields=['utilisateur'])
+    return user
+
+
+def creer_fonds(nombre):
+    """`nombre` livres, membres et emprunts (en cours, en retard, rendus), sans signaux."""
+    livres = Livre.objects.bulk_create([
+        Livre(
+            titre=f'Titre {i}', auteur=f'Auteur {i % 3}', isbn=f'978{i:010d}', editeur='Éditeur',
+            annee=1990 + i, genre=['Romans', 'BD', 'Sciences'][i % 3], total=3, disponible=i % 4,
+            note=[0, 4.5, 3.25][i % 3], description=None if i % 4 else f'Résumé {i}',
+            couverture=f'livres/couverture{i}.jpg' if i % 2 else '', emplacement=f'R{i}',
+        )
+        for i in range(nombre)
+    ])
+    membres = Membre.objects.bulk_create([
+        Membre(
+            nom=f'Membre {i}', email=f'membre{i}@exemple.fr', telephone='0600000000',
+            adresse=None if i % 2 else '1 rue des Livres', statut='Suspendu' if i % 5 == 4 else 'Actif',
+        )
+        for i in range(nombre)
+    ])
+    Emprunt.objects.bulk_create([
+        Emprunt(
+            livre=livres[i], membre=membres[i % max(1, nombre // 2)],
+            date_retour_prevue=datetime.date(2020 if i % 3 == 1 else 2030, 1, 1 + i % 28),
+            date_retour_effective=datetime.date(2024, 3, 1) if i % 3 == 2 else None,
+            statut=['en_cours', 'retard', 'retourne'][i % 3],
+            nombre_jours_retard=i % 3, amende=Decimal('1.50') * (i % 3), notes=None if i % 2 else 'Note',
+        )
+        for i in range(nombre)
+    ])
+    VersionTable.incrementer('livre', 'membre', 'emprunt')
+    return livres, membres
@@ -0,0 +1,68 @@
+"""
+Fonctions exécutées dans des processus séparés par test_concurrence.
+
+Chaque processus configure Django lui-même sur la base SQLite fichier du
+test, avec le profil de production (WAL, BEGIN IMMEDIATE, attente du verrou).
+"""
+import os
+
+
+def initialiser(chemin):
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings'
+    os.environ['DJANGO_SQLITE_PRODUCTION'] = 'True'
+    os.environ['DJANGO_DB_REPLICAS'] = ''
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = chemin
+    django.setup()
+
+
+def preparer(chemin, exemplaires):
+    """Crée la base et un livre dont `exemplaires` copies sont disponibles."""
+    initialiser(chemin)
+    from django.core.management import call_command
+    from gestion.models import Livre
+
+    call_command('migrate', verbosity=0)
+    livre = Livre.objects.create(
+        titre='Dernier exemplaire', auteur='Auteur', isbn='9780000000001', editeur='Éditeur',
+        annee=2000, genre='Romans', total=exemplaires + 2, disponible=exemplaires,
+    )
+    return livre.pk
+
+
+def emprunter(chemin, livre_id, numero, depart, tours):
+    """
+    Tente `tours` emprunts du livre, attend `depart` (barrière) pour partir
+    en même temps que les autres processus. Un emprunt obtenu est rendu
+    aussitôt sauf au dernier tour. Retourne (emprunts obtenus, refus).
+    """
+    initialiser(chemin)
+    import datetime
+
+    from gestion.models import Emprunt, ExemplaireIndisponible, Membre
+
+    membre = Membre.objects.create(nom=f'Membre {numero}', email=f'membre{numero}@exemple.fr', telephone='0')
+    depart.wait()
+    obtenus = refus = 0
+    for tour in range(tours):
+        try:
+            emprunt = Emprunt.objects.create(livre_id=livre_id, membre=membre, date_retour_prevue=datetime.date(2099, 1, 1))
+        except ExemplaireIndisponible:
+            refus += 1
+            continue
+        obtenus += 1
+        if tour < tours - 1:
+            emprunt.retourner()
+    return obtenus, refus
+
+
+def bilan(chemin, livre_id):
+    """(exemplaires disponibles, total, emprunts en cours) du livre."""
+    initialiser(chemin)
+    from gestion.models import Emprunt, Livre
+
+    livre = Livre.objects.get(pk=livre_id)
+    en_cours = Emprunt.objects.filter(livre_id=livre_id, statut__in=Emprunt.STATUTS_DETENTION).count()
+    return livre.disponible, livre.total, en_cours
@@ -0,0 +1,99 @@
+import datetime
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from gestion import cache_api
+
+from .donnees import creer_bibliothecaire, creer_fonds, creer_usager
+
+CACHE_MEMOIRE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'gestion-tests-cache-api',
+    }
+}
+
+
+class CleCacheTests(SimpleTestCase):
+    def test_cle_suit_les_versions(self):
+        date = timezone.now()
+        versions = {'livre': (3, date), 'membre': (1, date)}
+        cle = cache_api.cle('LivreViewSet.list', '/api/livres/', cache_api.empreinte_versions(versions))
+        for autres in (
+            {**versions, 'livre': (4, date)},
+            # Même numéro réattribué après un rollback: l'horodatage diffère.
+            {**versions, 'livre': (3, date + datetime.timedelta(microseconds=1))},
+            {'livre': (3, date)},
+        ):
+            with self.subTest(versions=autres):
+                self.assertNotEqual(
+                    cache_api.cle('LivreViewSet.list', '/api/livres/', cache_api.empreinte_versions(autres)),
+                    cle,
+                )
+        # L'ordre des tables ne compte pas.
+        self.assertEqual(
+            cache_api.empreinte_versions(dict(reversed(versions.items()))),
+            cache_api.empreinte_versions(versions),
+        )
+
+
+@override_settings(CACHES=CACHE_MEMOIRE)
+class CacheReponsesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.livres, cls.membres = creer_fonds(6)
+        cls.bibliothecaire = creer_bibliothecaire()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.bibliothecaire)
+
+    def lire(self, url, client=None):
+        return (client or self.client).get(url, HTTP_ACCEPT='application/json')
+
+    def test_reponse_servie_depuis_le_cache(self):
+        premiere = self.lire('/api/livres/')
+        self.assertEqual(premiere['X-Cache'], 'MISS')
+
+        with CaptureQueriesContext(connection) as requetes:
+            seconde = self.lire('/api/livres/')
+        self.assertEqual(seconde['X-Cache'], 'HIT')
+        self.assertEqual(seconde.content, premiere.content)
+        # Seule VersionTable est lue parmi les tables de l'application.
+        tables = [requete['sql'] for requete in requetes.captured_queries if '"gestion_' in requete['sql']]
+        self.assertEqual(len(tables), 1)
+        self.assertIn('"gestion_versiontable"', tables[0])
+
+    def test_ecriture_change_la_cle(self):
+        self.lire('/api/livres/')
+        livre = self.livres[1]
+        self.client.patch(f'/api/livres/{livre.pk}/', {'titre': 'Titre modifié'}, content_type='application/json')
+
+        reponse = self.lire('/api/livres/')
+        self.assertEqual(reponse['X-Cache'], 'MISS')
+        self.assertIn('Titre modifié', {livre['titre'] for livre in reponse.json()['results']})
+        self.assertEqual(self.lire('/api/livres/')['X-Cache'], 'HIT')
+
+    def test_ecriture_d_une_autre_table(self):
+        self.lire('/api/livres/')
+        membre = self.membres[1]
+        self.client.patch(f'/api/membres/{membre.pk}/', {'nom': 'Nom modifié'}, content_type='application/json')
+        self.assertEqual(self.lire('/api/livres/')['X-Cache'], 'HIT')
+
+    def test_portee_par_usager(self):
+        self.lire('/api/emprunts/')
+        usager = self.client_class()
+        usager.force_login(creer_usager(self.membres[0]))
+        reponse = self.lire('/api/emprunts/', usager)
+        self.assertEqual(reponse['X-Cache'], 'MISS')
+        self.assertEqual({emprunt['membre'] for emprunt in reponse.json()['results']}, {self.membres[0].pk})
+
+    def test_metriques(self):
+        for _ in range(3):
+            self.lire('/api/livres/')
+        lectures = self.client.get('/api/cache/metriques/').json()['lectures']
+        self.assertEqual(lectures['LivreViewSet.list'], {'succes': 2, 'echecs': 1, 'taux_succes': 0.667})
@@ -0,0 +1,51 @@
+"""
+Emprunts concurrents du dernier exemplaire, par plusieurs processus sur une
+vraie base SQLite fichier: aucun exemplaire ne doit être prêté deux fois.
+"""
+import multiprocessing
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from . import processus
+
+PROCESSUS = 8
+
+
+class EmpruntsConcurrentsTests(SimpleTestCase):
+    def setUp(self):
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        self.chemin = str(Path(dossier.name) / 'concurrence.sqlite3')
+        # spawn: chaque processus démarre un Django neuf sur la base fichier.
+        self.contexte = multiprocessing.get_context('spawn')
+
+    def executer(self, exemplaires, tours):
+        with self.contexte.Pool(1) as pool:
+            livre_id = pool.apply(processus.preparer, (self.chemin, exemplaires))
+        with self.contexte.Manager() as gestionnaire:
+            depart = gestionnaire.Barrier(PROCESSUS)
+            with self.contexte.Pool(PROCESSUS) as pool:
+                resultats = pool.starmap(
+                    processus.emprunter,
+                    [(self.chemin, livre_id, numero, depart, tours) for numero in range(PROCESSUS)],
+                )
+        with self.contexte.Pool(1) as pool:
+            disponible, total, en_cours = pool.apply(processus.bilan, (self.chemin, livre_id))
+        return resultats, disponible, total, en_cours
+
+    def test_dernier_exemplaire_prete_une_seule_fois(self):
+        resultats, disponible, total, en_cours = self.executer(exemplaires=1, tours=1)
+        self.assertEqual(sum(obtenus for obtenus, _ in resultats), 1)
+        self.assertEqual(sum(refus for _, refus in resultats), PROCESSUS - 1)
+        self.assertEqual(disponible, 0)
+        self.assertEqual(en_cours, 1)
+
+    def test_emprunts_et_retours_en_rafale(self):
+        resultats, disponible, total, en_cours = self.executer(exemplaires=2, tours=25)
+        self.assertGreaterEqual(disponible, 0)
+        self.assertLessEqual(en_cours, 2)
+        # Chaque exemplaire sorti correspond à un emprunt en cours, et réciproquement.
+        self.assertEqual(disponible, 2 - en_cours)
+        self.assertEqual(sum(obtenus + refus for obtenus, refus in resultats), PROCESSUS * 25)
@@ -0,0 +1,87 @@
+"""
+Requêtes conditionnelles sur les listes: une liste inchangée répond 304 en
+ne lisant que la session, l'utilisateur et VersionTable; une écriture
+change les validateurs.
+"""
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from gestion.models import Emprunt, VersionTable
+
+from .donnees import SANS_CACHE, creer_bibliothecaire, creer_fonds
+
+# Session, utilisateur, VersionTable: ni COUNT ni lecture de la page.
+REQUETES_304 = 3
+
+
+@override_settings(CACHES=SANS_CACHE)
+class RequetesConditionnellesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.livres, cls.membres = creer_fonds(6)
+        cls.bibliothecaire = creer_bibliothecaire()
+
+    def setUp(self):
+        self.client.force_login(self.bibliothecaire)
+
+    def vieillir_versions(self):
+        # Last-Modified est à la seconde près: une écriture dans la même seconde
+        # que la précédente ne se voit qu'à l'ETag.
+        VersionTable.objects.update(date_modification=timezone.now() - datetime.timedelta(hours=1))
+
+    def ecritures(self):
+        """Pour chaque liste, une écriture par l'API qui doit la périmer."""
+        livre, membre = self.livres[1], self.membres[1]
+        emprunt = Emprunt.objects.get(livre=livre)
+        return [
+            ('/api/livres/', lambda: self.client.patch(
+                f'/api/livres/{livre.pk}/', {'titre': 'Nouveau titre'}, content_type='application/json')),
+            ('/api/membres/', lambda: self.client.patch(
+                f'/api/membres/{membre.pk}/', {'nom': 'Nouveau nom'}, content_type='application/json')),
+            ('/api/emprunts/', lambda: self.client.post(f'/api/emprunts/{emprunt.pk}/retourner/')),
+        ]
+
+    def lire(self, url, **entetes):
+        return self.client.get(url, HTTP_ACCEPT='application/json', **entetes)
+
+    def test_liste_inchangee(self):
+        for url, _ in self.ecritures():
+            with self.subTest(url=url):
+                reponse = self.lire(url)
+                self.assertEqual(reponse.status_code, 200)
+                self.assertIn('Last-Modified', reponse)
+                for entete, valeur in (
+                    ('HTTP_IF_NONE_MATCH', reponse['ETag']),
+                    ('HTTP_IF_MODIFIED_SINCE', reponse['Last-Modified']),
+                ):
+                    with self.subTest(entete=entete), self.assertNumQueries(REQUETES_304):
+                        conditionnelle = self.lire(url, **{entete: valeur})
+                    self.assertEqual(conditionnelle.status_code, 304)
+                    self.assertEqual(conditionnelle['ETag'], reponse['ETag'])
+                    self.assertEqual(conditionnelle.content, b'')
+
+    def test_ecriture_perime_les_validateurs(self):
+        for url, ecrire in self.ecritures():
+            with self.subTest(url=url):
+                self.vieillir_versions()
+                avant = self.lire(url)
+                self.assertIn(ecrire().status_code, (200, 201))
+
+                apres = self.lire(url, HTTP_IF_NONE_MATCH=avant['ETag'])
+                self.assertEqual(apres.status_code, 200)
+                self.assertNotEqual(apres['ETag'], avant['ETag'])
+                self.assertEqual(self.lire(url, HTTP_IF_MODIFIED_SINCE=avant['Last-Modified']).status_code, 200)
+                self.assertEqual(self.lire(url, HTTP_IF_NONE_MATCH=apres['ETag']).status_code, 304)
+
+    def test_validateurs_propres_a_la_requete(self):
+        reponse = self.lire('/api/livres/')
+        for url, entetes in (
+            ('/api/livres/?search=Titre', {}),
+            ('/api/livres/', {'HTTP_ACCEPT': 'application/msgpack'}),
+        ):
+            with self.subTest(url=url, entetes=entetes):
+                entetes = {'HTTP_ACCEPT': 'application/json', **entetes}
+                autre = self.client.get(url, HTTP_IF_NONE_MATCH=reponse['ETag'], **entetes)
+                self.assertNotEqual(autre.status_code, 304)
@@ -0,0 +1,63 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+class ConnexionTests(TestCase):
+    url = '/api/auth/login/'
+
+    def setUp(self):
+        User = get_user_model()
+        self.jean = User.objects.create_user('jean', 'jean.dupont@exemple.fr', 'secret-jean', first_name='Marie')
+        # Email égal au nom d'utilisateur d'un autre compte.
+        self.homonyme = User.objects.create_user('autre', 'jean', 'secret-autre')
+
+    def connecter(self, identifiant, mot_de_passe):
+        return self.client.post(
+            self.url, json.dumps({'identifier': identifiant, 'password': mot_de_passe}),
+            content_type='application/json',
+        )
+
+    def hashes(self, identifiant, mot_de_passe):
+        """Nombre de calculs PBKDF2 faits par une tentative de connexion."""
+        with mock.patch.object(PBKDF2PasswordHasher, 'encode', autospec=True, side_effect=PBKDF2PasswordHasher.encode) as encode:
+            reponse = self.connecter(identifiant, mot_de_passe)
+        return reponse.status_code, encode.call_count
+
+    def test_nom_d_utilisateur_prioritaire(self):
+        self.assertEqual(self.connecter('jean', 'secret-jean').json()['id'], self.jean.pk)
+        # L'autre compte n'est pas essayé: un seul candidat par identifiant.
+        self.assertEqual(self.connecter('jean', 'secret-autre').status_code, 401)
+
+    def test_identifiant_sans_casse(self):
+        self.assertEqual(self.connecter('JEAN', 'secret-jean').status_code, 200)
+        self.assertEqual(self.connecter('Jean.Dupont@Exemple.FR', 'secret-jean').json()['id'], self.jean.pk)
+
+    def test_un_seul_hash(self):
+        self.assertEqual(self.hashes('inconnu@exemple.fr', 'secret-jean'), (401, 1))
+        self.assertEqual(self.hashes('jean', 'faux'), (401, 1))
+        self.assertEqual(self.hashes('jean', 'secret-jean'), (200, 1))
+
+    def test_compte_inactif_refuse(self):
+        self.jean.is_active = False
+        self.jean.save()
+        self.assertEqual(self.connecter('jean', 'secret-jean').status_code, 401)
+
+    def test_prenom_refuse(self):
+        self.assertEqual(self.connecter('marie', 'secret-jean').status_code, 401)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class MesurerConnexionTests(TestCase):
+    def test_mesure(self):
+        sortie = StringIO()
+        call_command('mesurer_connexion', utilisateurs=500, recherches=5, connexions=1, stdout=sortie)
+        self.assertIn('SEARCH auth_user USING INDEX', sortie.getvalue())
+        self.assertIn('Connexion, compte inconnu', sortie.getvalue())
+        # Comptes temporaires annulés.
+        self.assertEqual(get_user_model().objects.count(), 0)
@@ -0,0 +1,122 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from gestion import couvertures
+from gestion.models import Livre
+
+from .donnees import SANS_CACHE, creer_bibliothecaire
+
+
+def image_png(largeur, hauteur):
+    tampon = BytesIO()
+    Image.new('RGBA', (largeur, hauteur), (200, 30, 30, 128)).save(tampon, 'PNG')
+    return SimpleUploadedFile('dune.png', tampon.getvalue(), content_type='image/png')
+
+
+@override_settings(CACHES=SANS_CACHE)
+class VariantesCouvertureTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        reglages = override_settings(MEDIA_ROOT=self.media)
+        reglages.enable()
+        self.addCleanup(reglages.disable)
+
+    def creer_livre(self, couverture, isbn='9780000000001'):
+        return Livre.objects.create(
+            titre='Dune', auteur='Herbert', isbn=isbn, editeur='Éditeur', annee=1965,
+            genre='Romans', total=1, disponible=1, couverture=couverture,
+        )
+
+    def variantes(self, original):
+        return {
+            (largeur, format_image): couvertures.nom_variante(original, largeur, format_image)
+            for largeur in couvertures.LARGEURS
+            for format_image in couvertures.FORMATS
+        }
+
+    def test_variantes_creees_a_la_validation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            livre = self.creer_livre(image_png(800, 1000))
+            original = livre.couverture.name
+            # Rien n'est écrit tant que la transaction n'est pas validée.
+            self.assertFalse(any(default_storage.exists(nom) for nom in self.variantes(original).values()))
+
+        for (largeur, format_image), nom in self.variantes(original).items():
+            with self.subTest(nom=nom), default_storage.open(nom, 'rb') as fichier:
+                image = Image.open(fichier)
+                self.assertEqual(image.format, couvertures.FORMATS[format_image][0])
+                self.assertEqual(image.width, largeur)
+                self.assertEqual(image.height, largeur * 5 // 4)
+                if format_image == 'jpg':
+                    self.assertEqual(image.mode, 'RGB')
+
+    def test_pas_d_agrandissement(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            original = self.creer_livre(image_png(100, 150)).couverture.name
+        with default_storage.open(couvertures.nom_variante(original, 640, 'webp'), 'rb') as fichier:
+            self.assertEqual(Image.open(fichier).size, (100, 150))
+
+    def test_couverture_inchangee(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            livre = self.creer_livre(image_png(200, 300))
+        with mock.patch('gestion.signals.preparer_variantes') as preparer:
+            with self.captureOnCommitCallbacks(execute=True):
+                livre = Livre.objects.get(pk=livre.pk)
+                livre.titre = 'Dune (réédition)'
+                livre.save()
+            preparer.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                livre.couverture = image_png(200, 300)
+                livre.save()
+            preparer.assert_called_once_with(livre.couverture.name)
+
+    def test_image_illisible(self):
+        fichier = SimpleUploadedFile('abime.png', b'pas une image', content_type='image/png')
+        with self.assertLogs('gestion.couvertures', 'WARNING'):
+            with self.captureOnCommitCallbacks(execute=True):
+                livre = Livre(
+                    titre='Abîmé', auteur='Auteur', isbn='9780000000002', editeur='Éditeur', annee=2000,
+                    genre='Romans', total=1, disponible=1,
+                )
+                # Sans validation du formulaire: l'ImageField n'a pas vérifié le contenu.
+                livre.couverture.save('abime.png', fichier, save=False)
+                livre.save()
+        self.assertFalse(any(default_storage.exists(nom) for nom in self.variantes(livre.couverture.name).values()))
+
+    def test_vue_variante(self):
+        with mock.patch('gestion.signals.preparer_variantes'):
+            with self.captureOnCommitCallbacks(execute=True):
+                original = self.creer_livre(image_png(400, 400)).couverture.name
+        nom = original.rsplit('/', 1)[-1]
+
+        # Première demande: variantes créées à la volée.
+        reponse = self.client.get(f'/media/livres/{nom}.320.webp')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse['Content-Type'], 'image/webp')
+        self.assertEqual(reponse['Cache-Control'], couvertures.CACHE_IMMUABLE)
+        self.assertEqual(Image.open(BytesIO(b''.join(reponse.streaming_content))).width, 320)
+        self.assertTrue(default_storage.exists(couvertures.nom_variante(original, 160, 'jpg')))
+
+        for url in (f'/media/livres/{nom}.300.webp', '/media/livres/absent.png.320.jpg'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_urls_dans_l_api(self):
+        with mock.patch('gestion.signals.preparer_variantes'):
+            livre = self.creer_livre(image_png(200, 200))
+        self.client.force_login(creer_bibliothecaire())
+        urls = self.client.get(f'/api/livres/{livre.pk}/').json()['couvertures']
+        self.assertEqual(set(urls), {str(largeur) for largeur in couvertures.LARGEURS})
+        self.assertEqual(
+            urls['320']['webp'],
+            f'http://testserver/media/{couvertures.nom_variante(livre.couverture.name, 320, "webp")}',
+        )
@@ -0,0 +1,106 @@
+from django.test import TestCase, override_settings
+
+from gestion.models import Livre, Membre, VersionTable
+
+from .donnees import SANS_CACHE, creer_bibliothecaire, creer_usager
+
+
+def donnees_livre(i, **champs):
+    return {
+        'titre': f'Livre {i}', 'auteur': 'Auteur', 'isbn': f'978{i:010d}', 'editeur': 'Éditeur',
+        'annee': 2000, 'genre': 'Romans', 'total': 2, 'disponible': 2, **champs,
+    }
+
+
+@override_settings(CACHES=SANS_CACHE)
+class EcritureEnMasseTests(TestCase):
+    def setUp(self):
+        self.client.force_login(creer_bibliothecaire())
+
+    def envoyer(self, methode, ressource, corps):
+        return getattr(self.client, methode)(f'/api/{ressource}/bulk/', corps, content_type='application/json')
+
+    def version(self, table):
+        return VersionTable.lire([table]).get(table, (0, None))[0]
+
+    def test_creation(self):
+        version = self.version('livre')
+        reponse = self.envoyer('post', 'livres', [donnees_livre(i) for i in range(3)])
+        self.assertEqual(reponse.status_code, 201)
+        self.assertEqual([livre['isbn'] for livre in reponse.json()], [f'978{i:010d}' for i in range(3)])
+        self.assertEqual(Livre.objects.count(), 3)
+        self.assertEqual(self.version('livre'), version + 1)
+
+    def test_requetes_independantes_du_nombre(self):
+        # Session, utilisateur, contrôle d'unicité groupé, savepoint, INSERT, version, libération.
+        for debut, nombre in ((0, 2), (100, 50)):
+            with self.subTest(nombre=nombre), self.assertNumQueries(7):
+                reponse = self.envoyer('post', 'livres', [donnees_livre(debut + i) for i in range(nombre)])
+            self.assertEqual(reponse.status_code, 201)
+
+    def test_doublons_dans_la_demande(self):
+        Livre.objects.create(**donnees_livre(0))
+        version = self.version('livre')
+        reponse = self.envoyer('post', 'livres', [
+            donnees_livre(1), donnees_livre(0), donnees_livre(2), donnees_livre(1), donnees_livre(3, annee=10),
+        ])
+        self.assertEqual(reponse.status_code, 400)
+        erreurs = reponse.json()
+        self.assertEqual(set(erreurs), {'1', '3', '4'})
+        self.assertEqual(erreurs['1'], {'isbn': ['Un objet avec ce champ isbn existe déjà.']})
+        self.assertEqual(erreurs['3'], {'isbn': ['Valeur déjà présente dans cette liste (élément 0).']})
+        self.assertIn('annee', erreurs['4'])
+        # Tout ou rien: aucun livre créé, version inchangée.
+        self.assertEqual(Livre.objects.count(), 1)
+        self.assertEqual(self.version('livre'), version)
+
+    def test_mise_a_jour(self):
+        livres = [Livre.objects.create(**donnees_livre(i)) for i in range(3)]
+        version = self.version('livre')
+        reponse = self.envoyer('patch', 'livres', [
+            {'id': livres[0].pk, 'titre': 'Nouveau titre', 'isbn': livres[0].isbn},
+            {'id': livres[2].pk, 'total': 5, 'disponible': 4},
+        ])
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(
+            list(Livre.objects.order_by('pk').values_list('titre', 'total', 'disponible')),
+            [('Nouveau titre', 2, 2), ('Livre 1', 2, 2), ('Livre 2', 5, 4)],
+        )
+        self.assertEqual(self.version('livre'), version + 1)
+
+    def test_mise_a_jour_refusee(self):
+        livres = [Livre.objects.create(**donnees_livre(i)) for i in range(2)]
+        reponse = self.envoyer('patch', 'livres', [
+            {'id': livres[0].pk, 'isbn': livres[1].isbn},
+            {'id': livres[1].pk + 1000, 'titre': 'Inconnu'},
+            {'id': livres[1].pk, 'titre': 'Valide'},
+        ])
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual(set(reponse.json()), {'0', '1'})
+        self.assertEqual(reponse.json()['1'], {'id': ['Objet introuvable.']})
+        self.assertEqual(Livre.objects.get(pk=livres[1].pk).titre, 'Livre 1')
+
+    def test_taille_maximale(self):
+        membres = [
+            {'nom': f'Membre {i}', 'email': f'membre{i}@exemple.fr', 'telephone': '0600000000'}
+            for i in range(1001)
+        ]
+        # Refusé avant toute validation: seules la session et l'utilisateur sont lus.
+        with self.assertNumQueries(2):
+            reponse = self.envoyer('post', 'membres', membres)
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual(Membre.objects.count(), 0)
+
+        self.assertEqual(self.envoyer('post', 'membres', membres[:1000]).status_code, 201)
+        self.assertEqual(Membre.objects.count(), 1000)
+
+    def test_demandes_invalides(self):
+        for corps in ([], {'titre': 'Pas une liste'}):
+            with self.subTest(corps=corps):
+                self.assertEqual(self.envoyer('post', 'livres', corps).status_code, 400)
+
+    def test_reserve_au_bibliothecaire(self):
+        membre = Membre.objects.create(nom='Membre', email='membre@exemple.fr')
+        self.client.force_login(creer_usager(membre))
+        self.assertEqual(self.envoyer('post', 'livres', [donnees_livre(0)]).status_code, 403)
+        self.assertFalse(Livre.objects.exists())
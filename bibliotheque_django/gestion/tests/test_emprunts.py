@@ -0,0 +1,75 @@
+import datetime
+
+from django.test import TestCase
+
+from gestion.models import CompteurEmprunt, Emprunt, ExemplaireIndisponible, Livre, Membre
+
+
+def creer_livre(isbn, disponible=2):
+    return Livre.objects.create(
+        titre=f'Livre {isbn}', auteur='Auteur', isbn=isbn, editeur='Éditeur', annee=2000,
+        genre='Romans', total=2, disponible=disponible,
+    )
+
+
+class EmpruntExemplairesTests(TestCase):
+    def setUp(self):
+        self.livre = creer_livre('9780000000001')
+        self.membre = Membre.objects.create(nom='Membre', email='membre@exemple.fr')
+        self.emprunt = Emprunt.objects.create(
+            livre=self.livre, membre=self.membre, date_retour_prevue=datetime.date(2030, 1, 1),
+        )
+
+    def disponible(self, livre):
+        return Livre.objects.values_list('disponible', flat=True).get(pk=livre.pk)
+
+    def test_retour_apres_passage_en_retard(self):
+        # Chargé en cours, passé en retard en base (reconcilier_retards), puis rendu.
+        emprunt = Emprunt.objects.get(pk=self.emprunt.pk)
+        Emprunt.objects.filter(pk=emprunt.pk).update(statut='retard')
+        CompteurEmprunt.reconstruire()
+
+        self.assertTrue(emprunt.retourner())
+        self.assertEqual(
+            CompteurEmprunt.statistiques(),
+            {'en_cours': 0, 'retard': 0, 'retourne': 1, 'perdu': 0},
+        )
+        self.assertEqual(self.disponible(self.livre), 2)
+
+    def test_double_retour(self):
+        self.assertTrue(Emprunt.objects.get(pk=self.emprunt.pk).retourner())
+        self.assertFalse(Emprunt.objects.get(pk=self.emprunt.pk).retourner())
+        self.assertEqual(CompteurEmprunt.statistiques()['retourne'], 1)
+        self.assertEqual(self.disponible(self.livre), 2)
+
+    def test_changement_de_livre(self):
+        autre = creer_livre('9780000000002')
+        emprunt = Emprunt.objects.get(pk=self.emprunt.pk)
+        emprunt.livre = autre
+        emprunt.save()
+        self.assertEqual(self.disponible(self.livre), 2)
+        self.assertEqual(self.disponible(autre), 1)
+
+        # Le livre d'origine reprend l'exemplaire à son tour.
+        emprunt.livre = self.livre
+        emprunt.save()
+        self.assertEqual(self.disponible(self.livre), 1)
+        self.assertEqual(self.disponible(autre), 2)
+
+    def test_changement_vers_un_livre_indisponible(self):
+        autre = creer_livre('9780000000002', disponible=0)
+        emprunt = Emprunt.objects.get(pk=self.emprunt.pk)
+        emprunt.livre = autre
+        with self.assertRaises(ExemplaireIndisponible):
+            emprunt.save()
+        self.assertEqual(Emprunt.objects.get(pk=emprunt.pk).livre_id, self.livre.pk)
+        self.assertEqual(self.disponible(self.livre), 1)
+
+    def test_changement_de_livre_emprunt_clos(self):
+        autre = creer_livre('9780000000002')
+        self.emprunt.retourner()
+        emprunt = Emprunt.objects.get(pk=self.emprunt.pk)
+        emprunt.livre = autre
+        emprunt.save()
+        self.assertEqual(self.disponible(self.livre), 2)
+        self.assertEqual(self.disponible(autre), 2)
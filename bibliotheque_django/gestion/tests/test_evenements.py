@@ -0,0 +1,37 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from .donnees import creer_bibliothecaire
+
+
+class EvenementsApiTests(TestCase):
+    url = '/api/evenements/'
+
+    def test_wsgi_sans_flux(self):
+        # Le client de test passe par le gestionnaire WSGI: pas de flux qui tiendrait un worker.
+        self.client.force_login(creer_bibliothecaire())
+        reponse = self.client.get(self.url)
+        self.assertEqual(reponse.status_code, 204)
+        self.assertFalse(reponse.streaming)
+
+    def test_authentification_requise(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_reserve_au_bibliothecaire(self):
+        self.client.force_login(get_user_model().objects.create_user('lecteur', 'lecteur@example.com', 'secret123'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_methode_refusee(self):
+        self.client.force_login(creer_bibliothecaire())
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+class ChargeEvenementsTests(TransactionTestCase):
+    def test_diffusion_a_tous_les_abonnes(self):
+        sortie = StringIO()
+        call_command('charge_evenements', abonnes=50, changements=2, stdout=sortie)
+        self.assertIn('50 abonnés ouverts', sortie.getvalue())
+        self.assertIn('Charge supportée.', sortie.getvalue())
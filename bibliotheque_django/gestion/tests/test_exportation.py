@@ -0,0 +1,37 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone as fuseau
+
+from django.test import TestCase, override_settings
+
+from gestion.models import Livre
+
+from .donnees import SANS_CACHE, creer_bibliothecaire
+
+
+@override_settings(CACHES=SANS_CACHE)
+class ExportFuseauTests(TestCase):
+    def setUp(self):
+        self.client.force_login(creer_bibliothecaire())
+        livre = Livre.objects.create(
+            titre='Dune', auteur='Frank Herbert', isbn='9780441013593', editeur='Ace',
+            annee=1965, genre='Romans', total=1, disponible=1,
+        )
+        # Minuit et demi à Paris, encore la veille en UTC.
+        Livre.objects.filter(pk=livre.pk).update(date_ajout=datetime(2024, 1, 14, 23, 30, tzinfo=fuseau.utc))
+        self.api = self.client.get(f'/api/livres/{livre.pk}/', HTTP_ACCEPT='application/json').json()
+
+    def exporter(self, format_fichier):
+        reponse = self.client.get(f'/api/livres/export/?type={format_fichier}')
+        return b''.join(reponse.streaming_content).decode()
+
+    def test_csv_dans_le_fuseau_de_l_api(self):
+        ligne = next(csv.DictReader(io.StringIO(self.exporter('csv'))))
+        self.assertEqual(ligne['date_ajout'], '2024-01-15T00:30:00+01:00')
+        self.assertEqual(ligne['date_ajout'], self.api['date_ajout'])
+
+    def test_ndjson_dans_le_fuseau_de_l_api(self):
+        ligne = json.loads(self.exporter('ndjson').splitlines()[0])
+        self.assertEqual(ligne['date_ajout'], '2024-01-15T00:30:00+01:00')
+        self.assertEqual(ligne['date_ajout'], self.api['date_ajout'])
@@ -0,0 +1,86 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.checks import run_checks
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from gestion import sqlite
+from gestion.models import Livre
+
+from .donnees import SANS_CACHE, creer_bibliothecaire
+
+
+@override_settings(CACHES=SANS_CACHE)
+class DeclencheursFtsTests(TestCase):
+    def setUp(self):
+        self.client.force_login(creer_bibliothecaire())
+        self.livre = Livre.objects.create(
+            titre='Dune', auteur='Frank Herbert', isbn='9780441013593', editeur='Ace',
+            annee=1965, genre='Sciences', total=1, disponible=1,
+        )
+
+    def rechercher(self, terme):
+        reponse = self.client.get(f'/api/livres/?search={terme}', HTTP_ACCEPT='application/json')
+        return [livre['id'] for livre in reponse.json()['results']]
+
+    def supprimer_declencheur(self):
+        # Ce que fait SQLite quand une migration recrée gestion_livre.
+        with connection.cursor() as curseur:
+            curseur.execute('DROP TRIGGER gestion_livre_fts_au')
+
+    def test_declencheurs_presents(self):
+        self.assertEqual(sqlite.declencheurs_fts_manquants(), [])
+        self.assertEqual([e.id for e in run_checks(databases=['default'])], [])
+
+    def test_declencheur_manquant_signale(self):
+        self.supprimer_declencheur()
+        self.assertEqual(sqlite.declencheurs_fts_manquants(), ['gestion_livre_fts_au'])
+        self.assertIn('gestion.E001', [e.id for e in run_checks(databases=['default'])])
+        sortie = StringIO()
+        call_command('maintenance_sqlite', '--analyze', stdout=sortie)
+        self.assertIn('gestion_livre_fts_au', sortie.getvalue())
+
+    def test_reparation(self):
+        self.supprimer_declencheur()
+        Livre.objects.filter(pk=self.livre.pk).update(titre='Arrakis')
+        self.assertEqual(self.rechercher('Arrakis'), [])
+
+        call_command('maintenance_sqlite', '--analyze', '--reparer-fts', stdout=StringIO())
+        self.assertEqual(sqlite.declencheurs_fts_manquants(), [])
+        self.assertEqual(self.rechercher('Arrakis'), [self.livre.pk])
+        Livre.objects.filter(pk=self.livre.pk).update(titre='Caladan')
+        self.assertEqual(self.rechercher('Caladan'), [self.livre.pk])
+
+
+@override_settings(CACHES=SANS_CACHE)
+class RechercheSansFtsTests(TestCase):
+    def setUp(self):
+        self.client.force_login(creer_bibliothecaire())
+        self.livre = Livre.objects.create(
+            titre='Dune', auteur='Frank Herbert', isbn='9780441013593', editeur='Ace',
+            annee=1965, genre='Romans', total=1, disponible=1, description='Planète désertique',
+        )
+
+    def rechercher(self, terme):
+        reponse = self.client.get(f'/api/livres/?search={terme}', HTTP_ACCEPT='application/json')
+        return [livre['id'] for livre in reponse.json()['results']]
+
+    def test_repli_sur_les_memes_colonnes(self):
+        # SearchFilter, comme sur un autre moteur que SQLite: éditeur et description compris.
+        with mock.patch('gestion.filters.fts_disponible', return_value=False):
+            self.assertEqual(self.rechercher('Ace'), [self.livre.pk])
+            self.assertEqual(self.rechercher('désertique'), [self.livre.pk])
+
+    def test_index_revu_a_chaque_connexion(self):
+        # Réponse gardée pour une connexion précédente: elle ne vaut plus.
+        connection._gestion_fts = (object(), False)
+        self.assertTrue(sqlite.fts_disponible('default'))
+        self.assertEqual(self.rechercher('désertique'), [self.livre.pk])
+
+    def test_mesure_contre_search_filter(self):
+        sortie = StringIO()
+        call_command('mesurer_recherche', livres=300, repetitions=1, stdout=sortie)
+        self.assertIn('"introuvable": FTS5', sortie.getvalue())
+        self.assertEqual(list(Livre.objects.values_list('pk', flat=True)), [self.livre.pk])
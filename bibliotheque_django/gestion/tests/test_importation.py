@@ -0,0 +1,52 @@
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from gestion.importation import TAILLE_BLOC, TAILLE_LOT, ligne_non_utf8
+from gestion.models import Livre
+
+from .donnees import SANS_CACHE, creer_bibliothecaire
+
+
+def catalogue(nombre, fin=b''):
+    lignes = [b'titre,auteur,isbn,editeur,annee,genre,total']
+    lignes += [f'Titre {i},Auteur,978{i:010d},Éditeur,2000,Romans,1'.encode() for i in range(nombre)]
+    return b'\n'.join(lignes) + b'\n' + fin
+
+
+class LigneNonUtf8Tests(TestCase):
+    def test_fichier_valide(self):
+        self.assertIsNone(ligne_non_utf8(io.BytesIO(catalogue(10))))
+
+    def test_numero_de_ligne(self):
+        self.assertEqual(ligne_non_utf8(io.BytesIO(catalogue(10, b'Titre,\xe9\n'))), 12)
+
+    def test_caractere_coupe_entre_deux_blocs(self):
+        # "é" à cheval sur la frontière des blocs reste valide.
+        contenu = b'a' * (TAILLE_BLOC - 1) + '\xe9'.encode() + b'\n'
+        self.assertIsNone(ligne_non_utf8(io.BytesIO(contenu)))
+        self.assertEqual(ligne_non_utf8(io.BytesIO(contenu[:TAILLE_BLOC])), 1)
+
+
+@override_settings(CACHES=SANS_CACHE)
+class ImportEncodageTests(TestCase):
+    def importer(self, contenu):
+        fichier = SimpleUploadedFile('catalogue.csv', contenu, content_type='text/csv')
+        return self.client.post('/api/livres/import/', {'fichier': fichier})
+
+    def setUp(self):
+        self.client.force_login(creer_bibliothecaire())
+
+    def test_octet_invalide_apres_un_lot_complet(self):
+        # Sans vérification préalable, le premier lot serait déjà écrit au moment de l'erreur.
+        reponse = self.importer(catalogue(TAILLE_LOT + 10, b'Fin,\xff\n'))
+        self.assertEqual(reponse.status_code, 400)
+        self.assertIn(f'ligne {TAILLE_LOT + 12}', reponse.json()['error'])
+        self.assertEqual(Livre.objects.count(), 0)
+
+    def test_fichier_valide_importe(self):
+        reponse = self.importer(catalogue(20))
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse.json()['crees'], 20)
+        self.assertEqual(Livre.objects.get(isbn='9780000000003').editeur, 'Éditeur')
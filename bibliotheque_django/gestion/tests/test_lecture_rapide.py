@@ -0,0 +1,95 @@
+"""
+Réponses de référence: la lecture rapide (settings.API_LECTURE_RAPIDE) doit
+rendre exactement ce que rendent les serializers, pour chaque liste, action
+et fiche de l'API et chaque sélection de champs.
+"""
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from gestion.lecture_rapide import PlanLecture
+from gestion.pagination import PaginationBibliotheque
+
+from .donnees import SANS_CACHE, creer_bibliothecaire, creer_fonds, creer_usager
+
+# Sélections de champs par ressource; les emprunts d'un membre sont des emprunts.
+SELECTIONS = {
+    'emprunts': ('', 'vue=compacte', 'fields=id,livre_titre,amende,date_emprunt', 'exclude=notes,membre_nom'),
+    'membres': ('', 'vue=compacte', 'fields=id,nom,date_inscription', 'exclude=adresse,note'),
+    'livres': ('', 'vue=compacte', 'fields=id,titre,couvertures,date_ajout', 'exclude=description,couverture'),
+}
+
+
+@override_settings(CACHES=SANS_CACHE)
+class LectureRapideReferenceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.livres, cls.membres = creer_fonds(30)
+        cls.bibliothecaire = creer_bibliothecaire()
+        cls.usager = creer_usager(cls.membres[0])
+
+    def setUp(self):
+        self.client.force_login(self.bibliothecaire)
+
+    def lire(self, url, rapide):
+        # representer enveloppé: on vérifie aussi que le plan a bien servi.
+        with override_settings(API_LECTURE_RAPIDE=rapide), mock.patch.object(
+            PlanLecture, 'representer', autospec=True, side_effect=PlanLecture.representer,
+        ) as representer:
+            reponse = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(reponse.status_code, 200, url)
+        return reponse.json(), representer.called
+
+    def comparer(self, chemin, rapide_attendu):
+        ressource = next(nom for nom in SELECTIONS if nom in chemin)
+        for selection in SELECTIONS[ressource]:
+            url = f'{chemin}{"&" if "?" in chemin else "?"}{selection}' if selection else chemin
+            with self.subTest(url=url):
+                reference, _ = self.lire(url, rapide=False)
+                obtenu, plan_utilise = self.lire(url, rapide=True)
+                self.assertEqual(obtenu, reference)
+                self.assertEqual(plan_utilise, rapide_attendu)
+
+    def test_listes(self):
+        for chemin in ('/api/livres/', '/api/membres/', '/api/emprunts/'):
+            self.comparer(chemin, rapide_attendu=True)
+            self.comparer(f'{chemin}?pagination=curseur', rapide_attendu=True)
+
+    def test_pages_suivantes(self):
+        with mock.patch.object(PaginationBibliotheque, 'page_size', 7):
+            for chemin in ('/api/livres/?page=3', '/api/emprunts/?page=2&ordering=-id'):
+                self.comparer(chemin, rapide_attendu=True)
+            suivante, _ = self.lire('/api/livres/?pagination=curseur', rapide=False)
+            self.comparer(suivante['next'], rapide_attendu=True)
+
+    def test_listes_filtrees(self):
+        for chemin in (
+            '/api/livres/?search=titre&genre=Romans,BD',
+            '/api/livres/?disponible=true&ordering=-note',
+            '/api/emprunts/?statut=retard,retourne',
+        ):
+            self.comparer(chemin, rapide_attendu=True)
+
+    def test_actions(self):
+        for chemin in (
+            '/api/livres/disponibles/', '/api/livres/empruntes/',
+            '/api/emprunts/en_cours/', '/api/emprunts/en_retard/',
+        ):
+            self.comparer(chemin, rapide_attendu=True)
+        # Actions servies par le serializer dans les deux cas.
+        for chemin in ('/api/membres/actifs/', f'/api/membres/{self.membres[1].pk}/emprunts_actuels/'):
+            self.comparer(chemin, rapide_attendu=False)
+
+    def test_fiches(self):
+        emprunt = self.membres[1].emprunts.first().pk
+        for chemin in (
+            f'/api/livres/{self.livres[1].pk}/',
+            f'/api/membres/{self.membres[1].pk}/',
+            f'/api/emprunts/{emprunt}/',
+        ):
+            self.comparer(chemin, rapide_attendu=False)
+
+    def test_usager(self):
+        self.client.force_login(self.usager)
+        for chemin in ('/api/livres/', '/api/membres/', '/api/emprunts/', '/api/emprunts/en_cours/'):
+            self.comparer(chemin, rapide_attendu=True)
@@ -0,0 +1,143 @@
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from gestion.models import CompteurEmprunt, Emprunt, Livre, Membre
+
+from .donnees import SANS_CACHE, creer_bibliothecaire, creer_usager
+
+
+def creer_livre(isbn):
+    return Livre.objects.create(
+        titre=f'Livre {isbn}', auteur='Auteur', isbn=isbn, editeur='Éditeur', annee=2000,
+        genre='Romans', total=3, disponible=3,
+    )
+
+
+@override_settings(CACHES=SANS_CACHE)
+class OperationsGroupeesTests(TestCase):
+    def setUp(self):
+        self.aujourd_hui = timezone.now().date()
+        self.livre_a = creer_livre('9780000000001')
+        self.livre_b = creer_livre('9780000000002')
+        self.membre = Membre.objects.create(nom='Membre', email='membre@exemple.fr')
+        self.autre_membre = Membre.objects.create(nom='Autre', email='autre@exemple.fr')
+        self.client.force_login(creer_bibliothecaire())
+
+    def emprunter(self, livre, membre=None, echeance=None):
+        return Emprunt.objects.create(
+            livre=livre, membre=membre or self.membre,
+            date_retour_prevue=echeance or self.aujourd_hui + datetime.timedelta(days=14),
+        )
+
+    def poster(self, action, corps):
+        return self.client.post(f'/api/emprunts/{action}/', corps, content_type='application/json')
+
+    def disponibles(self):
+        return dict(Livre.objects.values_list('isbn', 'disponible'))
+
+    def statut(self, emprunt):
+        return Emprunt.objects.values_list('statut', flat=True).get(pk=emprunt.pk)
+
+    def test_retour_ids_valides_clos_et_inconnus(self):
+        premier, deuxieme = self.emprunter(self.livre_a), self.emprunter(self.livre_b)
+        rendu = self.emprunter(self.livre_a)
+        rendu.retourner()
+        inconnu = rendu.pk + 1000
+
+        reponse = self.poster('retourner-lot', {'ids': [premier.pk, rendu.pk, inconnu, deuxieme.pk, premier.pk]})
+
+        self.assertEqual(reponse.status_code, 200)
+        donnees = reponse.json()
+        self.assertEqual((donnees['traites'], donnees['echecs']), (2, 3))
+        self.assertEqual(
+            [resultat.get('erreur') for resultat in donnees['resultats']],
+            [
+                None, 'Ce livre a déjà été retourné', 'Emprunt introuvable', None,
+                'Emprunt présent plusieurs fois dans la demande',
+            ],
+        )
+        self.assertEqual(donnees['resultats'][0]['statut'], 'retourne')
+        self.assertEqual(donnees['resultats'][0]['date_retour_effective'], self.aujourd_hui.isoformat())
+        self.assertEqual(self.statut(premier), 'retourne')
+        self.assertEqual(self.statut(deuxieme), 'retourne')
+        self.assertEqual(self.disponibles(), {'9780000000001': 3, '9780000000002': 3})
+        self.assertEqual(
+            CompteurEmprunt.statistiques(),
+            {'en_cours': 0, 'retard': 0, 'retourne': 3, 'perdu': 0},
+        )
+
+    def test_retour_par_isbn_d_un_membre(self):
+        # Deux exemplaires du livre A, un du livre B, et un livre A chez un autre membre.
+        ancien = self.emprunter(self.livre_a)
+        recent = self.emprunter(self.livre_a)
+        livre_b = self.emprunter(self.livre_b)
+        chez_autre = self.emprunter(self.livre_a, membre=self.autre_membre)
+        Emprunt.objects.filter(pk=ancien.pk).update(date_emprunt=timezone.now() - datetime.timedelta(days=3))
+
+        reponse = self.poster('retourner-lot', {
+            'membre': self.membre.pk,
+            'isbns': [' 9780000000001 ', '9780000000002', '9780000000001', '9780000000001', '9789999999999'],
+        })
+
+        self.assertEqual(reponse.status_code, 200)
+        resultats = reponse.json()['resultats']
+        self.assertEqual([resultat['isbn'] for resultat in resultats], [
+            '9780000000001', '9780000000002', '9780000000001', '9780000000001', '9789999999999',
+        ])
+        # Le plus ancien emprunt d'abord, un emprunt par ISBN répété, jamais celui d'un autre membre.
+        self.assertEqual([resultat.get('id') for resultat in resultats], [ancien.pk, livre_b.pk, recent.pk, None, None])
+        self.assertEqual(resultats[3]['erreur'], 'Emprunt introuvable')
+        self.assertEqual(self.statut(chez_autre), 'en_cours')
+        self.assertEqual(self.disponibles(), {'9780000000001': 2, '9780000000002': 3})
+
+    def test_prolongation(self):
+        en_cours = self.emprunter(self.livre_a)
+        echu = self.emprunter(self.livre_b)
+        # Passé l'échéance sans réconciliation: toujours "en cours" en base.
+        echeance_echue = self.aujourd_hui - datetime.timedelta(days=20)
+        Emprunt.objects.filter(pk=echu.pk).update(date_retour_prevue=echeance_echue)
+        rendu = self.emprunter(self.livre_a)
+        rendu.retourner()
+        CompteurEmprunt.reconstruire()
+
+        reponse = self.poster('prolonger-lot', {'ids': [en_cours.pk, echu.pk, rendu.pk], 'jours': 14})
+
+        self.assertEqual(reponse.status_code, 200)
+        resultats = reponse.json()['resultats']
+        self.assertEqual(resultats[2]['erreur'], 'Impossible de prolonger un emprunt retourné')
+        self.assertEqual(resultats[0]['statut'], 'en_cours')
+        self.assertEqual(resultats[1]['statut'], 'retard')
+        self.assertEqual(
+            Emprunt.objects.values_list('date_retour_prevue', flat=True).get(pk=en_cours.pk),
+            self.aujourd_hui + datetime.timedelta(days=28),
+        )
+        echu = Emprunt.objects.get(pk=echu.pk)
+        self.assertEqual(echu.date_retour_prevue, echeance_echue + datetime.timedelta(days=14))
+        self.assertEqual((echu.statut, echu.nombre_jours_retard), ('retard', 6))
+        self.assertEqual(echu.amende, Emprunt.calculer_amende(6))
+        self.assertEqual(
+            CompteurEmprunt.statistiques(),
+            {'en_cours': 1, 'retard': 1, 'retourne': 1, 'perdu': 0},
+        )
+        self.assertEqual(self.disponibles(), {'9780000000001': 2, '9780000000002': 2})
+
+    def test_demandes_invalides(self):
+        emprunt = self.emprunter(self.livre_a)
+        for action, corps in (
+            ('retourner-lot', {}),
+            ('retourner-lot', {'ids': []}),
+            ('retourner-lot', {'ids': ['abc']}),
+            ('retourner-lot', {'isbns': ['9780000000001']}),
+            ('prolonger-lot', {'ids': [emprunt.pk], 'jours': 0}),
+        ):
+            with self.subTest(action=action, corps=corps):
+                self.assertEqual(self.poster(action, corps).status_code, 400)
+        self.assertEqual(self.statut(emprunt), 'en_cours')
+
+    def test_reserve_au_bibliothecaire(self):
+        emprunt = self.emprunter(self.livre_a)
+        self.client.force_login(creer_usager(self.membre))
+        self.assertEqual(self.poster('retourner-lot', {'ids': [emprunt.pk]}).status_code, 403)
+        self.assertEqual(self.statut(emprunt), 'en_cours')
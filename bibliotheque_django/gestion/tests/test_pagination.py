@@ -0,0 +1,51 @@
+import base64
+import json
+
+from django.test import TestCase, override_settings
+
+from .donnees import SANS_CACHE, creer_bibliothecaire, creer_fonds
+
+
+def jeton(*charge):
+    return base64.urlsafe_b64encode(json.dumps(list(charge)).encode()).decode()
+
+
+@override_settings(CACHES=SANS_CACHE)
+class PaginationCurseurTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        creer_fonds(25)
+        cls.bibliothecaire = creer_bibliothecaire()
+
+    def setUp(self):
+        self.client.force_login(self.bibliothecaire)
+
+    def lire(self, url):
+        return self.client.get(url, HTTP_ACCEPT='application/json')
+
+    def test_parcours_complet(self):
+        vus, url = [], '/api/livres/?pagination=curseur'
+        while url:
+            page = self.lire(url).json()
+            vus += [livre['id'] for livre in page['results']]
+            url = page['next']
+        self.assertEqual(len(vus), 25)
+        self.assertEqual(len(set(vus)), 25)
+
+    def test_curseurs_invalides(self):
+        for curseur in [
+            'pas-du-base64!',
+            jeton(None, 3, False),
+            jeton('2024-01-01T00:00:00Z', None, False),
+            jeton('2024-01-01T00:00:00Z', '3', False),
+            jeton('2024-01-01T00:00:00Z', True, False),
+            jeton('2024-01-01T00:00:00Z', 3, None),
+            jeton(20240101, 3, False),
+            jeton('pas une date', 3, False),
+            jeton('2024-01-01T00:00:00Z', 3),
+            base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+        ]:
+            with self.subTest(curseur=curseur):
+                reponse = self.lire(f'/api/emprunts/?curseur={curseur}')
+                self.assertEqual(reponse.status_code, 404)
+                self.assertEqual(reponse.json()['detail'], 'Curseur invalide.')
@@ -0,0 +1,31 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from gestion.models import Emprunt, Livre, Membre
+
+from .donnees import SANS_CACHE
+
+
+@override_settings(CACHES=SANS_CACHE)
+class VerifierPlansRequetesTests(TestCase):
+    def compter(self):
+        return [modele.objects.count() for modele in (get_user_model(), Livre, Membre, Emprunt)]
+
+    def test_base_deja_peuplee_et_laissee_intacte(self):
+        # Fiches qui portent les valeurs qu'utilisait autrefois la vérification.
+        User = get_user_model()
+        User.objects.create_user('plans-staff')
+        User.objects.create_user('plans-usager')
+        Livre.objects.create(
+            titre='Plan', auteur='Plan', isbn='0000000000000', editeur='Plan', annee=2000, genre='Romans',
+        )
+        Membre.objects.create(nom='Plan', email='plans@example.invalid')
+        avant = self.compter()
+
+        sortie = StringIO()
+        call_command('verifier_plans_requetes', stdout=sortie)
+        self.assertIn('aucun parcours complet', sortie.getvalue())
+        self.assertEqual(self.compter(), avant)
@@ -0,0 +1,40 @@
+import datetime
+
+from django.test import TestCase, override_settings
+
+from gestion.models import Emprunt
+
+from .donnees import SANS_CACHE, creer_bibliothecaire, creer_fonds
+
+
+@override_settings(CACHES=SANS_CACHE)
+class RechercheEmpruntsTests(TestCase):
+    def setUp(self):
+        self.client.force_login(creer_bibliothecaire())
+        self.livres, self.membres = creer_fonds(12)
+
+    def rechercher(self, terme):
+        reponse = self.client.get('/api/emprunts/', {'search': terme}, HTTP_ACCEPT='application/json')
+        self.assertEqual(reponse.status_code, 200)
+        return sorted(emprunt['id'] for emprunt in reponse.json()['results'])
+
+    def ids(self, **filtres):
+        return sorted(Emprunt.objects.filter(**filtres).values_list('id', flat=True))
+
+    def test_libelle_du_statut(self):
+        self.assertEqual(self.rechercher('En retard'), self.ids(statut='retard'))
+        self.assertEqual(self.rechercher('en cours'), self.ids(statut='en_cours'))
+
+    def test_code_du_statut(self):
+        self.assertEqual(self.rechercher('retourne'), self.ids(statut='retourne'))
+
+    def test_numero_de_l_emprunt(self):
+        # Partie du numéro, comme la recherche faite autrefois dans le navigateur.
+        emprunt = Emprunt.objects.create(
+            id=987654, livre=self.livres[1], membre=self.membres[0], date_retour_prevue=datetime.date(2030, 1, 1),
+        )
+        self.assertEqual(self.rechercher('8765'), [emprunt.id])
+
+    def test_titre_et_statut_combines(self):
+        emprunt = Emprunt.objects.select_related('livre').filter(statut='retard').first()
+        self.assertEqual(self.rechercher(f'{emprunt.livre.titre} retard'), [emprunt.id])
@@ -0,0 +1,82 @@
+"""
+Budget de requêtes SQL des lectures de l'API.
+
+Chaque liste doit coûter le même nombre de requêtes quelle que soit la
+taille de la page: une requête de plus par ligne (N+1) fait échouer ces
+tests. Le cache des réponses est désactivé pour mesurer la lecture en base.
+"""
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from gestion.pagination import PaginationBibliotheque
+
+from .donnees import SANS_CACHE, creer_bibliothecaire, creer_fonds, creer_usager
+TAILLES_PAGE = (5, 20)
+
+
+@override_settings(CACHES=SANS_CACHE)
+class BudgetRequetesTests(TestCase):
+    # Requêtes hors lecture des données: session, utilisateur, VersionTable.
+    # Listes paginées: + COUNT + page.
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.livres, cls.membres = creer_fonds(30)
+        cls.bibliothecaire = creer_bibliothecaire()
+        cls.usager = creer_usager(cls.membres[0])
+
+    def setUp(self):
+        self.client.force_login(self.bibliothecaire)
+
+    def verifier_budget(self, url, budget):
+        for taille in TAILLES_PAGE:
+            with self.subTest(url=url, taille=taille), mock.patch.object(PaginationBibliotheque, 'page_size', taille):
+                with self.assertNumQueries(budget):
+                    reponse = self.client.get(url, HTTP_ACCEPT='application/json')
+                self.assertEqual(reponse.status_code, 200)
+
+    def test_listes(self):
+        for url, budget in [
+            ('/api/livres/', 5),
+            ('/api/livres/?vue=compacte', 5),
+            ('/api/livres/?pagination=curseur', 4),
+            ('/api/membres/', 5),
+            ('/api/emprunts/', 5),
+            ('/api/emprunts/?vue=compacte', 5),
+            ('/api/emprunts/?pagination=curseur', 4),
+        ]:
+            self.verifier_budget(url, budget)
+
+    def test_actions_non_paginees(self):
+        # Toutes les lignes sont rendues: le budget ne dépend pas de leur nombre.
+        membre = self.membres[1].pk
+        for url, budget in [
+            ('/api/livres/disponibles/', 4),
+            ('/api/livres/empruntes/', 4),
+            ('/api/membres/actifs/', 4),
+            (f'/api/membres/{membre}/emprunts_actuels/', 5),
+            ('/api/emprunts/en_cours/', 4),
+            ('/api/emprunts/en_retard/', 4),
+        ]:
+            self.verifier_budget(url, budget)
+
+    def test_details(self):
+        emprunt = self.membres[1].emprunts.first().pk
+        for url, budget in [
+            (f'/api/livres/{self.livres[1].pk}/', 4),
+            (f'/api/membres/{self.membres[1].pk}/', 4),
+            (f'/api/emprunts/{emprunt}/', 4),
+        ]:
+            self.verifier_budget(url, budget)
+
+    def test_listes_usager(self):
+        self.client.force_login(self.usager)
+        # Première lecture: le membre de l'usager est résolu puis gardé en session.
+        self.client.get('/api/emprunts/', HTTP_ACCEPT='application/json')
+        for url, budget in [
+            ('/api/livres/', 5),
+            ('/api/emprunts/', 5),
+            ('/api/emprunts/en_cours/', 4),
+        ]:
+            self.verifier_budget(url, budget)
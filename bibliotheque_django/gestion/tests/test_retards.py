@@ -0,0 +1,103 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from gestion.models import CompteurEmprunt, Emprunt, Livre, Membre, VersionTable
+from gestion.retards import reconcilier_retards
+
+AUJOURD_HUI = datetime.date(2024, 6, 15)
+
+
+@override_settings(BIBLIO_AMENDE_PAR_JOUR='0.50')
+class ReconcilierRetardsTests(TestCase):
+    def setUp(self):
+        self.livre = Livre.objects.create(
+            titre='Livre', auteur='Auteur', isbn='9780000000001', editeur='Éditeur', annee=2000,
+            genre='Romans', total=100, disponible=100,
+        )
+        self.membre = Membre.objects.create(nom='Membre', email='membre@exemple.fr')
+
+    def emprunts(self, *lignes):
+        # bulk_create: pas de save(), donc pas de passage en retard anticipé.
+        emprunts = Emprunt.objects.bulk_create([
+            Emprunt(
+                livre=self.livre, membre=self.membre, date_retour_prevue=echeance, statut=statut,
+                nombre_jours_retard=jours, amende=Decimal(amende),
+            )
+            for echeance, statut, jours, amende in lignes
+        ])
+        CompteurEmprunt.reconstruire()
+        return emprunts
+
+    def etat(self, emprunt):
+        return Emprunt.objects.values_list('statut', 'nombre_jours_retard', 'amende').get(pk=emprunt.pk)
+
+    def version(self):
+        return VersionTable.lire(['emprunt']).get('emprunt', (0, None))[0]
+
+    def test_statut_jours_et_amende(self):
+        en_cours, deja_en_retard, a_jour, pas_echu, echeance_du_jour, rendu = self.emprunts(
+            (datetime.date(2024, 6, 5), 'en_cours', 0, '0'),
+            (datetime.date(2024, 6, 1), 'retard', 3, '1.50'),
+            (datetime.date(2024, 6, 12), 'retard', 3, '1.50'),
+            (datetime.date(2024, 7, 1), 'en_cours', 0, '0'),
+            (AUJOURD_HUI, 'en_cours', 0, '0'),
+            (datetime.date(2024, 1, 1), 'retourne', 0, '0'),
+        )
+        version = self.version()
+
+        resultat = reconcilier_retards(aujourd_hui=AUJOURD_HUI)
+
+        self.assertEqual(resultat, {'echeances': 3, 'passes_en_retard': 1, 'actualises': 1})
+        self.assertEqual(self.etat(en_cours), ('retard', 10, Decimal('5.00')))
+        self.assertEqual(self.etat(deja_en_retard), ('retard', 14, Decimal('7.00')))
+        self.assertEqual(self.etat(a_jour), ('retard', 3, Decimal('1.50')))
+        self.assertEqual(self.etat(pas_echu), ('en_cours', 0, Decimal('0')))
+        self.assertEqual(self.etat(echeance_du_jour), ('en_cours', 0, Decimal('0')))
+        self.assertEqual(self.etat(rendu), ('retourne', 0, Decimal('0')))
+        self.assertEqual(
+            CompteurEmprunt.statistiques(),
+            {'en_cours': 2, 'retard': 3, 'retourne': 1, 'perdu': 0},
+        )
+        self.assertEqual(self.version(), version + 1)
+
+    def test_deuxieme_passage_sans_effet(self):
+        self.emprunts(
+            (datetime.date(2024, 6, 5), 'en_cours', 0, '0'),
+            (datetime.date(2024, 6, 1), 'retard', 3, '1.50'),
+        )
+        reconcilier_retards(aujourd_hui=AUJOURD_HUI)
+        compteurs, version = CompteurEmprunt.statistiques(), self.version()
+
+        resultat = reconcilier_retards(aujourd_hui=AUJOURD_HUI)
+
+        self.assertEqual(resultat, {'echeances': 2, 'passes_en_retard': 0, 'actualises': 0})
+        self.assertEqual(CompteurEmprunt.statistiques(), compteurs)
+        # Rien n'a changé: les ETag des listes d'emprunts restent valides.
+        self.assertEqual(self.version(), version)
+
+    def test_lots(self):
+        echeances = [AUJOURD_HUI - datetime.timedelta(days=jours) for jours in range(1, 8)]
+        emprunts = self.emprunts(*[(echeance, 'en_cours', 0, '0') for echeance in echeances])
+        version = self.version()
+
+        # 7 échéances par lots de 3: la liste des échéances, puis par lot un savepoint,
+        # deux compteurs, une version et la libération, et deux UPDATE par échéance.
+        with self.assertNumQueries(1 + 3 * 5 + 7 * 2):
+            resultat = reconcilier_retards(aujourd_hui=AUJOURD_HUI, taille_lot=3)
+
+        self.assertEqual(resultat, {'echeances': 7, 'passes_en_retard': 7, 'actualises': 0})
+        for jours, emprunt in enumerate(emprunts, start=1):
+            self.assertEqual(self.etat(emprunt), ('retard', jours, Decimal('0.50') * jours))
+        self.assertEqual(CompteurEmprunt.statistiques()['en_cours'], 0)
+        self.assertEqual(CompteurEmprunt.statistiques()['retard'], 7)
+        self.assertEqual(self.version(), version + 3)
+
+    def test_commande(self):
+        self.emprunts((datetime.date(2024, 6, 5), 'en_cours', 0, '0'))
+        sortie = StringIO()
+        call_command('reconcilier_retards', '--date', AUJOURD_HUI.isoformat(), stdout=sortie)
+        self.assertIn('1 échéance(s), 1 emprunt(s) passé(s) en retard, 0 retard(s) actualisé(s)', sortie.getvalue())
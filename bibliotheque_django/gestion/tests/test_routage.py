@@ -0,0 +1,92 @@
+"""
+Routage des lectures: la réplique est ici l'alias 'default' lui-même, ce qui
+permet d'exécuter les requêtes tout en relevant la base choisie par le
+routeur (None: base principale).
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from gestion.models import Livre
+from gestion.routage import RouteurLectureEcriture, lectures_sur_replique
+
+from .donnees import SANS_CACHE, creer_bibliothecaire, creer_fonds
+
+REPLIQUE = 'default'
+
+
+@override_settings(CACHES=SANS_CACHE, DATABASE_REPLICAS=[REPLIQUE])
+class RoutageRequetesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        creer_fonds(3)
+        cls.bibliothecaire = creer_bibliothecaire()
+
+    def setUp(self):
+        self.client.force_login(self.bibliothecaire)
+
+    def choix(self, appel):
+        """Exécute appel() et retourne les couples (modèle, base choisie) des lectures."""
+        choix = []
+        db_for_read = RouteurLectureEcriture.db_for_read
+
+        def relever(routeur, model, **hints):
+            base = db_for_read(routeur, model, **hints)
+            choix.append((model._meta.label, base))
+            return base
+
+        with mock.patch.object(RouteurLectureEcriture, 'db_for_read', relever):
+            appel()
+        return choix
+
+    def test_lectures_de_l_api_sur_la_replique(self):
+        for url in ('/api/livres/', '/api/emprunts/', '/api/dashboard/'):
+            with self.subTest(url=url):
+                choix = self.choix(lambda: self.assertEqual(self.client.get(url).status_code, 200))
+                donnees = {base for label, base in choix if label.startswith('gestion.')}
+                self.assertEqual(donnees, {REPLIQUE})
+
+    def test_comptes_et_sessions_sur_la_principale(self):
+        choix = self.choix(lambda: self.client.get('/api/livres/'))
+        comptes = [(label, base) for label, base in choix if not label.startswith('gestion.')]
+        self.assertEqual({label for label, _ in comptes}, {'sessions.Session', 'auth.User'})
+        self.assertEqual({base for _, base in comptes}, {None})
+
+    def test_ecritures_sur_la_principale(self):
+        livre = Livre.objects.first()
+        choix = self.choix(lambda: self.client.patch(
+            f'/api/livres/{livre.pk}/', {'titre': 'Modifié'}, content_type='application/json',
+        ))
+        self.assertTrue(choix)
+        self.assertEqual({base for _, base in choix}, {None})
+
+    def test_hors_des_vues(self):
+        self.assertEqual(self.choix(lambda: list(Livre.objects.all())), [('gestion.Livre', None)])
+
+
+class RouteurTests(SimpleTestCase):
+    routeur = RouteurLectureEcriture()
+
+    @override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+    def test_lecture_apres_ecriture(self):
+        with lectures_sur_replique():
+            self.assertIn(self.routeur.db_for_read(Livre), ('replica_1', 'replica_2'))
+            self.assertEqual(self.routeur.db_for_write(Livre), 'default')
+            # La suite de la requête doit voir sa propre écriture.
+            self.assertIsNone(self.routeur.db_for_read(Livre))
+        with lectures_sur_replique():
+            self.assertIsNotNone(self.routeur.db_for_read(Livre))
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_methode_non_sure(self):
+        with lectures_sur_replique(actif=False):
+            self.assertIsNone(self.routeur.db_for_read(Livre))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_sans_replique(self):
+        with lectures_sur_replique():
+            self.assertIsNone(self.routeur.db_for_read(Livre))
+
+    def test_migrations_sur_la_principale(self):
+        self.assertTrue(self.routeur.allow_migrate('default', 'gestion'))
+        self.assertFalse(self.routeur.allow_migrate('replica_1', 'gestion'))
@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase
+
+from gestion import cache_api
+
+from .donnees import creer_bibliothecaire
+
+
+class ProfilCourantTests(TestCase):
+    url = '/api/auth/me/'
+
+    def setUp(self):
+        cache.clear()
+        self.user = creer_bibliothecaire()
+        self.connecter(self.client)
+
+    def connecter(self, client):
+        reponse = client.post(
+            '/api/auth/login/',
+            json.dumps({'identifier': self.user.username, 'password': 'secret123'}),
+            content_type='application/json',
+        )
+        self.assertEqual(reponse.status_code, 200)
+
+    def test_profil_sans_requete(self):
+        with self.assertNumQueries(0):
+            reponse = self.client.get(self.url)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse.json()['role'], 'bibliothecaire')
+        self.assertNotIn('empreinte', reponse.json())
+
+    def test_session_sans_profil(self):
+        # Session ouverte sans passer par login_api: profil lu une fois, puis gardé.
+        client = Client()
+        client.force_login(self.user)
+        self.assertEqual(client.get(self.url).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get(self.url).status_code, 200)
+
+    def test_mot_de_passe_change_ailleurs(self):
+        # Autre session du même compte: son empreinte ne correspond plus.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('nouveau-secret-456')
+            self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_compte_desactive(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_empreinte_perdue_par_le_cache(self):
+        # Sans empreinte de référence, la copie de la session fait foi.
+        cache.delete(f'{cache_api.PREFIXE_EMPREINTE}{self.user.pk}')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_anonyme(self):
+        self.assertEqual(Client().get(self.url).status_code, 401)
+
+
+class MoteurSessionTests(SimpleTestCase):
+    def moteur(self, backend):
+        environnement = {**os.environ, 'DJANGO_CACHE_BACKEND': backend}
+        environnement.pop('DJANGO_SESSION_ENGINE', None)
+        sortie = subprocess.run(
+            [sys.executable, '-c', 'from config import settings; print(settings.SESSION_ENGINE)'],
+            cwd=settings.BASE_DIR, env=environnement, capture_output=True, text=True, check=True,
+        )
+        return sortie.stdout.strip()
+
+    def test_sessions_lues_depuis_le_cache(self):
+        for backend in ('locmem', 'file', 'redis'):
+            self.assertEqual(self.moteur(backend), 'django.contrib.sessions.backends.cached_db')
@@ -0,0 +1,27 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from gestion import sqlite
+from gestion.models import VersionTable
+
+
+class TransactionsImmediatesTests(TransactionTestCase):
+    def test_begin_immediate(self):
+        # Repli des versions de Django sans l'option 'transaction_mode'.
+        sqlite.transactions_immediates(connection)
+        self.addCleanup(delattr, connection, '_start_transaction_under_autocommit')
+        with CaptureQueriesContext(connection) as requetes, transaction.atomic():
+            VersionTable.incrementer('livre')
+        self.assertEqual(requetes.captured_queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+
+class MesurerConcurrenceTests(SimpleTestCase):
+    def test_mesure_des_deux_profils(self):
+        sortie = StringIO()
+        call_command('mesurer_concurrence_sqlite', lecteurs=1, ecrivains=1, duree=0.5, stdout=sortie)
+        self.assertIn('Profil défaut:', sortie.getvalue())
+        self.assertIn('Profil production:', sortie.getvalue())
@@ -0,0 +1,109 @@
+import gzip
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from gestion import statiques
+from gestion.views import PageStatique
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class StatiquesTests(TestCase):
+    """collectstatic dans un dossier temporaire, puis service par StatiquesMiddleware (DEBUG désactivé)."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.racine = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.racine)
+        reglages = override_settings(
+            DEBUG=False,
+            STATIC_ROOT=cls.racine,
+            # Seuls les fichiers du projet: pas ceux de l'administration ni de DRF.
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        reglages.enable()
+        cls.addClassCleanup(reglages.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.style = staticfiles_storage.stored_name('css/style.css')
+
+    def setUp(self):
+        # Pages rendues une fois par processus: pas de noms d'un autre dossier.
+        PageStatique._rendues.clear()
+        self.addCleanup(PageStatique._rendues.clear)
+
+    def lire(self, nom, **entetes):
+        return self.client.get(f'/static/{nom}', **entetes)
+
+    def contenu(self, reponse):
+        return b''.join(reponse.streaming_content)
+
+    def test_nom_empreinte_immuable(self):
+        self.assertRegex(self.style, r'^css/style\.[0-9a-f]{12}\.css$')
+        reponse = self.lire(self.style)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse['Cache-Control'], statiques.CACHE_IMMUABLE)
+        self.assertEqual(reponse['Content-Type'], 'text/css')
+        self.assertNotIn('Content-Disposition', reponse)
+        self.assertNotIn('Content-Encoding', reponse)
+        self.assertIn('Accept-Encoding', reponse['Vary'])
+        with open(f'{self.racine}/{self.style}', 'rb') as fichier:
+            self.assertEqual(self.contenu(reponse), fichier.read())
+
+    def test_nom_sans_empreinte_revalide(self):
+        reponse = self.lire('css/style.css')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse['Cache-Control'], statiques.CACHE_REVALIDATION)
+
+    def test_variantes_compressees(self):
+        with open(f'{self.racine}/{self.style}', 'rb') as fichier:
+            original = fichier.read()
+        decompresser = {'gzip': gzip.decompress}
+        if brotli is not None:
+            decompresser['br'] = brotli.decompress
+        for accept, attendu in (
+            ('gzip', 'gzip'),
+            ('gzip, deflate, br', 'br' if brotli else 'gzip'),
+            ('br;q=0, gzip', 'gzip'),
+            ('gzip;q=0', None),
+            ('identity', None),
+        ):
+            with self.subTest(accept=accept):
+                reponse = self.lire(self.style, HTTP_ACCEPT_ENCODING=accept)
+                self.assertEqual(reponse.get('Content-Encoding'), attendu)
+                self.assertEqual(reponse['Content-Type'], 'text/css')
+                self.assertNotIn('Content-Disposition', reponse)
+                contenu = self.contenu(reponse)
+                self.assertEqual(decompresser[attendu](contenu) if attendu else contenu, original)
+
+    def test_minification(self):
+        source = settings.BASE_DIR / 'gestion' / 'static' / 'css' / 'style.css'
+        with open(f'{self.racine}/{self.style}', 'rb') as minifie:
+            self.assertLess(len(minifie.read()), source.stat().st_size)
+
+    def test_revalidation(self):
+        reponse = self.lire(self.style, HTTP_ACCEPT_ENCODING='gzip')
+        nouvelle = self.lire(self.style, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=reponse['ETag'])
+        self.assertEqual(nouvelle.status_code, 304)
+        self.assertEqual(nouvelle['Cache-Control'], statiques.CACHE_IMMUABLE)
+        # L'ETag dépend de la variante servie.
+        self.assertEqual(self.lire(self.style, HTTP_IF_NONE_MATCH=reponse['ETag']).status_code, 200)
+
+    def test_hors_du_middleware(self):
+        for nom in (f'{self.style}.gz', 'css/absent.css', '../manage.py'):
+            with self.subTest(nom=nom):
+                self.assertEqual(self.lire(nom).status_code, 404)
+
+    def test_pages_avec_noms_empreintes(self):
+        reponse = self.client.get('/livres.html')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertContains(reponse, f'href="/static/{self.style}"')
+        self.assertEqual(self.client.get('/livres.html', HTTP_IF_NONE_MATCH=reponse['ETag']).status_code, 304)
@@ -1,7 +1,8 @@
-from django.urls import path, include
-from django.views.generic import TemplateView
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 from .views import (
+    PageStatique,
     LivreViewSet,
     MembreViewSet,
     EmpruntViewSet,
@@ -11,6 +12,10 @@ from .views import (
     register_bibliothecaire_api,
     logout_api,
     current_user_api,
+    dashboard_api,
+    cache_metriques_api,
+    couverture_variante,
+    evenements_api,
 )
 
 router = DefaultRouter()
@@ -20,24 +25,24 @@ router.register(r'emprunts', EmpruntViewSet, basename='emprunt')
 
 urlpatterns = [
     # Pages HTML
-    path('', TemplateView.as_view(template_name='accueil.html'), name='accueil'),
-    path('index.html', TemplateView.as_view(template_name='index.html'), name='index'),
-    path('dashboard.html', TemplateView.as_view(template_name='dashboard.html'), name='dashboard'),
-    path('livres.html', TemplateView.as_view(template_name='livres.html'), name='livres'),
-    path('membres.html', TemplateView.as_view(template_name='membres.html'), name='membres'),
-    path('emprunts.html', TemplateView.as_view(template_name='emprunts.html'), name='emprunts'),
-    path('parametres.html', TemplateView.as_view(template_name='parametres.html'), name='parametres'),
-    path('ajouter-livre.html', TemplateView.as_view(template_name='ajouter-livre.html'), name='ajouter-livre'),
-    path('modifier-livre.html', TemplateView.as_view(template_name='modifier-livre.html'), name='modifier-livre'),
-    path('supprimer-livre.html', TemplateView.as_view(template_name='supprimer-livre.html'), name='supprimer-livre'),
-    path('ajouter-membre.html', TemplateView.as_view(template_name='ajouter-membre.html'), name='ajouter-membre'),
-    path('modifier-membre.html', TemplateView.as_view(template_name='modifier-membre.html'), name='modifier-membre'),
-    path('supprimer-membre.html', TemplateView.as_view(template_name='supprimer-membre.html'), name='supprimer-membre'),
-    path('ajouter-emprunt.html', TemplateView.as_view(template_name='ajouter-emprunt.html'), name='ajouter-emprunt'),
-    path('modifier-emprunt.html', TemplateView.as_view(template_name='modifier-emprunt.html'), name='modifier-emprunt'),
-    path('confirmer-emprunt.html', TemplateView.as_view(template_name='confirmer-emprunt.html'), name='confirmer-emprunt'),
-    path('espace-utilisateur.html', TemplateView.as_view(template_name='espace-utilisateur.html'), name='espace-utilisateur'),
-    path('parametres-utilisateur.html', TemplateView.as_view(template_name='parametres-utilisateur.html'), name='parametres-utilisateur'),
+    path('', PageStatique.as_view(template_name='accueil.html'), name='accueil'),
+    path('index.html', PageStatique.as_view(template_name='index.html'), name='index'),
+    path('dashboard.html', PageStatique.as_view(template_name='dashboard.html'), name='dashboard'),
+    path('livres.html', PageStatique.as_view(template_name='livres.html'), name='livres'),
+    path('membres.html', PageStatique.as_view(template_name='membres.html'), name='membres'),
+    path('emprunts.html', PageStatique.as_view(template_name='emprunts.html'), name='emprunts'),
+    path('parametres.html', PageStatique.as_view(template_name='parametres.html'), name='parametres'),
+    path('ajouter-livre.html', PageStatique.as_view(template_name='ajouter-livre.html'), name='ajouter-livre'),
+    path('modifier-livre.html', PageStatique.as_view(template_name='modifier-livre.html'), name='modifier-livre'),
+    path('supprimer-livre.html', PageStatique.as_view(template_name='supprimer-livre.html'), name='supprimer-livre'),
+    path('ajouter-membre.html', PageStatique.as_view(template_name='ajouter-membre.html'), name='ajouter-membre'),
+    path('modifier-membre.html', PageStatique.as_view(template_name='modifier-membre.html'), name='modifier-membre'),
+    path('supprimer-membre.html', PageStatique.as_view(template_name='supprimer-membre.html'), name='supprimer-membre'),
+    path('ajouter-emprunt.html', PageStatique.as_view(template_name='ajouter-emprunt.html'), name='ajouter-emprunt'),
+    path('modifier-emprunt.html', PageStatique.as_view(template_name='modifier-emprunt.html'), name='modifier-emprunt'),
+    path('confirmer-emprunt.html', PageStatique.as_view(template_name='confirmer-emprunt.html'), name='confirmer-emprunt'),
+    path('espace-utilisateur.html', PageStatique.as_view(template_name='espace-utilisateur.html'), name='espace-utilisateur'),
+    path('parametres-utilisateur.html', PageStatique.as_view(template_name='parametres-utilisateur.html'), name='parametres-utilisateur'),
     
     # API REST
     path('api/csrf/', csrf_token_view, name='api-csrf'),
@@ -46,5 +51,15 @@ urlpatterns = [
     path('api/auth/register-bibliothecaire/', register_bibliothecaire_api, name='api-auth-register-bibliothecaire'),
     path('api/auth/logout/', logout_api, name='api-auth-logout'),
     path('api/auth/me/', current_user_api, name='api-auth-me'),
+    path('api/dashboard/', dashboard_api, name='api-dashboard'),
+    path('api/cache/metriques/', cache_metriques_api, name='api-cache-metriques'),
+    path('api/evenements/', evenements_api, name='api-evenements'),
     path('api/', include(router.urls)),
+
+    # Miniatures des couvertures (avant le service des fichiers media en DEBUG)
+    re_path(
+        rf"^{settings.MEDIA_URL.strip('/')}/livres/(?P<nom>[^/]+\.\d+\.(?:webp|jpg))$",
+        couverture_variante,
+        name='couverture-variante',
+    ),
 ]
@@ -3,16 +3,60 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied, ValidationError
-from django.http import JsonResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from django.core.handlers.asgi import ASGIRequest
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.middleware.csrf import get_token
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.contrib.auth import authenticate, login, logout, get_user_model
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY, login, logout, get_user_model
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.generic import TemplateView
 from django.utils import timezone
 from django.db.models import F
-from django.db.models import Q
+from django.db.models import Case, Q, When
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, Lower
+import codecs
+import hashlib
 import os
-from .models import Livre, Membre, Emprunt
+from .models import Livre, Membre, Emprunt, CompteurEmprunt, ExemplaireIndisponible, VersionTable
 from .serializers import LivreSerializer, MembreSerializer, EmpruntSerializer
+from .filters import EmpruntFilterSet, LivreFilterSet, MembreFilterSet, RechercheEmpruntFilter, RechercheLivreFilter
+from . import cache_api, couvertures
+from .conditionnel import RequetesConditionnellesMixin
+from .lecture_rapide import PlanLecture
+from .routage import LectureRepliqueMixin, lecture_sur_replique
+from .evenements import flux_async
+from .importation import FORMATS as FORMATS_IMPORT, format_depuis_nom, importer_livres, ligne_non_utf8
+from .exportation import FORMATS as FORMATS_EXPORT, TYPES_CONTENU, exporter
+from .lots import TAILLE_MAX_LOT, prolonger_emprunts, retourner_emprunts
+
+
+class PageStatique(TemplateView):
+    """
+    Page HTML sans données propres (tout vient de l'API): rendue une fois par
+    processus puis servie avec un ETag. Le navigateur revalide à chaque
+    visite, car la page porte les noms empreintés des fichiers statiques.
+    """
+
+    _rendues = {}
+
+    def get(self, request, *args, **kwargs):
+        page = None if settings.DEBUG else self._rendues.get(self.template_name)
+        if page is None:
+            contenu = self.render_to_response(self.get_context_data(**kwargs)).render().content
+            page = self._rendues[self.template_name] = (
+                contenu,
+                '"' + hashlib.sha1(contenu).hexdigest() + '"',
+            )
+        contenu, etag = page
+        response = get_conditional_response(request, etag=etag) or HttpResponse(contenu)
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
 
 
 @ensure_csrf_cookie
@@ -25,6 +69,81 @@ User = get_user_model()
 BIBLIO_ACCESS_CODE = os.getenv('BIBLIO_ACCESS_CODE', '12345JeaN')
 
 
+SESSION_PROFIL = 'gestion_profil'
+SESSION_MEMBRE = 'gestion_membre_id'
+
+
+def _profil(user):
+    return {
+        'id': user.id,
+        'email': user.email,
+        'nom': user.get_full_name() or user.username,
+        'role': 'bibliothecaire' if user.is_staff else 'utilisateur',
+    }
+
+
+def membre_id_courant(request):
+    """
+    Identifiant du membre relié à l'utilisateur connecté, ou None.
+
+    Résolu une fois puis gardé en session. Un compte créé avant le lien
+    User/Membre est rattaché au membre de même email à sa première résolution.
+    """
+    membre_id = request.session.get(SESSION_MEMBRE)
+    if membre_id is not None:
+        return membre_id
+
+    user = request.user
+    membre_id = Membre.objects.filter(utilisateur_id=user.pk).values_list('pk', flat=True).first()
+    if membre_id is None and user.email:
+        membre_id = (
+            Membre.objects.filter(utilisateur__isnull=True, email__iexact=user.email)
+            .values_list('pk', flat=True).first()
+        )
+        if membre_id is not None:
+            Membre.objects.filter(pk=membre_id, utilisateur__isnull=True).update(utilisateur=user)
+    if membre_id is not None:
+        request.session[SESSION_MEMBRE] = membre_id
+    return membre_id
+
+
+def _comptes_candidats(identifier_normalized):
+    """
+    Comptes dont le nom d'utilisateur ou l'email (en minuscules) vaut
+    l'identifiant normalisé, le nom d'utilisateur en premier.
+
+    Les deux comparaisons portent sur LOWER(colonne), servie par les index
+    de la migration 0008.
+    """
+    return (
+        User.objects
+        .alias(username_normalise=Lower('username'), email_normalise=Lower('email'))
+        .filter(Q(username_normalise=identifier_normalized) | Q(email_normalise=identifier_normalized))
+        .order_by(
+            Case(When(username_normalise=identifier_normalized, then=0), default=1),
+            'pk',
+        )
+    )
+
+
+def _trouver_compte(identifier_normalized):
+    """Retourne l'unique compte correspondant à un identifiant normalisé, ou None."""
+    return _comptes_candidats(identifier_normalized).first()
+
+
+def _authentifier(identifier_normalized, password):
+    """Vérifie le mot de passe du seul compte candidat: au plus un calcul de hash."""
+    user = _trouver_compte(identifier_normalized)
+    if user is None:
+        # Même coût qu'un compte existant: le temps de réponse ne révèle pas les identifiants.
+        User().set_password(password)
+        return None
+    if not user.check_password(password) or not user.is_active:
+        return None
+    user.backend = 'django.contrib.auth.backends.ModelBackend'
+    return user
+
+
 def login_api(request):
     if request.method != 'POST':
         return JsonResponse({'detail': 'Method not allowed'}, status=405)
@@ -43,28 +162,7 @@ def login_api(request):
     if not identifier or not password:
         return JsonResponse({'detail': "Identifiant et mot de passe obligatoires"}, status=400)
 
-    # Approche robuste: on cherche d'abord des candidats et on valide le mot de passe.
-    candidates = User.objects.filter(
-        Q(username__iexact=identifier_normalized)
-        | Q(email__iexact=identifier_normalized)
-        | Q(first_name__iexact=identifier)
-    )
-    if portal == 'bibliothecaire':
-        candidates = candidates.filter(is_staff=True)
-    elif portal == 'utilisateur':
-        candidates = candidates.filter(is_staff=False)
-
-    user = None
-    for candidate in candidates:
-        if candidate.check_password(password):
-            user = candidate
-            user.backend = 'django.contrib.auth.backends.ModelBackend'
-            break
-
-    # Dernier fallback via authenticate (au cas où backend custom).
-    if user is None:
-        user = authenticate(request, username=identifier, password=password)
-
+    user = _authentifier(identifier_normalized, password)
     if user is None:
         return JsonResponse({'detail': 'Identifiants invalides'}, status=401)
 
@@ -87,15 +185,12 @@ def login_api(request):
         )
 
     login(request, user)
-    role = 'bibliothecaire' if user.is_staff else 'utilisateur'
+    profil = _profil(user)
+    _memoriser_profil(request, profil)
+    if not user.is_staff:
+        membre_id_courant(request)
     redirect_url = '/dashboard.html' if user.is_staff else '/espace-utilisateur.html'
-    return JsonResponse({
-        'id': user.id,
-        'email': user.email,
-        'nom': (user.get_full_name() or user.username),
-        'role': role,
-        'redirect_url': redirect_url,
-    })
+    return JsonResponse({**profil, 'redirect_url': redirect_url})
 
 
 def register_api(request):
@@ -135,15 +230,18 @@ def register_api(request):
         is_staff=False,
     )
 
-    Membre.objects.get_or_create(
+    membre, _ = Membre.objects.get_or_create(
         email=email,
         defaults={
+            'utilisateur': user,
             'nom': nom,
             'telephone': telephone,
             'adresse': adresse,
             'statut': 'Actif',
         }
     )
+    if membre.utilisateur_id is None:
+        Membre.objects.filter(pk=membre.pk, utilisateur__isnull=True).update(utilisateur=user)
 
     return JsonResponse({
         'id': user.id,
@@ -207,25 +305,353 @@ def logout_api(request):
     return JsonResponse({'detail': 'Déconnecté'})
 
 
+def _memoriser_profil(request, profil):
+    # Copie de l'empreinte de session posée par login(), vérifiée par current_user_api.
+    request.session[SESSION_PROFIL] = {**profil, 'empreinte': request.session.get(HASH_SESSION_KEY)}
+
+
+def _profil_session(request):
+    """Profil gardé en session s'il est toujours valide, sans requête, sinon None."""
+    profil = request.session.get(SESSION_PROFIL)
+    if profil is None or str(profil['id']) != request.session.get(SESSION_KEY):
+        return None
+    profil = dict(profil)
+    empreinte = profil.pop('empreinte', None)
+    if empreinte is None or empreinte != request.session.get(HASH_SESSION_KEY):
+        return None
+    # Mot de passe changé ou compte désactivé depuis la connexion (voir signals).
+    courante = cache_api.empreinte_memorisee(profil['id'])
+    if courante is not None and courante != empreinte:
+        return None
+    return profil
+
+
 def current_user_api(request):
+    # Profil et empreinte gardés en session à la connexion: request.user n'est
+    # chargé que si l'un d'eux manque ou ne correspond plus.
+    profil = _profil_session(request)
+    if profil is None:
+        # get_user() vérifie l'empreinte et ferme la session si elle est périmée.
+        if not request.user.is_authenticated:
+            return JsonResponse({'is_authenticated': False}, status=401)
+        profil = _profil(request.user)
+        _memoriser_profil(request, profil)
+    return JsonResponse({'is_authenticated': True, **profil})
+
+
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '300'))
+DASHBOARD_TABLES = ('livre', 'membre', 'emprunt')
+
+
+def _calculer_resume_dashboard():
+    """Calcule les indicateurs du tableau de bord avec une agrégation SQL par table."""
+    debut_mois = timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    livres = Livre.objects.aggregate(
+        total_livres=Count('id'),
+        total_exemplaires=Coalesce(Sum('total'), 0),
+        exemplaires_disponibles=Coalesce(Sum('disponible'), 0),
+    )
+    membres = Membre.objects.aggregate(
+        total_membres=Count('id'),
+        membres_actifs=Count('id', filter=Q(statut='Actif')),
+        membres_suspendus=Count('id', filter=Q(statut='Suspendu')),
+        membres_inactifs=Count('id', filter=Q(statut='Inactif')),
+        nouveaux_membres_mois=Count('id', filter=Q(date_inscription__gte=debut_mois)),
+    )
+    emprunts = Emprunt.objects.aggregate(
+        emprunts_actifs=Count('id', filter=Q(statut__in=['en_cours', 'retard'])),
+        emprunts_en_retard=Count('id', filter=Q(statut='retard')),
+    )
+    return {**livres, **membres, **emprunts}
+
+
+@lecture_sur_replique
+def dashboard_api(request):
+    if request.method != 'GET':
+        return JsonResponse({'detail': 'Method not allowed'}, status=405)
     if not request.user.is_authenticated:
-        return JsonResponse({'is_authenticated': False}, status=401)
+        return JsonResponse({'detail': 'Authentification requise'}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({'detail': "Action réservée au bibliothécaire."}, status=403)
+
+    # Clé faite des versions des tables: toute écriture invalide le résumé.
+    # Le mois en cours en fait aussi partie (nouveaux membres du mois).
+    cle = cache_api.cle(
+        'dashboard',
+        timezone.localdate().strftime('%Y-%m'),
+        cache_api.empreinte_versions(VersionTable.lire(DASHBOARD_TABLES)),
+    )
+    resume = cache.get(cle)
+    cache_api.compter('dashboard', resume is not None)
+    if resume is None:
+        resume = _calculer_resume_dashboard()
+        cache.set(cle, resume, DASHBOARD_CACHE_TIMEOUT)
+    return JsonResponse(resume)
+
+
+def cache_metriques_api(request):
+    """Succès et échecs du cache des lectures de l'API, par vue et action."""
+    if request.method != 'GET':
+        return JsonResponse({'detail': 'Method not allowed'}, status=405)
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Authentification requise'}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({'detail': "Action réservée au bibliothécaire."}, status=403)
+
+    noms = ['dashboard']
+    for viewset in (LivreViewSet, MembreViewSet, EmpruntViewSet):
+        actions = ['list', 'retrieve'] + [
+            extra.__name__ for extra in viewset.get_extra_actions() if 'get' in extra.mapping
+        ]
+        noms += [f'{viewset.__name__}.{nom}' for nom in actions]
+    lectures = cache_api.metriques(noms)
+    succes = sum(valeur['succes'] for valeur in lectures.values())
+    echecs = sum(valeur['echecs'] for valeur in lectures.values())
     return JsonResponse({
-        'is_authenticated': True,
-        'id': request.user.id,
-        'email': request.user.email,
-        'nom': request.user.get_full_name() or request.user.username,
-        'role': 'bibliothecaire' if request.user.is_staff else 'utilisateur',
+        'backend': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+        'succes': succes,
+        'echecs': echecs,
+        'taux_succes': round(succes / (succes + echecs), 3) if succes + echecs else None,
+        'lectures': lectures,
     })
 
 
-class LivreViewSet(viewsets.ModelViewSet):
+def evenements_api(request):
+    """Flux Server-Sent Events des changements d'emprunts, d'inventaire et de membres."""
+    if request.method != 'GET':
+        return JsonResponse({'detail': 'Method not allowed'}, status=405)
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Authentification requise'}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({'detail': "Action réservée au bibliothécaire."}, status=403)
+
+    if not isinstance(request, ASGIRequest):
+        # Sous WSGI, un flux tiendrait un worker par onglet ouvert. Un 204
+        # ferme l'EventSource sans reconnexion: le tableau de bord interroge
+        # alors l'API toutes les 30 secondes.
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(flux_async(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def couverture_variante(request, nom):
+    """Sert une miniature de couverture, créée à la première demande si besoin.
+
+    Les variantes déjà écrites peuvent aussi être servies directement par le
+    serveur web frontal, avec le même en-tête Cache-Control.
+    """
+    correspondance = couvertures.MOTIF_VARIANTE.fullmatch(nom)
+    if correspondance is None or int(correspondance['largeur']) not in couvertures.LARGEURS:
+        raise Http404
+    chemin = couvertures.DOSSIER + nom
+    if not default_storage.exists(chemin):
+        original = couvertures.DOSSIER + correspondance['original']
+        if not default_storage.exists(original):
+            raise Http404
+        try:
+            couvertures.generer_variantes(original)
+        except couvertures.ERREURS_IMAGE:
+            raise Http404
+    response = FileResponse(
+        default_storage.open(chemin, 'rb'),
+        content_type=couvertures.FORMATS[correspondance['format']][1],
+    )
+    response['Cache-Control'] = couvertures.CACHE_IMMUABLE
+    return response
+
+
+class EcritureEnMasseMixin:
+    """
+    Ajoute l'action bulk à un ViewSet réservé au staff: POST crée une liste
+    d'objets, PATCH met à jour une liste d'objets portant chacun leur id.
+    """
+
+    taille_max_bulk = 1000
+
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk(self, request):
+        """Crée ou met à jour une liste d'objets en une validation et une transaction"""
+        self._require_staff(request)
+        if not isinstance(request.data, list) or not request.data:
+            raise ValidationError("Une liste d'objets non vide est attendue.")
+        if len(request.data) > self.taille_max_bulk:
+            raise ValidationError(f'Au plus {self.taille_max_bulk} objets par demande.')
+
+        if request.method == 'POST':
+            serializer = self.get_serializer(data=request.data, many=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        ids = [element.get('id') for element in request.data if isinstance(element, dict)]
+        ids = [identifiant for identifiant in ids if isinstance(identifiant, int)]
+        instances = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(instances, data=request.data, many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+
+class ColonnesRestreintesMixin:
+    """
+    Lectures qui ne chargent que les colonnes des champs demandés
+    (?fields=, ?exclude=, ?vue=compacte: voir ChampsModulablesMixin).
+    """
+
+    actions_colonnes_restreintes = ('list', 'retrieve')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in ('GET', 'HEAD') or self.action not in self.actions_colonnes_restreintes:
+            return queryset
+        serializer = self.get_serializer()
+        if not serializer.selection_demandee:
+            return queryset
+
+        colonnes = serializer.colonnes_modele()
+        # Clé primaire et clé du curseur: lues par la pagination.
+        colonnes.add(queryset.model._meta.pk.name)
+        colonnes.update(getattr(self, 'cle_curseur', ()))
+        relations = {colonne.split('__', 1)[0] for colonne in colonnes if '__' in colonne}
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*sorted(relations))
+        return queryset.only(*sorted(colonnes))
+
+
+class LectureRapideMixin:
+    """
+    Listes lues par QuerySet.values() et mises en forme sans instance de
+    modèle ni serializer par ligne, si settings.API_LECTURE_RAPIDE est
+    activé: même contenu, moins de temps passé en Python (voir
+    gestion/lecture_rapide.py). Les actions de `actions_lecture_rapide`
+    répondent par reponse_liste().
+    """
+
+    actions_lecture_rapide = ('list',)
+
+    def list(self, request, *args, **kwargs):
+        return self.reponse_liste(self.filter_queryset(self.get_queryset()))
+
+    def reponse_liste(self, queryset, paginer=True):
+        plan = self.plan_lecture_rapide()
+        lire = plan.lignes if plan is not None else None
+        if paginer and self.paginator is not None:
+            page = self.paginator.paginate_queryset(queryset, self.request, view=self, lire=lire)
+            if page is not None:
+                return self.get_paginated_response(self._representer(page, plan))
+        return Response(self._representer(lire(queryset) if lire else queryset, plan))
+
+    def plan_lecture_rapide(self):
+        if not settings.API_LECTURE_RAPIDE or self.action not in self.actions_lecture_rapide:
+            return None
+        return PlanLecture.depuis_serializer(self.get_serializer(), getattr(self, 'cle_curseur', ()))
+
+    def _representer(self, objets, plan):
+        if plan is None:
+            return self.get_serializer(objets, many=True).data
+        return plan.representer(objets)
+
+
+class FacettesMixin:
+    """
+    Ajoute l'action facettes: effectif de chaque valeur des champs de
+    `champs_facettes`, en une requête groupée par champ. Les filtres de la
+    requête s'appliquent, sauf celui du champ compté: l'interface affiche
+    ainsi l'effectif de chaque valeur, y compris quand l'une est choisie.
+    """
+
+    champs_facettes = ()
+
+    @action(detail=False, methods=['get'])
+    def facettes(self, request):
+        """Effectifs par genre ou par statut, selon les autres filtres de la requête"""
+        resultat = {}
+        for champ in self.champs_facettes:
+            comptes = dict(
+                self._filtrer_sauf(champ).order_by().values_list(champ).annotate(nombre=Count('pk'))
+            )
+            resultat[champ] = [
+                {'valeur': valeur, 'libelle': libelle, 'nombre': comptes.get(valeur, 0)}
+                for valeur, libelle in self.queryset.model._meta.get_field(champ).choices
+            ]
+        return Response(resultat)
+
+    def _filtrer_sauf(self, champ):
+        parametres = self.request.query_params.copy()
+        parametres.pop(champ, None)
+        queryset = self.get_queryset()
+        for backend in self.filter_backends:
+            if backend is DjangoFilterBackend:
+                filtres = self.filterset_class(parametres, queryset=queryset, request=self.request)
+                if not filtres.is_valid():
+                    raise ValidationError(filtres.errors)
+                queryset = filtres.qs
+            elif backend is not filters.OrderingFilter:
+                queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+
+class ExportMixin:
+    """Ajoute l'action export (CSV ou NDJSON en continu) à un ViewSet réservé au staff."""
+
+    nom_export = None
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Exporte toute la table, filtrable par ?debut=, ?fin= (AAAA-MM-JJ) et ?statut="""
+        self._require_staff(request)
+        format_fichier = request.query_params.get('type', 'csv')
+        if format_fichier not in FORMATS_EXPORT:
+            raise ValidationError(f"Type de fichier inconnu, attendu: {', '.join(FORMATS_EXPORT)}")
+        try:
+            flux = exporter(
+                self.nom_export,
+                format_fichier,
+                debut=request.query_params.get('debut'),
+                fin=request.query_params.get('fin'),
+                statut=request.query_params.get('statut'),
+            )
+        except ValueError as exc:
+            raise ValidationError(str(exc))
+
+        response = StreamingHttpResponse(flux, content_type=TYPES_CONTENU[format_fichier])
+        horodatage = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.nom_export}-{horodatage}.{format_fichier}"'
+        )
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class LivreViewSet(
+    LectureRepliqueMixin,
+    ColonnesRestreintesMixin,
+    LectureRapideMixin,
+    FacettesMixin,
+    EcritureEnMasseMixin,
+    ExportMixin,
+    RequetesConditionnellesMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Livre.objects.all()
     serializer_class = LivreSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['titre', 'auteur', 'isbn', 'genre']
+    filter_backends = [RechercheLivreFilter, DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = LivreFilterSet
+    champs_facettes = ('genre',)
+    # Repli hors SQLite (ou sans index FTS5): mêmes colonnes que l'index plein texte.
+    search_fields = ['titre', 'auteur', 'isbn', 'genre', 'editeur', 'description']
     ordering_fields = ['titre', 'date_ajout', 'disponible']
+    cle_curseur = ('date_ajout', 'id')
+    actions_colonnes_restreintes = ('list', 'retrieve', 'disponibles', 'empruntes')
+    actions_lecture_rapide = ('list', 'disponibles', 'empruntes')
+    tables_versionnees = ('livre',)
+    cache_partage_usagers = True
+    nom_export = 'livres'
 
     def _require_staff(self, request):
         if not request.user.is_staff:
@@ -247,45 +673,94 @@ class LivreViewSet(viewsets.ModelViewSet):
     def disponibles(self, request):
         """Retourne les livres disponibles"""
         livres = self.get_queryset().filter(disponible__gt=0)
-        serializer = self.get_serializer(livres, many=True)
-        return Response(serializer.data)
+        return self.reponse_liste(livres, paginer=False)
     
     @action(detail=False, methods=['get'])
     def empruntes(self, request):
         """Retourne les livres empruntes"""
         livres = self.get_queryset().filter(disponible__lt=F('total'))
-        serializer = self.get_serializer(livres, many=True)
-        return Response(serializer.data)
+        return self.reponse_liste(livres, paginer=False)
     
     @action(detail=True, methods=['post'])
     def ajouter_exemplaire(self, request, pk=None):
         """Ajouter un exemplaire d'un livre"""
         self._require_staff(request)
         livre = self.get_object()
-        livre.total += 1
-        livre.disponible += 1
-        livre.save()
+        Livre.objects.filter(pk=livre.pk).update(
+            total=F('total') + 1,
+            disponible=F('disponible') + 1,
+            date_modification=timezone.now(),
+        )
+        VersionTable.incrementer('livre')
+        livre.refresh_from_db(fields=['total', 'disponible', 'date_modification'])
         serializer = self.get_serializer(livre)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def importer(self, request):
+        """Importe un catalogue CSV ou NDJSON (champ 'fichier'), fusionné sur l'ISBN"""
+        self._require_staff(request)
+        fichier = request.FILES.get('fichier')
+        if fichier is None:
+            return Response(
+                {'error': "Fichier manquant (champ 'fichier')"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        format_fichier = request.query_params.get('type') or format_depuis_nom(fichier.name)
+        if format_fichier not in FORMATS_IMPORT:
+            return Response(
+                {'error': f"Type de fichier inconnu, attendu: {', '.join(FORMATS_IMPORT)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-class MembreViewSet(viewsets.ModelViewSet):
+        # Encodage vérifié avant tout lot écrit, puis lecture ligne à ligne du
+        # fichier téléversé, sans le charger en mémoire.
+        ligne = ligne_non_utf8(fichier)
+        if ligne is not None:
+            return Response(
+                {'error': f'Le fichier doit être encodé en UTF-8 (ligne {ligne})'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        fichier.seek(0)
+        rapport = importer_livres(codecs.iterdecode(fichier, 'utf-8-sig'), format_fichier)
+        return Response(rapport)
+
+
+class MembreViewSet(
+    LectureRepliqueMixin,
+    ColonnesRestreintesMixin,
+    LectureRapideMixin,
+    FacettesMixin,
+    EcritureEnMasseMixin,
+    ExportMixin,
+    RequetesConditionnellesMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Membre.objects.all()
     serializer_class = MembreSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = MembreFilterSet
+    champs_facettes = ('statut',)
     search_fields = ['nom', 'email', 'telephone']
     ordering_fields = ['nom', 'date_inscription', 'statut']
+    cle_curseur = ('date_inscription', 'id')
+    actions_colonnes_restreintes = ('list', 'retrieve', 'actifs')
+    tables_versionnees = ('membre',)
+    tables_versionnees_actions = {'emprunts_actuels': ('membre', 'emprunt', 'livre')}
+    nom_export = 'membres'
 
     def _require_staff(self, request):
         if not request.user.is_staff:
             raise PermissionDenied("Action réservée au bibliothécaire.")
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         if self.request.user.is_staff:
-            return self.queryset
+            return queryset
         # Un utilisateur ne voit que sa propre fiche membre.
-        return self.queryset.filter(email__iexact=self.request.user.email)
+        return queryset.filter(pk=membre_id_courant(self.request))
 
     def perform_create(self, serializer):
         self._require_staff(self.request)
@@ -312,7 +787,7 @@ class MembreViewSet(viewsets.ModelViewSet):
         """Retourne les emprunts actuels d'un membre"""
         self._require_staff(request)
         membre = self.get_object()
-        emprunts = membre.emprunts.filter(statut__in=['en_cours', 'retard'])
+        emprunts = membre.emprunts.filter(statut__in=['en_cours', 'retard']).select_related('livre')
         serializer = EmpruntSerializer(emprunts, many=True)
         return Response(serializer.data)
     
@@ -337,30 +812,83 @@ class MembreViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class EmpruntViewSet(viewsets.ModelViewSet):
-    queryset = Emprunt.objects.all()
+class EmpruntViewSet(
+    LectureRepliqueMixin,
+    ColonnesRestreintesMixin,
+    LectureRapideMixin,
+    FacettesMixin,
+    ExportMixin,
+    RequetesConditionnellesMixin,
+    viewsets.ModelViewSet,
+):
+    # livre_titre et membre_nom sont lus dans la même requête (pas de N+1).
+    queryset = Emprunt.objects.select_related('livre', 'membre')
     serializer_class = EmpruntSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [RechercheEmpruntFilter, DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = EmpruntFilterSet
+    champs_facettes = ('statut',)
     search_fields = ['livre__titre', 'membre__nom', 'statut']
     ordering_fields = ['date_emprunt', 'date_retour_prevue', 'statut']
+    cle_curseur = ('date_emprunt', 'id')
+    actions_colonnes_restreintes = ('list', 'retrieve', 'en_cours', 'en_retard')
+    actions_lecture_rapide = ('list', 'en_cours', 'en_retard')
+    # livre_titre et membre_nom font dépendre les emprunts des deux autres tables.
+    tables_versionnees = ('emprunt', 'livre', 'membre')
+    tables_versionnees_actions = {'statistiques': ('emprunt',)}
+    nom_export = 'emprunts'
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         if self.request.user.is_staff:
-            return self.queryset
-        return self.queryset.filter(membre__email__iexact=self.request.user.email)
+            return queryset
+        return queryset.filter(membre_id=membre_id_courant(self.request))
 
     def _require_staff(self, request):
         if not request.user.is_staff:
             raise PermissionDenied("Action réservée au bibliothécaire.")
 
+    def _references_lot(self, request):
+        """Lit {"ids": [...]} ou {"membre": id, "isbns": [...]} dans le corps de la requête."""
+        ids = request.data.get('ids')
+        isbns = request.data.get('isbns')
+        if (ids is None) == (isbns is None):
+            raise ValidationError("Indiquez soit 'ids', soit 'membre' et 'isbns'.")
+
+        references = ids if ids is not None else isbns
+        if not isinstance(references, list) or not references:
+            raise ValidationError('La liste des emprunts doit être une liste non vide.')
+        if len(references) > TAILLE_MAX_LOT:
+            raise ValidationError(f'Au plus {TAILLE_MAX_LOT} emprunts par demande.')
+
+        if ids is not None:
+            try:
+                return {'ids': [int(identifiant) for identifiant in ids]}
+            except (TypeError, ValueError):
+                raise ValidationError({'ids': 'Identifiants invalides.'})
+
+        try:
+            membre_id = int(request.data.get('membre'))
+        except (TypeError, ValueError):
+            raise ValidationError({'membre': 'Membre requis avec les ISBN.'})
+        return {'membre_id': membre_id, 'isbns': [str(isbn).strip() for isbn in isbns]}
+
+    @staticmethod
+    def _reponse_lot(resultats):
+        echecs = sum(1 for resultat in resultats if 'erreur' in resultat)
+        return Response({
+            'traites': len(resultats) - echecs,
+            'echecs': echecs,
+            'resultats': resultats,
+        })
+
     def create(self, request, *args, **kwargs):
         payload = request.data.copy()
         if not request.user.is_staff:
-            membre = Membre.objects.filter(email__iexact=request.user.email).first()
-            if not membre:
+            membre_id = membre_id_courant(request)
+            if membre_id is None:
                 raise ValidationError("Aucun membre associé à cet utilisateur.")
-            payload['membre'] = membre.id
+            payload['membre'] = membre_id
 
         serializer = self.get_serializer(data=payload)
         serializer.is_valid(raise_exception=True)
@@ -368,9 +896,18 @@ class EmpruntViewSet(viewsets.ModelViewSet):
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def perform_create(self, serializer):
+        try:
+            serializer.save()
+        except ExemplaireIndisponible as exc:
+            raise ValidationError({'livre': exc.messages})
+
     def perform_update(self, serializer):
         self._require_staff(self.request)
-        serializer.save()
+        try:
+            serializer.save()
+        except ExemplaireIndisponible as exc:
+            raise ValidationError({'livre': exc.messages})
 
     def perform_destroy(self, instance):
         self._require_staff(self.request)
@@ -380,15 +917,13 @@ class EmpruntViewSet(viewsets.ModelViewSet):
     def en_cours(self, request):
         """Retourne les emprunts en cours"""
         emprunts = self.get_queryset().filter(statut='en_cours')
-        serializer = self.get_serializer(emprunts, many=True)
-        return Response(serializer.data)
+        return self.reponse_liste(emprunts, paginer=False)
     
     @action(detail=False, methods=['get'])
     def en_retard(self, request):
         """Retourne les emprunts en retard"""
         emprunts = self.get_queryset().filter(statut='retard')
-        serializer = self.get_serializer(emprunts, many=True)
-        return Response(serializer.data)
+        return self.reponse_liste(emprunts, paginer=False)
     
     @action(detail=True, methods=['post'])
     def prolonger(self, request, pk=None):
@@ -420,27 +955,50 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        emprunt.date_retour_effective = timezone.now().date()
-        emprunt.statut = 'retourne'
-        emprunt.livre.disponible += 1
-        emprunt.livre.save()
-        emprunt.save()
+        if not emprunt.retourner():
+            return Response(
+                {'error': 'Ce livre a déjà été retourné'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         serializer = self.get_serializer(emprunt)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'], url_path='retourner-lot')
+    def retourner_lot(self, request):
+        """Retourne plusieurs livres en une transaction (ids d'emprunts ou ISBN d'un membre)"""
+        self._require_staff(request)
+        return self._reponse_lot(retourner_emprunts(**self._references_lot(request)))
+
+    @action(detail=False, methods=['post'], url_path='prolonger-lot')
+    def prolonger_lot(self, request):
+        """Prolonge plusieurs emprunts de 7 ou 14 jours en une transaction"""
+        self._require_staff(request)
+        references = self._references_lot(request)
+        try:
+            jours = int(request.data.get('jours', 7))
+        except (TypeError, ValueError):
+            jours = 0
+        if jours <= 0:
+            raise ValidationError({'jours': 'Nombre de jours invalide.'})
+        return self._reponse_lot(prolonger_emprunts(jours, **references))
+
     @action(detail=False, methods=['get'])
     def statistiques(self, request):
         """Retourne les statistiques des emprunts"""
-        queryset = self.get_queryset()
-        total_emprunts = queryset.count()
-        en_cours = queryset.filter(statut='en_cours').count()
-        en_retard = queryset.filter(statut='retard').count()
-        retournes = queryset.filter(statut='retourne').count()
-        
-        return Response({
-            'total_emprunts': total_emprunts,
-            'en_cours': en_cours,
-            'en_retard': en_retard,
-            'retournes': retournes
-        })
+        if request.user.is_staff:
+            # Compteurs tenus à jour par les signaux: lecture de quelques lignes.
+            comptes = CompteurEmprunt.statistiques()
+            return Response({
+                'total_emprunts': sum(comptes.values()),
+                'en_cours': comptes.get('en_cours', 0),
+                'en_retard': comptes.get('retard', 0),
+                'retournes': comptes.get('retourne', 0)
+            })
+
+        return Response(self.get_queryset().aggregate(
+            total_emprunts=Count('id'),
+            en_cours=Count('id', filter=Q(statut='en_cours')),
+            en_retard=Count('id', filter=Q(statut='retard')),
+            retournes=Count('id', filter=Q(statut='retourne')),
+        ))